@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+"""Benchmark of the per-call overhead of parsing a response into ElementTree.
+
+Parses a small flickr.photos.getInfo-sized response with every available
+ElementTree backend, and with the import chain that FlickrAPI.parse_etree
+used to run on every call. Run from the top-level directory of the source
+distribution::
+
+    python benchmarks/etree_backends.py [number of calls]
+"""
+
+import logging
+import os.path
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flickrapi import backends  # noqa: E402
+
+LOG = logging.getLogger('flickrapi.core')
+
+RESPONSE = b'''<?xml version="1.0" encoding="utf-8" ?>
+<rsp stat="ok">
+  <photo id="2141453991" secret="1e92283336" server="2067" farm="3" license="4">
+    <owner nsid="73509078@N00" username="Sybren" location="The Netherlands" />
+    <title>threesixtyfive | day 115</title>
+    <visibility ispublic="1" isfriend="0" isfamily="0" />
+    <dates posted="1198790234" taken="2007-12-26 13:41:48" lastupdate="1198838228" />
+    <comments>3</comments>
+  </photo>
+</rsp>
+'''
+
+
+def old_fromstring(rest_xml):
+    """The import chain of FlickrAPI.parse_etree in FlickrAPI 2.4."""
+
+    try:
+        # Python 2.5
+        import xml.etree.cElementTree as ElementTree
+    except ImportError:
+        try:
+            # Python 2.5
+            import xml.etree.ElementTree as ElementTree
+        except ImportError:
+            try:
+                # normal cElementTree install
+                import cElementTree as ElementTree
+            except ImportError:
+                try:
+                    # normal ElementTree install
+                    import elementtree.ElementTree as ElementTree
+                except ImportError:
+                    raise ImportError("You need to install "
+                                      "ElementTree to use the etree format")
+    try:
+        from lxml import etree as ElementTree  # noqa: F811
+        LOG.info('REST Parser: using lxml.etree')
+    except ImportError:
+        LOG.info('REST Parser: using xml.etree.ElementTree')
+
+    return ElementTree.fromstring(rest_xml)
+
+
+def measure(name, parse, number):
+    def parse_and_read():
+        rsp = parse(RESPONSE)
+        assert rsp.attrib['stat'] == 'ok'
+
+    seconds = min(timeit.repeat(parse_and_read, number=number, repeat=5)) / number
+    print('%-30s %8.2f µs/call' % (name, seconds * 1e6))
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    print('Parsing a %d byte response' % len(RESPONSE))
+    measure('import chain (old)', old_fromstring, number)
+    measure('preferred backend', lambda data: backends.etree_fromstring()(data), number)
+    for name in backends.available_etree_backends():
+        fromstring = backends.etree_fromstring(name)
+        measure(name, fromstring, number)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+"""Benchmark of ParsedCache hits against parsing the response, per format.
+
+Parses a synthetic flickr.photos.search response of every response format
+and backend, and compares that with getting the parsed response from a
+ParsedCache, with and without copying. Run from the top-level directory
+of the source distribution::
+
+    python benchmarks/parsed_cache.py [photos per page]
+"""
+
+import json
+import os.path
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import flickrapi  # noqa: E402
+from flickrapi import backends  # noqa: E402
+from xmlnode_parse import search_response  # noqa: E402
+
+
+def json_response(per_page):
+    photos = [{'id': str(10000000000 + i), 'owner': '73509078@N00', 'secret': '1e92283336',
+               'server': '2067', 'farm': 3, 'title': 'Photo %d' % i, 'ispublic': 1,
+               'isfriend': 0, 'isfamily': 0, 'tags': '365 365days threesixtyfive me'}
+              for i in range(per_page)]
+    return json.dumps({'photos': {'page': 1, 'pages': 10, 'perpage': per_page,
+                                  'total': 10 * per_page, 'photo': photos},
+                       'stat': 'ok'}).encode('utf-8')
+
+
+def milliseconds(func):
+    number = 20
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+
+
+def measure(name, flickr, parse_format, data):
+    parse = lambda: flickr._parse_response(parse_format, data)  # noqa: E731
+    parsed = parse()
+
+    copying = flickrapi.ParsedCache()
+    copying.set('key', parsed)
+    shared = flickrapi.ParsedCache(copy=False)
+    shared.set('key', parsed)
+
+    print('%-22s %8.2f %8.2f %8.3f' % (name, milliseconds(parse),
+                                      milliseconds(lambda: copying.get('key')),
+                                      milliseconds(lambda: shared.get('key'))))
+
+
+def main():
+    per_page = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    xml = search_response(per_page)
+    js = json_response(per_page)
+
+    flickr = flickrapi.FlickrAPI(u'key', u'secret', store_token=False)
+
+    print('Milliseconds per response of %d photos' % per_page)
+    print('%-22s %8s %8s %8s' % ('format', 'parse', 'copy', 'no copy'))
+
+    for name in backends.available_etree_backends():
+        flickr.etree_backend = name
+        measure('etree (%s)' % name, flickr, 'etree', xml)
+    flickr.etree_backend = None
+
+    measure('xmlnode', flickr, 'xmlnode', xml)
+    flickr.xmlnode_lazy = True
+    measure('xmlnode (lazy)', flickr, 'xmlnode', xml)
+    flickr.xmlnode_lazy = False
+
+    measure('records', flickr, 'records', xml)
+
+    for name in backends.available_json_backends():
+        flickr.json_backend = name
+        measure('parsed-json (%s)' % name, flickr, 'parsed-json', js)
+
+
+if __name__ == '__main__':
+    main()
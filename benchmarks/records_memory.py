@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+"""Benchmark of the memory held by walked photos, per response format.
+
+Parses a number of synthetic flickr.photos.search pages, keeps every photo
+like a program collecting the results of a walk would, and reports the
+memory held per photo. Run from the top-level directory of the source
+distribution::
+
+    python benchmarks/records_memory.py [number of pages]
+"""
+
+import os.path
+import sys
+import tracemalloc
+from xml.etree import ElementTree
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flickrapi import records  # noqa: E402
+from flickrapi.xmlnode import XMLNode  # noqa: E402
+from xmlnode_parse import search_response  # noqa: E402
+
+PER_PAGE = 500
+
+
+def etree_photos(data):
+    return ElementTree.fromstring(data).findall('*/photo')
+
+
+def xmlnode_photos(data):
+    return XMLNode.parse(data).photos[0].photo
+
+
+def record_photos(data):
+    return records.parse_page(ElementTree.fromstring(data))
+
+
+def measure(name, photos_of_page, pages):
+    tracemalloc.start()
+    photos = []
+    for data in pages:
+        photos.extend(photos_of_page(data))
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print('%-10s %8.1f KiB for %d photos, %6.0f bytes/photo'
+          % (name, retained / 1024.0, len(photos), retained / float(len(photos))))
+
+
+def main():
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    # Give every page its own photo IDs, so only truly shared values are shared.
+    pages = [search_response(PER_PAGE).replace(b'"100000', ('"%05d' % page).encode('ascii'))
+             for page in range(page_count)]
+
+    measure('etree', etree_photos, pages)
+    measure('xmlnode', xmlnode_photos, pages)
+    measure('records', record_photos, pages)
+
+
+if __name__ == '__main__':
+    main()
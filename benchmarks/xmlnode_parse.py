@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+"""Benchmark of XMLNode.parse against the old minidom-based implementation.
+
+Parses a synthetic flickr.photos.search response, and reads either the
+title of the last photo or only the total number of photos. Reports the
+time this takes and the memory held by the resulting tree. Run from the
+top-level directory of the source distribution::
+
+    python benchmarks/xmlnode_parse.py [photos per page]
+"""
+
+import os.path
+import sys
+import timeit
+import tracemalloc
+import xml.dom.minidom
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flickrapi.xmlnode import XMLNode  # noqa: E402
+
+PHOTO_XML = ('<photo id="%(id)d" owner="73509078@N00" secret="1e92283336" server="2067" '
+             'farm="3" title="Photo %(id)d" ispublic="1" isfriend="0" isfamily="0" '
+             'license="4" dateupload="1198790234" datetaken="2007-12-26 13:41:48" '
+             'ownername="Sybren Stüvel" tags="365 365days threesixtyfive me selfportrait" '
+             'url_q="https://live.staticflickr.com/2067/%(id)d_1e92283336_q.jpg" />')
+
+
+class MinidomXMLNode:
+    """The minidom-based XMLNode of FlickrAPI 2.4."""
+
+    def __init__(self):
+        self.name = ""
+        self.text = ""
+        self.attrib = {}
+        self.xml = None
+
+    def __setitem__(self, key, item):
+        self.attrib[key] = item
+
+    def __getitem__(self, key):
+        return self.attrib[key]
+
+    @classmethod
+    def __parse_element(cls, element, this_node):
+        this_node.name = element.nodeName
+
+        for i in range(element.attributes.length):
+            an = element.attributes.item(i)
+            this_node[an.name] = an.nodeValue
+
+        for a in element.childNodes:
+            if a.nodeType == xml.dom.Node.ELEMENT_NODE:
+                child = MinidomXMLNode()
+                if not hasattr(this_node, a.nodeName) or a.nodeName == 'name':
+                    setattr(this_node, a.nodeName, [])
+
+                children = getattr(this_node, a.nodeName)
+                children.append(child)
+
+                cls.__parse_element(a, child)
+
+            elif a.nodeType == xml.dom.Node.TEXT_NODE:
+                this_node.text += a.nodeValue
+
+        return this_node
+
+    @classmethod
+    def parse(cls, xml_str, store_xml=False):
+        dom = xml.dom.minidom.parseString(xml_str)
+
+        root_node = MinidomXMLNode()
+        if store_xml:
+            root_node.xml = xml_str
+
+        return cls.__parse_element(dom.firstChild, root_node)
+
+
+def search_response(per_page):
+    """Returns a flickr.photos.search response with per_page photos, as bytes."""
+
+    photos = '\n'.join(PHOTO_XML % {'id': 10000000000 + i} for i in range(per_page))
+    return ('<?xml version="1.0" encoding="utf-8" ?>\n'
+            '<rsp stat="ok">\n<photos page="1" pages="20" perpage="%d" total="%d">\n'
+            '%s\n</photos>\n</rsp>\n' % (per_page, 20 * per_page, photos)).encode('utf-8')
+
+
+def read_last_title(tree):
+    assert tree.photos[0].photo[-1]['title']
+
+
+def read_total(tree):
+    assert tree.photos[0]['total']
+
+
+def measure(name, parse, data, number, read=read_last_title):
+    def parse_and_read():
+        tree = parse(data)
+        read(tree)
+        return tree
+
+    seconds = min(timeit.repeat(parse_and_read, number=number, repeat=5)) / number
+
+    tracemalloc.start()
+    tree = parse_and_read()  # noqa: F841
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print('%-30s %9.3f ms/parse %9.1f KiB retained' % (name, seconds * 1000, retained / 1024.0))
+
+
+def main():
+    per_page = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    data = search_response(per_page)
+    number = max(1, 5000 // per_page)
+
+    print('Parsing a %.1f KiB response with %d photos' % (len(data) / 1024.0, per_page))
+    measure('minidom XMLNode', MinidomXMLNode.parse, data, number)
+    measure('minidom XMLNode, store_xml', lambda d: MinidomXMLNode.parse(d, True), data, number)
+    measure('XMLNode', XMLNode.parse, data, number)
+    measure('XMLNode, lazy', lambda d: XMLNode.parse(d, lazy=True), data, number)
+
+    print('Reading only the total number of photos')
+    measure('XMLNode', XMLNode.parse, data, number, read_total)
+    measure('XMLNode, lazy', lambda d: XMLNode.parse(d, lazy=True), data, number, read_total)
+
+
+if __name__ == '__main__':
+    main()
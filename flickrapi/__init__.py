@@ -42,18 +42,23 @@ from __future__ import unicode_literals
 
 # Import the core functionality into the flickrapi namespace
 from flickrapi.core import FlickrAPI
+from flickrapi.asyncapi import AsyncFlickrAPI
 
 from flickrapi.xmlnode import XMLNode
 from flickrapi.exceptions import (IllegalArgumentException,
-    FlickrError, CancelUpload, LockingError)
-from flickrapi.cache import SimpleCache
+    FlickrError, FlickrHTTPError, CancelUpload, LockingError)
+from flickrapi.cache import SimpleCache, LRUCache, SQLiteCache, ParsedCache, NegativeCache
+from flickrapi.journal import UploadJournal
+from flickrapi.transport import RequestsTransport, StubTransport
 from flickrapi.tokencache import (OAuthTokenCache, TokenCache, SimpleTokenCache,  # noqa: F401
     LockingTokenCache)
 
 __version__ = '2.4.0'
-__all__ = ('FlickrAPI', 'IllegalArgumentException', 'FlickrError',
-           'CancelUpload', 'LockingError', 'XMLNode', 'set_log_level', '__version__',
-           'SimpleCache', 'TokenCache', 'SimpleTokenCache', 'LockingTokenCache')
+__all__ = ('FlickrAPI', 'AsyncFlickrAPI', 'IllegalArgumentException', 'FlickrError',
+           'FlickrHTTPError', 'CancelUpload', 'LockingError', 'XMLNode', 'set_log_level',
+           '__version__', 'SimpleCache', 'LRUCache', 'SQLiteCache', 'ParsedCache', 'NegativeCache',
+           'UploadJournal', 'TokenCache', 'SimpleTokenCache', 'LockingTokenCache',
+           'RequestsTransport', 'StubTransport')
 __author__ = 'Sybren Stüvel'
 
 
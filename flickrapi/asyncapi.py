@@ -0,0 +1,590 @@
+"""Asyncio interface to the Flickr API.
+
+The `AsyncFlickrAPI` class mirrors `flickrapi.FlickrAPI`, except that API
+calls, uploads and replacements return awaitables::
+
+    async with AsyncFlickrAPI(api_key, api_secret) as flickr:
+        rsp = await flickr.photos.getInfo(photo_id='1234')
+
+Requests are sent with aiohttp_, which has to be installed separately. They
+are signed with the same OAuth1 code as the synchronous API, and the
+responses are parsed by the same REST parsers.
+
+.. _aiohttp: https://docs.aiohttp.org/
+"""
+
+import asyncio
+import logging
+import time
+
+import requests
+
+from flickrapi import auth, bulk
+from flickrapi.cache import cache_key
+from flickrapi.core import FlickrAPI
+from flickrapi.exceptions import IllegalArgumentException, FlickrError
+from flickrapi.retry import is_read_method
+
+LOG = logging.getLogger(__name__)
+
+__all__ = ('AsyncFlickrAPI', 'AsyncOAuthFlickrInterface')
+
+
+def _text_headers(headers):
+    """Returns the HTTP headers as dict, with bytes names and values decoded.
+
+    requests_oauthlib may produce binary headers, which aiohttp refuses.
+    """
+
+    result = {}
+    for name, value in headers.items():
+        if isinstance(name, bytes):
+            name = name.decode('latin1')
+        if isinstance(value, bytes):
+            value = value.decode('latin1')
+        result[name] = value
+
+    return result
+
+
+class _ChunkedBody(object):
+    """Asynchronous iterator over the chunks of a multipart encoder, to
+    stream an upload with aiohttp without reading it into memory.
+    """
+
+    def __init__(self, encoder, chunk_size):
+        self.encoder = encoder
+        self.chunk_size = chunk_size
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        chunk = self.encoder.read(self.chunk_size)
+        if not chunk:
+            raise StopAsyncIteration
+        return chunk
+
+
+class AsyncOAuthFlickrInterface(auth.OAuthFlickrInterface):
+    """Interface object for performing OAuth-authenticated calls to Flickr
+    using asyncio.
+
+    The authentication flow itself (request token, access token) is inherited
+    from `OAuthFlickrInterface` and remains blocking.
+    """
+
+    # Number of bytes read from the multipart encoder at a time when uploading.
+    UPLOAD_CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, *args, **kwargs):
+        auth.OAuthFlickrInterface.__init__(self, *args, **kwargs)
+        self.aio_session = None
+        self._owns_aio_session = False
+
+    def _get_aio_session(self):
+        """Returns the aiohttp.ClientSession, creating one if necessary."""
+
+        if self.aio_session is None:
+            import aiohttp
+
+            self.aio_session = aiohttp.ClientSession()
+            self._owns_aio_session = True
+
+        return self.aio_session
+
+    def _aio_timeout(self, timeout):
+        """Returns an aiohttp.ClientTimeout for the given timeout, in seconds."""
+
+        import aiohttp
+
+        return aiohttp.ClientTimeout(total=timeout or self.default_timeout)
+
+    async def close(self):
+        """Closes the aiohttp session, if it was created by this object."""
+
+        if self.aio_session is not None and self._owns_aio_session:
+            await self.aio_session.close()
+        self.aio_session = None
+        self._owns_aio_session = False
+
+    async def async_do_request(self, url, params=None, timeout=None):
+        """Performs the HTTP request, signed with OAuth.
+
+        :param timeout: optional request timeout, in seconds.
+        :type timeout: float
+
+        @return: the response content
+        """
+
+        # Let requests & requests_oauthlib build and sign the request, so
+        # that it is identical to the one do_request() would send.
+        prepared = requests.Request('POST', url, data=params, auth=self.oauth).prepare()
+
+        session = self._get_aio_session()
+        async with session.post(url,
+                                data=prepared.body,
+                                headers=_text_headers(prepared.headers),
+                                timeout=self._aio_timeout(timeout)) as resp:
+            content = await resp.read()
+            status = resp.status
+
+        self._check_status('async_do_request', status, content.decode('utf-8', 'replace'))
+
+        return content
+
+    async def async_do_upload(self, filename, url, params=None, fileobj=None, timeout=None):
+        """Performs a file upload to the given URL with the given parameters, signed with OAuth.
+
+        :param timeout: optional request timeout, in seconds.
+        :type timeout: float
+
+        @return: the response content
+        """
+
+        m, headers = self._prepare_upload(filename, url, params, fileobj)
+        headers = _text_headers(headers)
+        headers['Content-Length'] = str(m.len)
+
+        session = self._get_aio_session()
+        async with session.post(url,
+                                data=_ChunkedBody(m, self.UPLOAD_CHUNK_SIZE),
+                                headers=headers,
+                                timeout=self._aio_timeout(timeout)) as resp:
+            content = await resp.read()
+            status = resp.status
+
+        self._check_status('async_do_upload', status, content.decode('utf-8', 'replace'))
+
+        return content
+
+
+def _blocking(name):
+    """Returns a method that replaces the ``FlickrAPI`` method of the
+    given name, which cannot be used with asyncio.
+    """
+
+    def unavailable(self, *args, **kwargs):
+        raise NotImplementedError(
+            '%s() is not available on AsyncFlickrAPI; call the paginated API '
+            'method with page=... instead, or use FlickrAPI' % name)
+
+    unavailable.__name__ = name
+    unavailable.__doc__ = 'Not available on AsyncFlickrAPI, raises NotImplementedError.'
+    return unavailable
+
+
+class AsyncFlickrAPI(FlickrAPI):
+    """Encapsulates Flickr functionality, for use with asyncio.
+
+    Example usage::
+
+      flickr = flickrapi.AsyncFlickrAPI(api_key, api_secret)
+      photos = await flickr.photos.search(user_id='73509078@N00', per_page='10')
+      await flickr.close()
+
+    Authentication is performed with the same (blocking) methods as
+    `FlickrAPI`, so do that before entering the event loop, or in an
+    executor. The ``walk*`` methods are not available, and raise
+    `NotImplementedError`.
+    """
+
+    oauth_interface_class = AsyncOAuthFlickrInterface
+
+    def __init__(self, api_key, secret, *args, session=None, **kwargs):
+        """Construct a new AsyncFlickrAPI instance for a given API key
+        and secret.
+
+        session
+            Optional ``aiohttp.ClientSession`` to perform the requests with,
+            passed as keyword argument. If not given, one is created on the
+            first call, and closed by `close()`.
+
+        All other arguments are the same as for `FlickrAPI`.
+        """
+
+        FlickrAPI.__init__(self, api_key, secret, *args, **kwargs)
+        self.flickr_oauth.aio_session = session
+
+        # Calls in flight, by cache key, for coalescing identical calls.
+        self._in_flight = {}
+
+    def __repr__(self):
+        """Returns a string representation of this object."""
+
+        return '[AsyncFlickrAPI for key "%s"]' % self.flickr_oauth.key
+
+    __str__ = __repr__
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """Closes the HTTP session, if it was created by this object."""
+
+        await self.flickr_oauth.close()
+
+    def _check_token(self):
+        """Calls flickr.auth.oauth.checkToken, returning the ElementTree response.
+
+        Authentication is blocking, so this uses the synchronous code path.
+        """
+
+        return FlickrAPI.do_flickr_call(self, 'flickr.auth.oauth.checkToken', format='etree')
+
+    async def do_flickr_call(self, _method_name, timeout=None, **kwargs):
+        """Handle all the regular Flickr API calls.
+
+        Example::
+
+            etree = await flickr.photos.getInfo(photo_id='1234')
+            xmlnode = await flickr.photos.getInfo(photo_id='1234', format='xmlnode')
+        """
+
+        params = self._call_params(_method_name, kwargs)
+        parse_format = params['format']
+        read = is_read_method(_method_name)
+
+        # Return the parsed response from cache if available
+        parsed_key = self._parsed_cache_key(parse_format, params)
+        if parsed_key is not None:
+            result = self._parsed_cache_lookup(parsed_key, params, self._async_revalidate,
+                                               timeout)
+            if result is not None:
+                return result
+
+        if self.negative_cache is not None and read:
+            self.negative_cache.check(params)
+
+        self._set_request_format(parse_format, params)
+        try:
+            data = await self._async_flickr_call(timeout=timeout, **params)
+            result = self._parse_response(parse_format, data)
+        except FlickrError as ex:
+            if read:
+                self._cache_error(params, ex)
+            raise
+
+        if parsed_key is not None:
+            self._cache_set(self.parsed_cache, parsed_key, result, params)
+        if not read:
+            self._invalidate(params)
+
+        return result
+
+    async def batch(self, calls, max_workers=4, ordered=True, timeout=None):
+        """Performs many Flickr API calls concurrently.
+
+        Example::
+
+            calls = [('photos.getInfo', {'photo_id': photo_id})
+                     for photo_id in photo_ids]
+            for rsp in await flickr.batch(calls, max_workers=8):
+                ...
+
+        Takes the same parameters as `FlickrAPI.batch`, with ``max_workers``
+        limiting the number of calls in flight. If ``ordered`` is False, a
+        list of ``(index, result)`` tuples is returned in the order in which
+        the calls completed.
+
+        A failing call does not abort the batch; the exception it raised
+        (for example a `FlickrError`) is put in place of its result.
+        """
+
+        calls = [(self._full_method_name(method_name), kwargs)
+                 for method_name, kwargs in calls]
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def call(index):
+            method_name, kwargs = calls[index]
+            async with semaphore:
+                try:
+                    result = await self.do_flickr_call(method_name, timeout=timeout, **kwargs)
+                except Exception as ex:
+                    LOG.debug('Batched call %s(%s) failed: %s', method_name, kwargs, ex)
+                    result = ex
+            return index, result
+
+        return await self._gather(call, len(calls), ordered)
+
+    @staticmethod
+    async def _gather(func, count, ordered):
+        """Awaits ``func(index)`` for every index below ``count``, each of
+        which returns an ``(index, result)`` tuple.
+
+        Returns the results in index order if ``ordered`` is True, and the
+        tuples in order of completion otherwise.
+        """
+
+        tasks = [asyncio.ensure_future(func(index)) for index in range(count)]
+        try:
+            if ordered:
+                completed = await asyncio.gather(*tasks)
+                return [result for _, result in completed]
+
+            completed = []
+            for task in asyncio.as_completed(tasks):
+                completed.append(await task)
+            return completed
+        finally:
+            # Don't keep running calls nobody is waiting for any more.
+            for task in tasks:
+                task.cancel()
+
+    async def _async_flickr_call(self, timeout=None, **kwargs):
+        """Performs a Flickr API call with the given arguments. The method name
+        itself should be passed as the 'method' parameter.
+
+        Returns the unparsed data from Flickr.
+        """
+
+        LOG.debug("Calling %s" % kwargs)
+
+        key = cache_key(kwargs)
+        # Calls that modify data are always sent to Flickr, and never cached.
+        read = is_read_method(kwargs.get('method'))
+
+        # Return value from cache if available
+        if self.cache is not None and read:
+            reply, stale = self._cache_lookup(key)
+            if reply is not None:
+                if stale:
+                    self._async_revalidate(key, kwargs, timeout)
+                return reply
+
+        if read:
+            reply = await self._async_coalesce(
+                key, lambda: self._async_do_rest_request(kwargs, timeout))
+        else:
+            reply = await self._async_do_rest_request(kwargs, timeout)
+
+        # Store in cache, if we have one
+        if self.cache is not None and read:
+            self._cache_reply(key, reply, kwargs)
+
+        return reply
+
+    async def _async_coalesce(self, key, func):
+        """Awaits ``func()`` and returns its result.
+
+        If a call for the same key is already in flight, and coalescing is
+        enabled, awaits its result (or exception) instead. This is the
+        asyncio counterpart of `flickrapi.singleflight.SingleFlight`.
+        """
+
+        if self.single_flight is None:
+            return await func()
+
+        future = self._in_flight.get(key)
+        if future is None:
+            future = self._in_flight[key] = asyncio.ensure_future(func())
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        # Cancelling one caller shouldn't cancel the call for the others.
+        return await asyncio.shield(future)
+
+    def _async_revalidate(self, key, kwargs, timeout=None):
+        """Refreshes a stale cache entry in a background task.
+
+        Only one refresh per key is performed at a time. When the refresh
+        fails, the stale entry is kept until it times out.
+        """
+
+        if not self._begin_revalidation(key):
+            return
+
+        async def refresh():
+            try:
+                reply = await self._async_coalesce(
+                    key, lambda: self._async_do_rest_request(kwargs, timeout))
+                # An error response isn't stored, so the stale entry is kept.
+                if self._cache_reply(key, reply, kwargs):
+                    self._evict_parsed(kwargs)
+            except Exception as ex:
+                LOG.warning('Unable to refresh stale cache entry for %s: %s',
+                            kwargs.get('method'), ex)
+            finally:
+                self._end_revalidation(key)
+
+        LOG.debug('Refreshing stale cache entry %s', key)
+        asyncio.ensure_future(refresh())
+
+    async def _async_do_rest_request(self, kwargs, timeout=None):
+        """Performs the HTTP request for an API call, returning the unparsed data.
+
+        Applies the rate limiter and the retry policy.
+        """
+
+        async def attempt():
+            await self._async_rate_limit()
+            return await self.flickr_oauth.async_do_request(self.REST_URL, kwargs,
+                                                            timeout=timeout)
+
+        retry = self.retry_policy is not None and \
+            self.retry_policy.should_retry_method(kwargs.get('method'))
+        return await self._async_retrying(attempt, retry)
+
+    async def _async_rate_limit(self):
+        """Waits for the rate limiter, without blocking the event loop."""
+
+        if self.rate_limiter is None:
+            return
+
+        delay = self.rate_limiter.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _async_retrying(self, attempt, retry):
+        """Awaits ``attempt()``, retrying it on transient errors if ``retry`` is True."""
+
+        if not retry:
+            return await attempt()
+
+        import aiohttp
+
+        delays = self.retry_policy.delays(time.monotonic())
+        while True:
+            try:
+                return await attempt()
+            except Exception as ex:
+                transient = self.retry_policy.is_transient(ex) or isinstance(
+                    ex, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError))
+                if not transient:
+                    raise
+                delay = next(delays, None)
+                if delay is None:
+                    raise
+                LOG.info('Transient error (%s), retrying in %.3f seconds', ex, delay)
+                await asyncio.sleep(delay)
+
+    data_walker = _blocking('data_walker')
+    walk_contacts = _blocking('walk_contacts')
+    walk_photosets = _blocking('walk_photosets')
+    walk_set = _blocking('walk_set')
+    walk_user = _blocking('walk_user')
+    walk_user_updates = _blocking('walk_user_updates')
+    walk = _blocking('walk')
+    walk_columns = _blocking('walk_columns')
+
+    async def upload(self, filename, fileobj=None, timeout=None, **kwargs):
+        """Upload a file to flickr.
+
+        Takes the same parameters as `FlickrAPI.upload`.
+        """
+
+        return await self._async_upload_to_form(self.UPLOAD_URL, filename, fileobj,
+                                                timeout=timeout, **kwargs)
+
+    async def upload_many(self, files, max_workers=4, max_bytes_in_flight=64 * 1024 * 1024,
+                          progress_callback=None, ordered=True, timeout=None, **kwargs):
+        """Uploads many files concurrently.
+
+        Example::
+
+            results = await flickr.upload_many(filenames, max_workers=4,
+                                               progress_callback=show_progress)
+
+        Takes the same parameters as `FlickrAPI.upload_many`, with
+        ``max_workers`` limiting the number of uploads in flight. If
+        ``ordered`` is False, a list of ``(index, result)`` tuples is
+        returned in the order in which the uploads completed.
+
+        A failing upload does not abort the others; the exception it raised
+        (for example a `FlickrDuplicate` or `FlickrError`) is put in place
+        of its result.
+        """
+
+        uploads = [bulk.upload_item(item) for item in files]
+        sizes = [bulk.upload_size(filename, fileobj) for filename, fileobj, _ in uploads]
+
+        tracker = bulk.ProgressTracker(progress_callback, len(uploads), sum(sizes))
+        budget = bulk.AsyncByteBudget(max_bytes_in_flight)
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def upload(index):
+            filename, fileobj, item_kwargs = uploads[index]
+            params = dict(kwargs, **item_kwargs)
+            size = sizes[index]
+            sent = 0
+
+            async with semaphore:
+                await budget.acquire(size)
+                try:
+                    opened = fileobj is None
+                    if opened:
+                        fileobj = open(filename, 'rb')
+                    try:
+                        wrapped = bulk.ProgressFile(fileobj, tracker.sent, size or None,
+                                                     self._upload_digest(filename, fileobj))
+                        try:
+                            result = await self.upload(filename, wrapped, timeout=timeout,
+                                                       **params)
+                        finally:
+                            sent = wrapped.pos
+                    finally:
+                        if opened:
+                            fileobj.close()
+                except Exception as ex:
+                    LOG.debug('Upload of %s failed: %s', filename, ex)
+                    tracker.done(failed=True, unsent=size - sent)
+                    return index, ex
+                finally:
+                    await budget.release(size)
+
+            # Files skipped by the upload journal were never sent.
+            tracker.done(unsent=size - sent)
+            return index, result
+
+        return await self._gather(upload, len(uploads), ordered)
+
+    async def replace(self, filename, photo_id, fileobj=None, timeout=None, **kwargs):
+        """Replace an existing photo.
+
+        Takes the same parameters as `FlickrAPI.replace`.
+        """
+
+        if not photo_id:
+            raise IllegalArgumentException("photo_id must be specified")
+
+        kwargs['photo_id'] = photo_id
+        rsp = await self._async_upload_to_form(self.REPLACE_URL, filename, fileobj,
+                                               timeout=timeout, **kwargs)
+        self._invalidate({'photo_id': photo_id})
+
+        return rsp
+
+    async def _async_upload_to_form(self, form_url, filename, fileobj=None, timeout=None, **kwargs):
+        """Uploads a photo - can be used to either upload a new photo
+        or replace an existing one.
+        """
+
+        response_format, kwargs = self._upload_params(filename, kwargs)
+        start_pos = fileobj.tell() if fileobj is not None and hasattr(fileobj, 'seek') else None
+
+        async def attempt():
+            await self._async_rate_limit()
+            # Rewind the file, in case this is a retry.
+            if start_pos is not None:
+                fileobj.seek(start_pos)
+            return await self.flickr_oauth.async_do_upload(filename, form_url, dict(kwargs),
+                                                           fileobj, timeout=timeout)
+
+        retry = self.retry_policy is not None and self.retry_policy.retry_uploads
+        if self.upload_journal is None:
+            data = await self._async_retrying(attempt, retry)
+            return self._parse_response(response_format, data)
+
+        # Same bookkeeping as FlickrAPI._journaled_upload().
+        entry, data = self._journal_start(filename, fileobj, kwargs)
+        if data is None:
+            try:
+                data = await self._async_retrying(attempt, retry)
+            except Exception as ex:
+                self.upload_journal.failed(*entry, error=ex)
+                raise
+            data = self._journal_finish(entry, data)
+
+        return self._parse_response(response_format, data)
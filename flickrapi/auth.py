@@ -17,13 +17,12 @@ except ImportError:
 import logging
 import random
 import os.path
-import sys
 
 from requests_toolbelt import MultipartEncoder
 import requests
 from requests_oauthlib import OAuth1
 
-from . import sockutil, exceptions, html
+from . import sockutil, exceptions, html, transport, cache
 from .exceptions import FlickrError
 
 
@@ -137,16 +136,44 @@ class FlickrAccessToken(object):
         return q_idx <= my_idx
 
 
+def _session_transport(session):
+    """Returns a transport that sends requests with the given requests.Session."""
+    return transport.RequestsTransport.from_session(session)
+
+
+class _SessionAttribute(object):
+    """The requests.Session of an OAuthFlickrInterface.
+
+    On the class this is the session of the default transport, so that
+    ``OAuthFlickrInterface.session`` can still be configured in place for
+    all instances, as before there were transports. On an instance it is
+    the session of its own transport.
+    """
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return owner.default_transport.session
+        return getattr(instance.transport, 'session', None)
+
+    def __set__(self, instance, session):
+        instance.transport = _session_transport(session)
+
+
 class OAuthFlickrInterface(object):
     """Interface object for handling OAuth-authenticated calls to Flickr."""
 
-    session = requests.Session()
+    # Transport shared by all instances that weren't given one, so that
+    # connections are reused between FlickrAPI instances.
+    default_transport = transport.RequestsTransport()
+
+    session = _SessionAttribute()
 
     REQUEST_TOKEN_URL = "https://www.flickr.com/services/oauth/request_token"
     AUTHORIZE_URL = "https://www.flickr.com/services/oauth/authorize"
     ACCESS_TOKEN_URL = "https://www.flickr.com/services/oauth/access_token"
 
-    def __init__(self, api_key, api_secret, oauth_token=None, default_timeout=None):
+    def __init__(self, api_key, api_secret, oauth_token=None, default_timeout=None,
+                 transport=None):
         self.log = logging.getLogger('%s.%s' % (self.__class__.__module__, self.__class__.__name__))
 
         assert isinstance(api_key, str), 'api_key must be unicode string'
@@ -164,6 +191,14 @@ class OAuthFlickrInterface(object):
         self.requested_permissions = None
         self.default_timeout = default_timeout
 
+        # Before there were transports, the session could be replaced by
+        # assigning ``OAuthFlickrInterface.session``; keep that working.
+        session = getattr(type(self), 'session')
+        if transport is None and session is not self.default_transport.session:
+            transport = _session_transport(session)
+
+        self.transport = transport or self.default_transport
+
     @property
     def key(self):
         """Returns the OAuth key"""
@@ -228,10 +263,7 @@ class OAuthFlickrInterface(object):
     def _find_cache_dir(self):
         """Returns the appropriate directory for the HTTP cache."""
 
-        if sys.platform.startswith('win'):
-            return os.path.expandvars('%APPDATA%/flickrapi/cache')
-
-        return os.path.expanduser('~/.flickrapi/cache')
+        return cache.default_cache_dir()
 
     def do_request(self, url, params=None, timeout=None):
         """Performs the HTTP request, signed with OAuth.
@@ -242,21 +274,47 @@ class OAuthFlickrInterface(object):
         @return: the response content
         """
 
-        req = self.session.post(url,
-                                data=params,
-                                auth=self.oauth,
-                                timeout=timeout or self.default_timeout)
+        req = self.transport.post(url,
+                                  data=params,
+                                  auth=self.oauth,
+                                  timeout=timeout or self.default_timeout)
 
         # check the response headers / status code.
+        self._check_status('do_request', req.status_code, req.text)
+
+        return req.content
+
+    def do_request_stream(self, url, params=None, timeout=None, chunk_size=16384):
+        """Performs the HTTP request, signed with OAuth, without reading the response.
+
+        The status code is checked before returning.
+
+        @return: generator of ``bytes`` chunks of the response content
+        """
+
+        req = self.transport.post(url,
+                                  data=params,
+                                  auth=self.oauth,
+                                  timeout=timeout or self.default_timeout,
+                                  stream=True)
+
         if req.status_code != 200:
-            self.log.error('do_request: Status code %i received, content:', req.status_code)
+            try:
+                self._check_status('do_request_stream', req.status_code, req.text)
+            finally:
+                req.close()
 
-            for part in req.text.split('&'):
-                self.log.error('    %s', urllib_parse.unquote(part))
+        return self._iter_response(req, chunk_size)
 
-            raise exceptions.FlickrError('do_request: Status code %s received' % req.status_code)
+    @staticmethod
+    def _iter_response(req, chunk_size):
+        """Generator, yields the response content in chunks, then closes it."""
 
-        return req.content
+        try:
+            for chunk in req.iter_content(chunk_size):
+                yield chunk
+        finally:
+            req.close()
 
     def do_upload(self, filename, url, params=None, fileobj=None, timeout=None):
         """Performs a file upload to the given URL with the given parameters, signed with OAuth.
@@ -267,6 +325,21 @@ class OAuthFlickrInterface(object):
         @return: the response content
         """
 
+        m, headers = self._prepare_upload(filename, url, params, fileobj)
+        req = self.transport.post(url, data=m, headers=headers,
+                                  timeout=timeout or self.default_timeout)
+
+        # check the response headers / status code.
+        self._check_status('do_upload', req.status_code, req.text)
+
+        return req.content
+
+    def _prepare_upload(self, filename, url, params, fileobj=None):
+        """Signs the upload and encodes it as multipart/form-data.
+
+        @return: tuple (MultipartEncoder, HTTP headers)
+        """
+
         # work-around to allow non-ascii characters in file name
         # Flickr doesn't store the name but does use it as a default title
         if 'title' not in params:
@@ -291,18 +364,26 @@ class OAuthFlickrInterface(object):
         auth = {'Authorization': headers.get('Authorization'),
                 'Content-Type': m.content_type}
         self.log.debug('POST %s', auth)
-        req = self.session.post(url, data=m, headers=auth, timeout=timeout or self.default_timeout)
 
-        # check the response headers / status code.
-        if req.status_code != 200:
-            self.log.error('do_upload: Status code %i received, content:', req.status_code)
+        return m, auth
 
-            for part in req.text.split('&'):
-                self.log.error('    %s', urllib_parse.unquote(part))
+    def _check_status(self, caller, status_code, text):
+        """Raises a FlickrHTTPError when the HTTP status code is not 200 OK.
 
-            raise exceptions.FlickrError('do_upload: Status code %s received' % req.status_code)
+        :param caller: name of the calling method, used in log and error messages.
+        :param text: the response body as text, logged on error.
+        """
 
-        return req.content
+        if status_code == 200:
+            return
+
+        self.log.error('%s: Status code %i received, content:', caller, status_code)
+
+        for part in text.split('&'):
+            self.log.error('    %s', urllib_parse.unquote(part))
+
+        raise exceptions.FlickrHTTPError('%s: Status code %s received' % (caller, status_code),
+                                         status_code=status_code)
 
     @staticmethod
     def parse_oauth_response(data):
@@ -0,0 +1,231 @@
+"""Parser backends for the parsed response formats.
+
+The fastest available backend is found once per process, the first time it
+is needed. A specific backend can be chosen per `FlickrAPI` instance::
+
+    flickr = flickrapi.FlickrAPI(api_key, api_secret, format='parsed-json')
+    flickr.json_backend = 'json'
+    flickr.etree_backend = 'etree'
+
+JSON backends, in order of preference:
+
+orjson
+    https://pypi.org/project/orjson/
+ujson
+    https://pypi.org/project/ujson/
+simdjson
+    https://pypi.org/project/pysimdjson/
+json
+    The standard library, always available.
+
+ElementTree backends, in order of preference:
+
+lxml
+    https://lxml.de/, with a parser that doesn't load DTDs, resolve
+    entities, access the network or track IDs.
+etree
+    The standard library's ``xml.etree.ElementTree``, which uses its C
+    accelerator when available, and is always available.
+
+Other backends can be added with `register_json_backend` and
+`register_etree_backend`.
+"""
+
+import collections
+import logging
+import threading
+
+LOG = logging.getLogger(__name__)
+
+__all__ = ('json_loads', 'register_json_backend', 'available_json_backends',
+           'etree_fromstring', 'register_etree_backend', 'available_etree_backends')
+
+
+class _Registry(object):
+    """Backends of one kind, and the functions they resolved to."""
+
+    def __init__(self, kind):
+        self.kind = kind
+        # Mapping from backend name to a function that imports the backend
+        # and returns its parse function, in order of preference.
+        self.factories = collections.OrderedDict()
+        # Cache of resolved backends; None is the key of the preferred backend.
+        self.resolved = {}
+        self.lock = threading.Lock()
+
+    def register(self, name, factory, preferred=False):
+        with self.lock:
+            self.factories[name] = factory
+            if preferred:
+                self.factories.move_to_end(name, last=False)
+            self.resolved.clear()
+
+    def get(self, name=None):
+        try:
+            return self.resolved[name]
+        except KeyError:
+            pass
+
+        with self.lock:
+            if name is None:
+                func = self._preferred()
+            else:
+                try:
+                    factory = self.factories[name]
+                except KeyError:
+                    raise ValueError('Unknown %s backend %r, choose from %s'
+                                     % (self.kind, name, ', '.join(self.factories)))
+                func = factory()
+            self.resolved[name] = func
+
+        return func
+
+    def _preferred(self):
+        for name, factory in self.factories.items():
+            try:
+                func = factory()
+            except ImportError:
+                continue
+
+            LOG.info('%s parser: using %s', self.kind, name)
+            return func
+
+        raise ImportError('No %s backend available' % self.kind)
+
+    def available(self):
+        names = []
+        for name, factory in list(self.factories.items()):
+            try:
+                factory()
+            except ImportError:
+                continue
+            names.append(name)
+        return names
+
+
+_json = _Registry('JSON')
+_etree = _Registry('ElementTree')
+
+
+def register_json_backend(name, factory, preferred=False):
+    """Registers a JSON backend.
+
+    factory
+        Function without arguments that returns a ``loads(data)`` function,
+        which takes the response as bytes and returns the parsed JSON.
+        It should raise ImportError if the backend is not available.
+    preferred
+        If True, the backend is preferred over the already registered ones.
+    """
+
+    _json.register(name, factory, preferred)
+
+
+def json_loads(name=None):
+    """Returns the ``loads(data)`` function of the named JSON backend.
+
+    If name is None, returns the one of the most preferred backend that is
+    available.
+
+    >>> loads = json_loads('json')
+    >>> loads(b'{"stat": "ok"}')
+    {'stat': 'ok'}
+    """
+
+    return _json.get(name)
+
+
+def available_json_backends():
+    """Returns the names of the JSON backends that can be imported."""
+    return _json.available()
+
+
+def register_etree_backend(name, factory, preferred=False):
+    """Registers an ElementTree backend.
+
+    factory
+        Function without arguments that returns a ``fromstring(data)``
+        function, which takes the response as bytes and returns the root
+        element. It should raise ImportError if the backend is not available.
+    preferred
+        If True, the backend is preferred over the already registered ones.
+    """
+
+    _etree.register(name, factory, preferred)
+
+
+def etree_fromstring(name=None):
+    """Returns the ``fromstring(data)`` function of the named ElementTree backend.
+
+    If name is None, returns the one of the most preferred backend that is
+    available.
+
+    >>> fromstring = etree_fromstring('etree')
+    >>> fromstring(b'<rsp stat="ok" />').get('stat')
+    'ok'
+    """
+
+    return _etree.get(name)
+
+
+def available_etree_backends():
+    """Returns the names of the ElementTree backends that can be imported."""
+    return _etree.available()
+
+
+def _orjson():
+    import orjson
+    return orjson.loads
+
+
+def _ujson():
+    import ujson
+    return ujson.loads
+
+
+def _simdjson():
+    import simdjson
+    return simdjson.loads
+
+
+def _stdlib_json():
+    import json
+
+    def loads(data):
+        # Python 3.5 only accepts text.
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+    return loads
+
+
+def _lxml():
+    from lxml import etree
+
+    # lxml parsers should not be shared between threads.
+    local = threading.local()
+
+    def fromstring(data):
+        try:
+            parser = local.parser
+        except AttributeError:
+            parser = local.parser = etree.XMLParser(load_dtd=False, resolve_entities=False,
+                                                    no_network=True, collect_ids=False)
+        return etree.fromstring(data, parser)
+
+    return fromstring
+
+
+def _stdlib_etree():
+    from xml.etree import ElementTree
+    return ElementTree.fromstring
+
+
+register_json_backend('orjson', _orjson)
+register_json_backend('ujson', _ujson)
+register_json_backend('simdjson', _simdjson)
+register_json_backend('json', _stdlib_json)
+
+register_etree_backend('lxml', _lxml)
+register_etree_backend('etree', _stdlib_etree)
@@ -0,0 +1,262 @@
+"""Helpers for uploading many files at once.
+
+There is no need to use this module directly, use
+`flickrapi.FlickrAPI.upload_many` instead. Its progress callback receives
+`UploadProgress` tuples::
+
+    def show_progress(progress):
+        print('%i/%i files, %.0f KiB/s, %s seconds left' % (
+            progress.files_done, progress.files_total,
+            progress.bytes_per_second / 1024, progress.eta))
+
+    results = flickr.upload_many(filenames, max_workers=4,
+                                 progress_callback=show_progress)
+"""
+
+import collections
+import io
+import logging
+import os
+import threading
+import time
+
+LOG = logging.getLogger(__name__)
+
+__all__ = ('UploadProgress', )
+
+UploadProgress = collections.namedtuple('UploadProgress', (
+    'bytes_sent',        # Bytes of all files sent so far
+    'bytes_total',       # Bytes of all files to send
+    'files_done',        # Number of finished uploads, including failed ones
+    'files_failed',      # Number of failed uploads
+    'files_total',       # Number of files to upload
+    'elapsed',           # Seconds since the uploads started
+    'bytes_per_second',  # Average upload speed
+    'eta',               # Estimated number of seconds left, or None if unknown
+))
+
+
+def remaining_size(fileobj):
+    """Returns the number of bytes between the current position and the
+    end of the file.
+    """
+
+    start = fileobj.tell()
+    try:
+        return os.fstat(fileobj.fileno()).st_size - start
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        pass
+
+    end = fileobj.seek(0, os.SEEK_END)
+    fileobj.seek(start)
+    return end - start
+
+
+def upload_size(filename, fileobj=None):
+    """Returns the number of bytes to upload, or 0 if that can't be determined."""
+
+    try:
+        if fileobj is None:
+            return os.path.getsize(filename)
+        return remaining_size(fileobj)
+    except (OSError, TypeError, ValueError):
+        return 0
+
+
+def upload_item(item):
+    """Returns the (filename, fileobj, kwargs) of an item passed to upload_many().
+
+    Items are filenames, file objects with a ``name`` attribute, or dicts
+    of `flickrapi.FlickrAPI.upload` arguments.
+    """
+
+    if isinstance(item, dict):
+        kwargs = dict(item)
+        fileobj = kwargs.pop('fileobj', None)
+        filename = kwargs.pop('filename', None) or getattr(fileobj, 'name', None)
+        return filename, fileobj, kwargs
+
+    if hasattr(item, 'read'):
+        return getattr(item, 'name', None), item, {}
+
+    return item, None, {}
+
+
+class ProgressTracker(object):
+    """Aggregates the progress of concurrent uploads.
+
+    The callback is called with an `UploadProgress` whenever an upload
+    finishes, and at most once every ``interval`` seconds while data is
+    sent. It is called from the upload threads, but never by two threads
+    at the same time.
+    """
+
+    def __init__(self, callback, files_total, bytes_total, interval=0.5):
+        self.callback = callback
+        self.interval = interval
+
+        self.files_total = files_total
+        self.bytes_total = bytes_total
+        self.files_done = 0
+        self.files_failed = 0
+        self.bytes_sent = 0
+
+        self._started = time.monotonic()
+        self._reported = 0.0
+        self._lock = threading.Lock()
+
+    def sent(self, nbytes):
+        """Registers that nbytes were sent; negative after rewinding a file."""
+
+        with self._lock:
+            self.bytes_sent += nbytes
+
+            now = time.monotonic()
+            if now - self._reported >= self.interval:
+                self._report(now)
+
+    def done(self, failed=False, unsent=0):
+        """Registers that an upload finished.
+
+        ``unsent`` is the number of bytes of the file that weren't sent
+        because the upload failed.
+        """
+
+        with self._lock:
+            self.files_done += 1
+            if failed:
+                self.files_failed += 1
+            self.bytes_total -= unsent
+
+            self._report(time.monotonic())
+
+    def snapshot(self, now=None):
+        """Returns the current progress as `UploadProgress`."""
+
+        if now is None:
+            now = time.monotonic()
+        elapsed = now - self._started
+
+        rate = self.bytes_sent / elapsed if elapsed > 0 else 0.0
+        if rate > 0:
+            eta = max(0.0, (self.bytes_total - self.bytes_sent) / rate)
+        elif self.files_done == self.files_total:
+            eta = 0.0
+        else:
+            eta = None
+
+        return UploadProgress(self.bytes_sent, self.bytes_total, self.files_done,
+                              self.files_failed, self.files_total, elapsed, rate, eta)
+
+    def _report(self, now):
+        self._reported = now
+        if self.callback is None:
+            return
+
+        try:
+            self.callback(self.snapshot(now))
+        except Exception:
+            # Don't let a broken callback abort the upload.
+            LOG.exception('Error in upload progress callback')
+
+
+class ByteBudget(object):
+    """Limits the number of bytes of the uploads in flight.
+
+    A file that is larger than the budget can still be uploaded, but only
+    when no other upload is in flight. A budget of None is unlimited.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, nbytes):
+        """Waits until nbytes fit in the budget, and takes them."""
+
+        with self._cond:
+            if self.max_bytes is not None:
+                while self.in_flight and self.in_flight + nbytes > self.max_bytes:
+                    self._cond.wait()
+            self.in_flight += nbytes
+
+    def release(self, nbytes):
+        with self._cond:
+            self.in_flight -= nbytes
+            self._cond.notify_all()
+
+
+class AsyncByteBudget(object):
+    """Asyncio version of `ByteBudget`, for `flickrapi.AsyncFlickrAPI.upload_many`."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.in_flight = 0
+        self._cond = None
+
+    def _condition(self):
+        # Created lazily, so that it belongs to the running event loop.
+        if self._cond is None:
+            import asyncio
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    async def acquire(self, nbytes):
+        """Waits until nbytes fit in the budget, and takes them."""
+
+        cond = self._condition()
+        async with cond:
+            if self.max_bytes is not None:
+                while self.in_flight and self.in_flight + nbytes > self.max_bytes:
+                    await cond.wait()
+            self.in_flight += nbytes
+
+    async def release(self, nbytes):
+        cond = self._condition()
+        async with cond:
+            self.in_flight -= nbytes
+            cond.notify_all()
+
+
+class ProgressFile(object):
+    """File-like object that reports the bytes read from a file.
+
+    ``on_read(nbytes)`` is called after every read, and with a negative
+    number when the file is rewound for a retry. The ``len`` attribute is
+    the number of bytes left, as expected by the multipart encoder.
+
+    ``digest`` is the content hash for the upload journal, computed before
+    wrapping the file so that hashing it isn't reported as progress.
+    """
+
+    def __init__(self, fileobj, on_read, size=None, digest=None):
+        self.file = fileobj
+        self.on_read = on_read
+        self.digest = digest
+        self.start = fileobj.tell()
+        self.size = remaining_size(fileobj) if size is None else size
+        self.pos = 0
+
+    @property
+    def len(self):
+        return self.size - self.pos
+
+    def read(self, size=-1):
+        data = self.file.read(size)
+        if data:
+            self.pos += len(data)
+            self.on_read(len(data))
+        return data
+
+    def tell(self):
+        return self.file.tell()
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        result = self.file.seek(offset, whence)
+
+        pos = self.file.tell() - self.start
+        if pos != self.pos:
+            self.on_read(pos - self.pos)
+            self.pos = pos
+        return result
@@ -9,8 +9,244 @@ thanks to those guys for designing a simple and effective cache!
 .. _`Django low-level cache API`: https://docs.djangoproject.com/en/dev/topics/cache/#the-low-level-cache-api
 """
 
+import collections
+import copy
+import gc
+import hashlib
+import heapq
+import logging
+import os
+import os.path
+import pickle
+import sys
 import threading
 import time
+import types
+
+from flickrapi.exceptions import CacheDatabaseError, FlickrError, FlickrHTTPError
+from flickrapi.records import RecordPage
+from flickrapi.xmlnode import XMLNode
+
+LOG = logging.getLogger(__name__)
+
+# Parameters that differ between otherwise identical calls, and thus
+# should not be part of the cache key.
+VOLATILE_PARAMS = frozenset(['api_sig'])
+
+# Parameters that identify the objects a call reads or modifies. A
+# successful write evicts the cached calls with the same value for any
+# of these parameters.
+INVALIDATION_PARAMS = ('photo_id', 'photoset_id', 'user_id')
+
+# Number of bytes at the start of a response that contain its status.
+ERROR_STATUS_LENGTH = 256
+
+
+def cache_key(params):
+    """Returns a canonical cache key for the parameters of an API call.
+
+    The key doesn't depend on the order of the parameters, or on whether
+    values are passed as text, bytes or numbers. OAuth parameters are
+    ignored; the request format is not, as a JSON response differs from an
+    XML one. The key is the method name followed by a hash of the other
+    parameters:
+
+    >>> cache_key({'method': 'flickr.photos.getInfo', 'photo_id': 1234})
+    'flickr.photos.getInfo:f282f19fa9996f94aefadfe338e99c0a134ce88d'
+    >>> cache_key({'photo_id': b'1234', 'method': 'flickr.photos.getInfo'})
+    'flickr.photos.getInfo:f282f19fa9996f94aefadfe338e99c0a134ce88d'
+    """
+
+    items = []
+    method = ''
+    for name, value in params.items():
+        if name == 'method':
+            method = value
+            continue
+        if name in VOLATILE_PARAMS or name.startswith('oauth_'):
+            continue
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        items.append((name, str(value)))
+
+    items.sort()
+    digest = hashlib.sha1(repr(items).encode('utf-8')).hexdigest()
+
+    return '%s:%s' % (method, digest)
+
+
+def is_error_response(reply):
+    """Returns True iff the unparsed response is a Flickr error response.
+
+    Such responses are not cached, as the error may be transient. Only the
+    start of the response is inspected, as that is where Flickr puts the
+    status of both XML and JSON error responses:
+
+    >>> is_error_response(b'<rsp stat="fail"><err code="1" msg="Photo not found" /></rsp>')
+    True
+    >>> is_error_response(b'{"stat":"fail","code":1,"message":"Photo not found"}')
+    True
+    >>> is_error_response(b'<rsp stat="ok"><photo id="1234" /></rsp>')
+    False
+    """
+
+    head = reply[:ERROR_STATUS_LENGTH]
+    if isinstance(head, str):
+        head = head.encode('utf-8')
+    return b'stat="fail"' in head or b'"stat":"fail"' in head
+
+
+def invalidation_tags(params):
+    """Returns the ``(name, value)`` tags of the objects a call refers to.
+
+    The comma-separated ``photo_ids`` parameter results in one ``photo_id``
+    tag per photo:
+
+    >>> invalidation_tags({'method': 'flickr.photosets.editPhotos',
+    ...                    'photoset_id': 5, 'photo_ids': '1,2'})
+    [('photoset_id', '5'), ('photo_id', '1'), ('photo_id', '2')]
+    """
+
+    tags = []
+    for name in INVALIDATION_PARAMS:
+        value = params.get(name)
+        if value is None:
+            continue
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        tags.append((name, str(value)))
+
+    photo_ids = params.get('photo_ids')
+    if photo_ids:
+        if isinstance(photo_ids, bytes):
+            photo_ids = photo_ids.decode('utf-8')
+        tags.extend(('photo_id', photo_id.strip())
+                    for photo_id in str(photo_ids).split(',') if photo_id.strip())
+
+    return tags
+
+
+def default_cache_dir():
+    """Returns the appropriate directory for on-disk caches."""
+
+    if sys.platform.startswith('win'):
+        return os.path.expandvars('%APPDATA%/flickrapi/cache')
+
+    return os.path.expanduser('~/.flickrapi/cache')
+
+
+def _normalise_key(key):
+    """Returns the key under which a cache entry is stored.
+
+    Dictionaries of API call parameters are converted with `cache_key`,
+    text is used as-is, and anything else is converted with ``repr()``.
+    """
+
+    if isinstance(key, str):
+        return key
+    if isinstance(key, dict):
+        return cache_key(key)
+    return repr(key)
+
+
+class CacheStats(object):
+    """Hit, miss and eviction counters of a cache.
+
+    The counters are updated by the cache while it holds its lock. Use the
+    ``snapshot()`` method of the cache to read them, and its ``reset()``
+    method to reset them, for example after exporting them to a metrics
+    system.
+
+    Hits and misses are also counted per Flickr API method, which is taken
+    from the cache key (see `cache_key`), also for the keys of
+    `NegativeCache`.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Resets all counters to zero."""
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.lock_wait = 0.0
+        # Mapping from method name to [hits, misses].
+        self.methods = {}
+
+    def hit(self, key):
+        """Counts a cache hit for the key."""
+        self.hits += 1
+        self._method_counts(key)[0] += 1
+
+    def miss(self, key):
+        """Counts a cache miss for the key."""
+        self.misses += 1
+        self._method_counts(key)[1] += 1
+
+    def _method_counts(self, key):
+        # Keys are 'method:hash', or 'error:method:hash' for cached errors.
+        method = key.rsplit(':', 2)[-2] if ':' in key else ''
+        counts = self.methods.get(method)
+        if counts is None:
+            counts = self.methods[method] = [0, 0]
+        return counts
+
+    def snapshot(self, **gauges):
+        """Returns the counters as a dictionary.
+
+        Keyword arguments, such as the current number of entries, are
+        included in the dictionary as-is.
+        """
+
+        methods = {}
+        for method, (hits, misses) in self.methods.items():
+            methods[method] = {'hits': hits,
+                               'misses': misses,
+                               'hit_ratio': _ratio(hits, misses)}
+
+        snapshot = {'hits': self.hits,
+                    'misses': self.misses,
+                    'hit_ratio': _ratio(self.hits, self.misses),
+                    'expirations': self.expirations,
+                    'evictions': self.evictions,
+                    'lock_wait': self.lock_wait,
+                    'methods': methods}
+        snapshot.update(gauges)
+        return snapshot
+
+
+def _ratio(hits, misses):
+    """Returns the hit ratio, or None if there were no lookups."""
+
+    if not hits and not misses:
+        return None
+    return hits / float(hits + misses)
+
+
+class _TimedLock(object):
+    """Lock that adds the time spent waiting for it to ``stats.lock_wait``."""
+
+    def __init__(self, lock, stats):
+        self._lock = lock
+        self._stats = stats
+
+    def acquire(self):
+        start = time.perf_counter()
+        self._lock.acquire()
+        self._stats.lock_wait += time.perf_counter() - start
+
+    def release(self):
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._lock.release()
 
 
 class SimpleCache(object):
@@ -23,7 +259,8 @@ class SimpleCache(object):
     def __init__(self, timeout=300, max_entries=200):
         self.storage = {}
         self.expire_info = {}
-        self.lock = threading.RLock()
+        self.stats = CacheStats()
+        self.lock = _TimedLock(threading.RLock(), self.stats)
         self.default_timeout = timeout
         self.max_entries = max_entries
         self.cull_frequency = 3
@@ -46,15 +283,20 @@ class SimpleCache(object):
         default, which itself defaults to None.
         """
 
+        key = _normalise_key(key)
         now = time.time()
-        exp = self.expire_info.get(repr(key))
+        exp = self.expire_info.get(key)
         if exp is None:
+            self.stats.miss(key)
             return default
         elif exp < now:
-            self.delete(repr(key))
+            self.delete(key)
+            self.stats.expirations += 1
+            self.stats.miss(key)
             return default
 
-        return self.storage[repr(key)]
+        self.stats.hit(key)
+        return self.storage[key]
 
     @locking
     def set(self, key, value, timeout=None):
@@ -62,17 +304,19 @@ class SimpleCache(object):
         used for the key; otherwise the default cache timeout will be used.
         """
 
+        key = _normalise_key(key)
         if len(self.storage) >= self.max_entries:
             self.cull()
         if timeout is None:
             timeout = self.default_timeout
-        self.storage[repr(key)] = value
-        self.expire_info[repr(key)] = time.time() + timeout
+        self.storage[key] = value
+        self.expire_info[key] = time.time() + timeout
 
     @locking
     def delete(self, key):
         """Deletes a key from the cache, failing silently if it doesn't exist."""
 
+        key = _normalise_key(key)
         if key in self.storage:
             del self.storage[key]
         if key in self.expire_info:
@@ -81,12 +325,12 @@ class SimpleCache(object):
     @locking
     def has_key(self, key):
         """Returns True if the key is in the cache and has not expired."""
-        return self.get(repr(key)) is not None
+        return self.get(key) is not None
 
     @locking
     def __contains__(self, key):
         """Returns True if the key is in the cache and has not expired."""
-        return self.has_key(repr(key))
+        return self.has_key(key)
 
     @locking
     def cull(self):
@@ -96,11 +340,748 @@ class SimpleCache(object):
                 if i % self.cull_frequency == 0]
         for k in doomed:
             self.delete(k)
+        self.stats.evictions += len(doomed)
+
+    @locking
+    def __len__(self):
+        """Returns the number of cached items that have not expired."""
+
+        now = time.time()
+        return sum(1 for exp in self.expire_info.values() if exp >= now)
 
     @locking
+    def snapshot(self):
+        """Returns the cache statistics, see `CacheStats`."""
+
+        return self.stats.snapshot(entries=len(self))
+
+    @locking
+    def reset_stats(self):
+        """Resets the cache statistics to zero."""
+        self.stats.reset()
+
+
+class LRUCache(object):
+    """Least-recently-used response cache for FlickrAPI calls.
+
+    Has the same interface as `SimpleCache`, but when it is full it evicts
+    the least recently used entry, and expired entries are removed as soon
+    as they expire. All operations take constant (amortised logarithmic
+    for expiry) time.
+
+    This stores max 50 entries, timing them out after 120 seconds:
+    >>> cache = LRUCache(timeout=120, max_entries=50)
+
+    When ``stale_after`` is given, entries older than that many seconds are
+    stale: they are still returned until they time out, but `lookup` reports
+    them as stale, so that they can be refreshed in the background. This
+    serves entries for 5 minutes, but refreshes them after 1 minute:
+    >>> cache = LRUCache(timeout=300, stale_after=60)
+
+    The cache can also be bounded by the total size of its entries, and
+    compress responses of at least ``compress_min_size`` bytes with
+    ``'zlib'`` or ``'lz4'`` (which requires the lz4 package). This stores
+    up to 256 MiB of compressed responses:
+    >>> cache = LRUCache(max_entries=None, max_bytes=256 * 2 ** 20, compress='zlib')
+    """
+
+    def __init__(self, timeout=300, max_entries=200, stale_after=None,
+                 max_bytes=None, compress=None, compress_min_size=1024):
+        # Mapping from key to (value, expiry time, stale time, size, compressed),
+        # in order of use.
+        self.storage = collections.OrderedDict()
+        # Heap of (expiry time, key); may contain outdated items, which
+        # are skipped when their expiry time doesn't match the storage.
+        self.expiry_heap = []
+        self.stats = CacheStats()
+        self.lock = _TimedLock(threading.Lock(), self.stats)
+        self.default_timeout = timeout
+        self.max_entries = max_entries
+        self.stale_after = stale_after
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.compress_min_size = compress_min_size
+        self._compress, self._decompress = _compressor(compress)
+
+    def get(self, key, default=None):
+        """Fetch a given key from the cache. If the key does not exist, return
+        default, which itself defaults to None.
+        """
+
+        return self.lookup(key, default)[0]
+
+    def lookup(self, key, default=None):
+        """Fetch a given key from the cache, and whether it is stale.
+
+        Returns a tuple ``(value, stale)``. If the key does not exist, returns
+        ``(default, False)``.
+        """
+
+        key = _normalise_key(key)
+        now = time.time()
+
+        with self.lock:
+            entry = self.storage.get(key)
+            if entry is None:
+                self.stats.miss(key)
+                return default, False
+            if entry[1] < now:
+                self._remove(key)
+                self.stats.expirations += 1
+                self.stats.miss(key)
+                return default, False
+
+            self.storage.move_to_end(key)
+            self.stats.hit(key)
+
+        value = entry[0]
+        if entry[4]:
+            value = self._decompress(value)
+        return value, entry[2] < now
+
+    def set(self, key, value, timeout=None):
+        """Set a value in the cache. If timeout is given, that timeout will be
+        used for the key; otherwise the default cache timeout will be used.
+        """
+
+        key = _normalise_key(key)
+        if timeout is None:
+            timeout = self.default_timeout
+        now = time.time()
+        expires = now + timeout
+        if self.stale_after is None:
+            stale = expires
+        else:
+            stale = min(expires, now + self.stale_after)
+
+        compressed = False
+        if self._compress is not None and isinstance(value, bytes) \
+                and len(value) >= self.compress_min_size:
+            value = self._compress(value)
+            compressed = True
+        # Parsed responses are only measured in full when the size matters.
+        size = _entry_size(value, deep=self.max_bytes is not None)
+
+        with self.lock:
+            self._purge_expired(now)
+            self._remove(key)
+
+            if self.max_bytes is not None and size > self.max_bytes:
+                LOG.debug('Not caching %s, its %d bytes exceed the cache size', key, size)
+                return
+
+            self.storage[key] = (value, expires, stale, size, compressed)
+            self.size += size
+            heapq.heappush(self.expiry_heap, (expires, key))
+
+            while (self.max_entries is not None and len(self.storage) > self.max_entries) or \
+                    (self.max_bytes is not None and self.size > self.max_bytes):
+                self.size -= self.storage.popitem(last=False)[1][3]
+                self.stats.evictions += 1
+
+            # Don't let outdated heap items pile up.
+            if len(self.expiry_heap) > 2 * len(self.storage) + 16:
+                self.expiry_heap = [(entry[1], k) for k, entry in self.storage.items()]
+                heapq.heapify(self.expiry_heap)
+
+    def delete(self, key):
+        """Deletes a key from the cache, failing silently if it doesn't exist."""
+
+        key = _normalise_key(key)
+        with self.lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        """Removes the key if it exists. The caller must hold the lock."""
+
+        entry = self.storage.pop(key, None)
+        if entry is not None:
+            self.size -= entry[3]
+
+    def has_key(self, key):
+        """Returns True if the key is in the cache and has not expired."""
+        return self.get(key) is not None
+
+    def __contains__(self, key):
+        """Returns True if the key is in the cache and has not expired."""
+        return self.has_key(key)
+
+    def clear(self):
+        """Removes all entries from the cache."""
+
+        with self.lock:
+            self.storage.clear()
+            self.expiry_heap = []
+            self.size = 0
+
+    def purge_expired(self):
+        """Removes all expired entries from the cache."""
+
+        with self.lock:
+            self._purge_expired(time.time())
+
+    def _purge_expired(self, now):
+        """Removes all expired entries. The caller must hold the lock."""
+
+        heap = self.expiry_heap
+        while heap and heap[0][0] < now:
+            expires, key = heapq.heappop(heap)
+            entry = self.storage.get(key)
+            if entry is not None and entry[1] == expires:
+                self._remove(key)
+                self.stats.expirations += 1
+
     def __len__(self):
-        """Returns the number of cached items -- they might be expired
-        though.
+        """Returns the number of cached items that have not expired."""
+
+        with self.lock:
+            self._purge_expired(time.time())
+            return len(self.storage)
+
+    def snapshot(self):
+        """Returns the cache statistics, see `CacheStats`.
+
+        Besides the counters, the dictionary contains the number of
+        ``entries`` and their total size in ``bytes``. Values other than
+        bytes and text, such as parsed responses, are only measured in
+        full when ``max_bytes`` is set.
         """
 
-        return len(self.storage)
+        with self.lock:
+            self._purge_expired(time.time())
+            return self.stats.snapshot(entries=len(self.storage), bytes=self.size)
+
+    def reset_stats(self):
+        """Resets the cache statistics to zero."""
+
+        with self.lock:
+            self.stats.reset()
+
+
+def _compressor(name):
+    """Returns the (compress, decompress) functions for the compression name.
+
+    Returns (None, None) when name is None.
+    """
+
+    if name is None:
+        return None, None
+    if name == 'zlib':
+        import zlib
+        return zlib.compress, zlib.decompress
+    if name == 'lz4':
+        import lz4.frame
+        return lz4.frame.compress, lz4.frame.decompress
+
+    raise ValueError('Unknown compression %r, use "zlib" or "lz4"' % name)
+
+
+def _entry_size(value, deep=True):
+    """Returns the approximate size of a cached value, in bytes.
+
+    Measuring a parsed response takes a few times longer than parsing it,
+    so with ``deep=False`` only the outermost object of values other than
+    bytes and text is measured.
+    """
+
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, tuple):
+        return sum(_entry_size(item, deep) for item in value)
+    if deep:
+        return _deep_size(value)
+    return sys.getsizeof(value)
+
+
+# Objects that are shared by many values, and so not counted in their size.
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType)
+
+
+def _deep_size(value):
+    """Returns the approximate memory used by an object and the objects it
+    refers to, such as a parsed response, in bytes.
+
+    Objects referred to more than once are counted once. lxml elements
+    keep their tree outside of Python objects, so for those the size of
+    the serialised tree is used as an estimate.
+    """
+
+    size = 0
+    seen = set()
+    pending = [value]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+
+        if type(obj).__module__ == 'lxml.etree' and hasattr(obj, 'getroottree'):
+            from lxml import etree
+            size += len(etree.tostring(obj))
+            continue
+
+        size += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+
+    return size
+
+
+class SQLiteCache(object):
+    """Persistent response cache for FlickrAPI calls, stored in SQLite.
+
+    Has the same interface as `SimpleCache`, but survives restarts, and can
+    be shared by multiple processes on the same host. Values that are not
+    bytes are pickled, so only use cache files you trust.
+
+    This stores max 10000 entries in the default location, timing them out
+    after a day:
+    >>> cache = SQLiteCache(timeout=86400, max_entries=10000)  # doctest: +SKIP
+    """
+
+    DB_VERSION = 1
+
+    def __init__(self, filename=None, timeout=300, max_entries=10000, cull_interval=100):
+        """Creates a new cache.
+
+        filename
+            The SQLite database file. Defaults to ``responses.sqlite`` in
+            the cache directory, ``~/.flickrapi/cache``.
+        timeout
+            Default timeout of entries, in seconds.
+        max_entries
+            The maximum number of entries; when there are more, the entries
+            that expire first are removed.
+        cull_interval
+            Expired and surplus entries are removed once every this many
+            calls to `set`, as counting the entries takes time.
+        """
+
+        if filename is None:
+            path = default_cache_dir()
+            if not os.path.exists(path):
+                os.makedirs(path)
+            filename = os.path.join(path, 'responses.sqlite')
+
+        self.filename = filename
+        self.default_timeout = timeout
+        self.max_entries = max_entries
+        self.cull_interval = cull_interval
+
+        self._local = threading.local()
+        self._sets_lock = threading.Lock()
+        self._sets_since_cull = 0
+        # Statistics of this process only; they are not stored in the database.
+        self.stats = CacheStats()
+        self.lock = _TimedLock(threading.Lock(), self.stats)
+
+        self.create_table()
+
+    @property
+    def db(self):
+        """Returns the database connection for the current thread and process."""
+
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            import sqlite3
+
+            # isolation_level=None gives us autocommit, so that readers
+            # never hold on to a lock.
+            db = sqlite3.connect(self.filename, timeout=30, isolation_level=None)
+            self._local.db = db
+            self._local.pid = os.getpid()
+
+        return db
+
+    def create_table(self):
+        """Creates the DB table, if it doesn't exist already."""
+
+        db = self.db
+        # Write-ahead logging allows readers and a writer at the same time.
+        db.execute('PRAGMA journal_mode=WAL')
+
+        version = db.execute('PRAGMA user_version').fetchone()[0]
+        if version == 0:
+            db.execute('PRAGMA user_version=%i' % self.DB_VERSION)
+        elif version != self.DB_VERSION:
+            raise CacheDatabaseError('Unsupported database version %s' % version)
+
+        db.execute('''CREATE TABLE IF NOT EXISTS responses (
+                      key varchar(255) not null PRIMARY KEY,
+                      value blob not null,
+                      pickled int not null,
+                      expires real not null)''')
+        db.execute('CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires)')
+
+    def get(self, key, default=None):
+        """Fetch a given key from the cache. If the key does not exist, return
+        default, which itself defaults to None.
+        """
+
+        key = _normalise_key(key)
+        row = self.db.execute('SELECT value, pickled, expires FROM responses WHERE key=?',
+                              (key,)).fetchone()
+        if row is None:
+            with self.lock:
+                self.stats.miss(key)
+            return default
+
+        value, pickled, expires = row
+        if expires < time.time():
+            self.delete(key)
+            with self.lock:
+                self.stats.expirations += 1
+                self.stats.miss(key)
+            return default
+
+        with self.lock:
+            self.stats.hit(key)
+        if pickled:
+            return pickle.loads(value)
+        return bytes(value)
+
+    def set(self, key, value, timeout=None):
+        """Set a value in the cache. If timeout is given, that timeout will be
+        used for the key; otherwise the default cache timeout will be used.
+        """
+
+        if timeout is None:
+            timeout = self.default_timeout
+
+        pickled = not isinstance(value, bytes)
+        if pickled:
+            value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+        import sqlite3
+
+        self.db.execute('INSERT OR REPLACE INTO responses (key, value, pickled, expires) '
+                        'VALUES (?, ?, ?, ?)',
+                        (_normalise_key(key), sqlite3.Binary(value), int(pickled),
+                         time.time() + timeout))
+
+        with self._sets_lock:
+            self._sets_since_cull += 1
+            cull = self._sets_since_cull >= self.cull_interval
+            if cull:
+                self._sets_since_cull = 0
+        if cull:
+            self.cull()
+
+    def delete(self, key):
+        """Deletes a key from the cache, failing silently if it doesn't exist."""
+
+        self.db.execute('DELETE FROM responses WHERE key=?', (_normalise_key(key),))
+
+    def has_key(self, key):
+        """Returns True if the key is in the cache and has not expired."""
+        return self.get(key) is not None
+
+    def __contains__(self, key):
+        """Returns True if the key is in the cache and has not expired."""
+        return self.has_key(key)
+
+    def clear(self):
+        """Removes all entries from the cache."""
+
+        self.db.execute('DELETE FROM responses')
+
+    def cull(self):
+        """Removes expired entries, and the entries that expire first
+        when there are more than ``max_entries``.
+        """
+
+        db = self.db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            expired = db.execute('DELETE FROM responses WHERE expires<?',
+                                 (time.time(),)).rowcount
+            count = db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            surplus = max(0, count - self.max_entries)
+            if surplus:
+                LOG.debug('Removing %i entries from %s', surplus, self.filename)
+                db.execute('DELETE FROM responses WHERE key IN '
+                           '(SELECT key FROM responses ORDER BY expires LIMIT ?)', (surplus,))
+            db.execute('COMMIT')
+        except Exception:
+            db.execute('ROLLBACK')
+            raise
+
+        with self.lock:
+            self.stats.expirations += expired
+            self.stats.evictions += surplus
+
+    def __len__(self):
+        """Returns the number of cached items that have not expired."""
+
+        return self.db.execute('SELECT COUNT(*) FROM responses WHERE expires>=?',
+                               (time.time(),)).fetchone()[0]
+
+    def snapshot(self):
+        """Returns the cache statistics of this process, see `CacheStats`."""
+
+        entries = len(self)
+        with self.lock:
+            return self.stats.snapshot(entries=entries)
+
+    def reset_stats(self):
+        """Resets the cache statistics to zero."""
+
+        with self.lock:
+            self.stats.reset()
+
+
+class ParsedCache(object):
+    """Cache of parsed responses, so that a cache hit doesn't need parsing.
+
+    Wraps another cache, such as an `LRUCache`, that stores the entries.
+    Parsed responses are mutable, so by default every caller gets its own
+    copy, made in the cheapest way for the response format:
+
+    - `flickrapi.records.RecordPage` lists are copied, but their records
+      are immutable and shared;
+    - `flickrapi.xmlnode.XMLNode` trees and parsed JSON are stored pickled,
+      and unpickled on every hit;
+    - ElementTree elements are deep-copied. This is much faster than
+      parsing with ``xml.etree``, but about as slow as parsing with lxml.
+
+    Pass ``copy=False`` to return the cached objects themselves, which is
+    faster still, but then callers must never modify a parsed response.
+    See ``benchmarks/parsed_cache.py`` for the numbers.
+
+    >>> cache = ParsedCache(LRUCache(timeout=120, max_entries=50))
+    """
+
+    def __init__(self, cache=None, copy=True):
+        self.cache = LRUCache() if cache is None else cache
+        self.copy = copy
+        self.stats = CacheStats()
+        self.lock = _TimedLock(threading.Lock(), self.stats)
+
+    def get(self, key, default=None):
+        """Returns a (copy of the) cached parsed response, or default."""
+
+        entry = self.cache.get(key)
+        with self.lock:
+            if entry is None:
+                self.stats.miss(_normalise_key(key))
+                return default
+            self.stats.hit(_normalise_key(key))
+
+        how, value = entry
+        if how == 'pickle':
+            return pickle.loads(value)
+        if how == 'shallow':
+            return copy.copy(value)
+        if how == 'deepcopy':
+            return copy.deepcopy(value)
+        return value
+
+    def set(self, key, value, timeout=None):
+        """Stores a (copy of the) parsed response in the cache."""
+
+        if not self.copy:
+            entry = (None, value)
+        elif isinstance(value, RecordPage):
+            entry = ('shallow', copy.copy(value))
+        elif isinstance(value, (dict, list, XMLNode)):
+            entry = ('pickle', pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        else:
+            entry = ('deepcopy', copy.deepcopy(value))
+
+        self.cache.set(key, entry, timeout)
+
+    def delete(self, key):
+        """Deletes a key from the cache, failing silently if it doesn't exist."""
+        self.cache.delete(key)
+
+    def has_key(self, key):
+        """Returns True if the key is in the cache and has not expired."""
+        return self.cache.get(key) is not None
+
+    def __contains__(self, key):
+        """Returns True if the key is in the cache and has not expired."""
+        return self.has_key(key)
+
+    def __len__(self):
+        """Returns the number of cached items."""
+        return len(self.cache)
+
+    def snapshot(self):
+        """Returns the cache statistics, see `CacheStats`."""
+
+        entries = len(self)
+        with self.lock:
+            return self.stats.snapshot(entries=entries)
+
+    def reset_stats(self):
+        """Resets the cache statistics to zero."""
+
+        with self.lock:
+            self.stats.reset()
+
+
+class InvalidationIndex(object):
+    """Secondary index from photo, photoset and user IDs to cache keys.
+
+    Used by `FlickrAPI` to evict the cached calls that refer to an object
+    when that object is modified. See `INVALIDATION_PARAMS`.
+
+    The index holds at most ``max_keys`` keys, counting a key once per tag.
+    When it is full, the least
+    recently used tags are forgotten; `add` returns their keys, so that
+    they can be evicted from the cache as well.
+    """
+
+    def __init__(self, max_keys=100000):
+        # Mapping from tag to set of cache keys, in order of use.
+        self.tags = collections.OrderedDict()
+        self.size = 0
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+
+    def add(self, key, params):
+        """Adds the cache key of a call with the given parameters.
+
+        Returns the list of keys that were forgotten to make room.
+        """
+
+        tags = invalidation_tags(params)
+        if not tags:
+            return []
+
+        forgotten = []
+        with self.lock:
+            for tag in tags:
+                keys = self.tags.get(tag)
+                if keys is None:
+                    keys = self.tags[tag] = set()
+                else:
+                    self.tags.move_to_end(tag)
+                if key not in keys:
+                    keys.add(key)
+                    self.size += 1
+
+            while self.size > self.max_keys and len(self.tags) > 1:
+                keys = self.tags.popitem(last=False)[1]
+                self.size -= len(keys)
+                forgotten.extend(keys)
+
+        return forgotten
+
+    def pop(self, params):
+        """Removes and returns the keys of calls that share a tag with params."""
+
+        keys = set()
+        with self.lock:
+            for tag in invalidation_tags(params):
+                tagged = self.tags.pop(tag, ())
+                self.size -= len(tagged)
+                keys.update(tagged)
+
+        return keys
+
+    def clear(self):
+        """Removes all keys from the index."""
+
+        with self.lock:
+            self.tags.clear()
+            self.size = 0
+
+    def __len__(self):
+        """Returns the number of keys in the index."""
+        return self.size
+
+
+class NegativeCache(object):
+    """Cache of deterministic Flickr errors.
+
+    Calls that fail with one of the given Flickr error codes, such as
+    code 1 ("Photo not found") for a deleted or private photo, are
+    remembered for ``timeout`` seconds. Performing the same call again
+    within that time raises the same `FlickrError`, without calling Flickr.
+
+    HTTP errors and other transient failures are never cached.
+
+    >>> cache = NegativeCache(codes=(1, 2), timeout=60)
+    """
+
+    # Prefix of the keys of cached errors.
+    KEY_PREFIX = 'error:'
+
+    def __init__(self, codes=(1,), timeout=60, cache=None):
+        """Creates a new negative cache.
+
+        codes
+            The Flickr error codes that are cached.
+        timeout
+            The number of seconds an error is cached.
+        cache
+            The cache that stores the errors; defaults to an `LRUCache`.
+        """
+
+        self.codes = frozenset(int(code) for code in codes)
+        self.timeout = timeout
+        self.cache = LRUCache(timeout=timeout) if cache is None else cache
+        self.stats = CacheStats()
+        self.lock = _TimedLock(threading.Lock(), self.stats)
+
+    @classmethod
+    def _key(cls, params):
+        if isinstance(params, str):
+            return params
+        return cls.KEY_PREFIX + cache_key(params)
+
+    def check(self, params):
+        """Raises the cached `FlickrError` for the call, if there is one."""
+
+        key = self._key(params)
+        entry = self.cache.get(key)
+        with self.lock:
+            if entry is None:
+                self.stats.miss(key)
+                return
+            self.stats.hit(key)
+
+        code, message = entry
+        LOG.debug('Negative cache hit for %s: %s', params.get('method'), message)
+        raise FlickrError(message, code=code)
+
+    def add(self, params, error):
+        """Caches the error of the call, if it has one of the cached codes.
+
+        Returns the key of the cached error, or None if it wasn't cached.
+        """
+
+        if isinstance(error, FlickrHTTPError) or error.code not in self.codes:
+            return None
+
+        key = self._key(params)
+        self.cache.set(key, (error.code, str(error)), self.timeout)
+        return key
+
+    def delete(self, params):
+        """Forgets the cached error of the call, if there is one.
+
+        Takes the parameters of the call, or the key returned by `add`.
+        """
+        self.cache.delete(self._key(params))
+
+    def __len__(self):
+        """Returns the number of cached errors."""
+        return len(self.cache)
+
+    def snapshot(self):
+        """Returns the cache statistics, see `CacheStats`.
+
+        Hits are calls that raised a cached error, misses are calls that
+        were sent to Flickr.
+        """
+
+        entries = len(self)
+        with self.lock:
+            return self.stats.snapshot(entries=entries)
+
+    def reset_stats(self):
+        """Resets the cache statistics to zero."""
+
+        with self.lock:
+            self.stats.reset()
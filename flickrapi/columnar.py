@@ -0,0 +1,268 @@
+"""Columnar tables of walked items.
+
+Instead of keeping an object per photo, a `ColumnTable` keeps one column
+per selected attribute, across all pages of a walk::
+
+    flickr = flickrapi.FlickrAPI(api_key, api_secret)
+    table = flickr.walk_columns(('id', 'views', 'latitude', 'longitude', 'owner'),
+                                tags='kitten', extras='views,geo', per_page=500)
+
+    popular = table.filter([views > 1000 for views in table['views']])
+    popular.to_csv(open('popular.csv', 'w', newline=''))
+
+Numeric attributes are stored in `array.array` columns, which use a
+contiguous block of memory; other attributes are stored in lists of
+strings. When NumPy is installed, `ColumnTable.to_numpy` turns the columns
+into NumPy arrays without copying the numeric ones, and `ColumnTable.filter`
+accepts NumPy boolean arrays::
+
+    import numpy as np
+
+    columns = table.to_numpy()
+    in_amsterdam = (np.abs(columns['latitude'] - 52.37) < 0.1) & \\
+                   (np.abs(columns['longitude'] - 4.89) < 0.1)
+    amsterdam = table.filter(in_amsterdam)
+"""
+
+import array
+import collections
+import collections.abc
+import csv
+import itertools
+import sys
+
+from flickrapi.records import INTERNED_FIELDS
+
+__all__ = ('ColumnTable', 'DEFAULT_TYPECODES')
+
+# Array typecodes of the attributes that are stored as numbers, unless
+# specified otherwise. Other attributes are stored as strings.
+DEFAULT_TYPECODES = {
+    'id': 'q',
+    'farm': 'l',
+    'ispublic': 'b',
+    'isfriend': 'b',
+    'isfamily': 'b',
+    'license': 'b',
+    'dateupload': 'q',
+    'lastupdate': 'q',
+    'views': 'q',
+    'count_views': 'q',
+    'count_faves': 'q',
+    'count_comments': 'q',
+    'latitude': 'd',
+    'longitude': 'd',
+    'accuracy': 'b',
+    'context': 'b',
+    'o_width': 'l',
+    'o_height': 'l',
+    'photos': 'l',
+    'videos': 'l',
+}
+
+_FLOAT_TYPECODES = frozenset('fd')
+
+
+def _converter(typecode):
+    """Returns the function that converts attribute values for the column,
+    and the value used when the attribute is missing.
+    """
+
+    if typecode is None:
+        return None, None
+    if typecode in _FLOAT_TYPECODES:
+        return float, float('nan')
+    return int, 0
+
+
+class ColumnTable(object):
+    """Table with one column per attribute.
+
+    Columns are available as ``table['name']``; numeric columns are
+    `array.array` objects, and the others are lists of strings.
+    """
+
+    __slots__ = ('columns', )
+
+    def __init__(self, columns):
+        """Creates a table from a mapping of column names to columns.
+
+        All columns must have the same length.
+        """
+
+        self.columns = collections.OrderedDict(columns)
+
+        lengths = set(len(column) for column in self.columns.values())
+        if len(lengths) > 1:
+            raise ValueError('Columns have different lengths: %s' % sorted(lengths))
+
+    @classmethod
+    def from_items(cls, items, fields):
+        """Collects the attributes of the items into a new table.
+
+        items
+            Iterable of ElementTree elements or records, which are only
+            used while they are being collected.
+        fields
+            Sequence of attribute names, or a mapping of attribute names to
+            array typecodes. A typecode of None stores the attribute as a
+            string. When a sequence is given, the typecodes are taken from
+            `DEFAULT_TYPECODES`.
+
+        Missing and empty attributes are stored as NaN in floating point
+        columns, 0 in integer columns and None in string columns.
+
+        >>> from xml.etree import ElementTree
+        >>> photos = ElementTree.fromstring(
+        ...     '<photos><photo id="1" views="15" title="one" />'
+        ...     '<photo id="2" views="3" title="two" /></photos>')
+        >>> table = ColumnTable.from_items(photos, ('id', 'views', 'title'))
+        >>> table['views']
+        array('q', [15, 3])
+        >>> table['title']
+        ['one', 'two']
+        """
+
+        if not isinstance(fields, collections.abc.Mapping):
+            fields = collections.OrderedDict((name, DEFAULT_TYPECODES.get(name))
+                                             for name in fields)
+
+        columns = collections.OrderedDict()
+        appenders = []
+        for name, typecode in fields.items():
+            column = [] if typecode is None else array.array(typecode)
+            columns[name] = column
+
+            convert, missing = _converter(typecode)
+            if typecode is None and name in INTERNED_FIELDS:
+                convert = sys.intern
+            appenders.append((name, column.append, convert, missing))
+
+        for item in items:
+            get = item.get
+            for name, append, convert, missing in appenders:
+                value = get(name)
+                if not value:
+                    append(missing)
+                    continue
+
+                if convert is not None:
+                    try:
+                        value = convert(value)
+                    except ValueError:
+                        raise ValueError('Value %r of attribute %r is not a number'
+                                         % (value, name))
+                append(value)
+
+        return cls(columns)
+
+    def __len__(self):
+        for column in self.columns.values():
+            return len(column)
+        return 0
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __iter__(self):
+        """Iterates over the rows of the table, as tuples."""
+        return zip(*self.columns.values())
+
+    def __repr__(self):
+        return '<ColumnTable %i rows, columns %s>' % (len(self), ', '.join(self.columns))
+
+    @property
+    def names(self):
+        """The names of the columns."""
+        return list(self.columns)
+
+    def select(self, *names):
+        """Returns a table with only the named columns.
+
+        The columns are shared with this table, not copied.
+        """
+
+        return ColumnTable((name, self.columns[name]) for name in names)
+
+    def filter(self, mask):
+        """Returns a table with the rows for which ``mask`` is true.
+
+        ``mask`` is a sequence of booleans with one value per row, such as
+        a list or a NumPy boolean array.
+
+        >>> table = ColumnTable({'views': array.array('q', [15, 3, 40])})
+        >>> table.filter([views > 10 for views in table['views']])['views']
+        array('q', [15, 40])
+        """
+
+        if len(mask) != len(self):
+            raise ValueError('The mask has %i values, the table %i rows'
+                             % (len(mask), len(self)))
+
+        numpy = _numpy_mask(mask)
+
+        columns = collections.OrderedDict()
+        for name, column in self.columns.items():
+            if numpy is not None and isinstance(column, array.array):
+                selected = numpy.frombuffer(column, dtype=column.typecode)[mask]
+                columns[name] = array.array(column.typecode, selected.tobytes())
+            elif isinstance(column, array.array):
+                columns[name] = array.array(column.typecode, itertools.compress(column, mask))
+            else:
+                columns[name] = list(itertools.compress(column, mask))
+
+        return ColumnTable(columns)
+
+    def to_numpy(self):
+        """Returns an ordered dict of NumPy arrays, one per column.
+
+        Numeric columns are not copied, so the arrays share memory with
+        this table, and the columns cannot grow while the arrays exist. String columns become NumPy arrays of strings.
+
+        Raises ImportError if NumPy is not installed.
+        """
+
+        import numpy
+
+        result = collections.OrderedDict()
+        for name, column in self.columns.items():
+            if isinstance(column, array.array):
+                result[name] = numpy.frombuffer(column, dtype=column.typecode)
+            else:
+                result[name] = numpy.array(['' if value is None else value
+                                            for value in column])
+        return result
+
+    def to_dicts(self):
+        """Yields every row as a dict."""
+
+        names = self.names
+        for row in self:
+            yield dict(zip(names, row))
+
+    def to_csv(self, fileobj, header=True, **fmtparams):
+        """Writes the table as CSV to a text file object.
+
+        Extra keyword arguments are passed to `csv.writer`.
+        """
+
+        writer = csv.writer(fileobj, **fmtparams)
+        if header:
+            writer.writerow(self.names)
+        writer.writerows(self)
+
+
+def _numpy_mask(mask):
+    """Returns the numpy module if mask is a NumPy array, None otherwise.
+
+    NumPy is only imported when it has been imported already, as only then
+    can the mask be a NumPy array.
+    """
+
+    numpy = sys.modules.get('numpy')
+    if numpy is not None and isinstance(mask, numpy.ndarray):
+        return numpy
+    return None
@@ -6,15 +6,22 @@ documented.
 
 from __future__ import print_function
 
+import collections
 import logging
 import functools
+import threading
+from concurrent import futures
 
-from . import tokencache, auth
+from . import tokencache, auth, backends, records, columnar, bulk, journal
 
 from flickrapi.xmlnode import XMLNode
 from flickrapi.exceptions import *
-from flickrapi.cache import SimpleCache
+from flickrapi.cache import (LRUCache, ParsedCache, NegativeCache, InvalidationIndex,
+                             cache_key, is_error_response)
 from flickrapi.call_builder import CallBuilder
+from flickrapi.retry import is_read_method
+from flickrapi.singleflight import SingleFlight
+from flickrapi.streaming import ElementStream
 
 LOG = logging.getLogger(__name__)
 
@@ -76,23 +83,24 @@ def rest_parser(parsed_format, request_format='rest'):
     return decorate_parser
 
 
-def require_format(required_format):
+def require_format(*required_formats):
     """Method decorator, raises a ValueError when the decorated method
-    is called if the default format is not set to ``required_format``.
+    is called if the default format is not one of ``required_formats``.
     """
 
     def decorator(method):
         @functools.wraps(method)
         def decorated(self, *args, **kwargs):
             # If everything is okay, call the method
-            if self.default_format == required_format:
+            if self.default_format in required_formats:
                 return method(self, *args, **kwargs)
 
             # Otherwise raise an exception
             msg = 'Function %s requires that you use ' \
-                  'ElementTree ("etree") as the communication format, ' \
+                  '%s as the communication format, ' \
                   'while the current format is set to "%s".'
-            raise ValueError(msg % (method.__name__, self.default_format))
+            formats = ' or '.join('"%s"' % fmt for fmt in required_formats)
+            raise ValueError(msg % (method.__name__, formats, self.default_format))
 
         return decorated
 
@@ -140,10 +148,26 @@ class FlickrAPI(object):
     UPLOAD_URL = 'https://up.flickr.com/services/upload/'
     REPLACE_URL = 'https://up.flickr.com/services/replace/'
 
+    # Class used to sign and perform the HTTP requests.
+    oauth_interface_class = auth.OAuthFlickrInterface
+
+    # Set to True to keep the XML of 'xmlnode' responses in their 'xml' attribute.
+    xmlnode_store_xml = False
+
+    # Set to True to create the child nodes of 'xmlnode' responses on first access.
+    xmlnode_lazy = False
+
+    # Names of the backends for 'parsed-json' and 'etree' responses, see
+    # flickrapi.backends. None uses the fastest one available.
+    json_backend = None
+    etree_backend = None
+
     def __init__(self, api_key, secret, username=None,
                  token=None, format='etree', store_token=True,
                  cache=False, token_cache_location=None,
-                 timeout=None):
+                 timeout=None, transport=None, rate_limiter=None, retry_policy=None,
+                 coalesce=True, parsed_cache=False, negative_cache=False,
+                 upload_journal=False):
         """Construct a new FlickrAPI instance for a given API key
         and secret.
 
@@ -175,16 +199,57 @@ class FlickrAPI(object):
         cache
             Enables in-memory caching of FlickrAPI calls - set to ``True`` to
             use. If you don't want to use the default settings, you can
-            instantiate a cache yourself too:
+            instantiate a cache yourself too, and pass that instead of ``True``
+            or assign it later:
 
             >>> f = FlickrAPI(u'123', u'123')
-            >>> f.cache = SimpleCache(timeout=5, max_entries=100)
+            >>> f.cache = LRUCache(timeout=5, max_entries=100)
 
         token_cache_location
             If not None, determines where the authentication tokens are stored.
 
         timeout
             Optional request timeout as float in seconds.
+
+        transport
+            Optional `flickrapi.transport.Transport` used to perform the HTTP
+            requests, for example a `RequestsTransport` with its own connection
+            pool. By default all FlickrAPI instances share one transport.
+
+        rate_limiter
+            Optional rate limiter, such as a `flickrapi.ratelimit.TokenBucket`,
+            that paces the API calls and uploads. Can be shared between
+            FlickrAPI instances.
+
+        retry_policy
+            Optional `flickrapi.retry.RetryPolicy` that determines which calls
+            are retried after a transient failure, such as a connection error
+            or a 503 response.
+
+        coalesce
+            When True (the default), identical calls to read methods that
+            are performed at the same time from multiple threads result in
+            a single request to Flickr, whose response is shared.
+
+        parsed_cache
+            Enables caching of parsed responses, so that a cache hit doesn't
+            need to parse the response again - set to ``True`` to use a
+            `ParsedCache` with the default settings, or pass a `ParsedCache`
+            instance. This is independent of ``cache``, which stores the
+            unparsed responses.
+
+        negative_cache
+            Enables caching of deterministic errors, such as "Photo not found",
+            so that repeating a failed call raises the same `FlickrError`
+            without calling Flickr - set to ``True`` to cache error code 1 for
+            60 seconds, or pass a `NegativeCache` instance.
+
+        upload_journal
+            Enables the upload journal, which records every upload and
+            replacement by content hash, so that uploading the same file
+            again returns the earlier photo ID without sending it to Flickr
+            - set to ``True`` to store it in the cache directory, or pass a
+            `flickrapi.journal.UploadJournal` instance.
         """
 
         self.default_format = format
@@ -209,13 +274,49 @@ class FlickrAPI(object):
             self.token_cache = tokencache.OAuthTokenCache(api_key, username or '',
                                                           path=token_cache_location)
 
-        self.flickr_oauth = auth.OAuthFlickrInterface(api_key, secret, self.token_cache,
-                                                      default_timeout=timeout)
+        self.flickr_oauth = self.oauth_interface_class(api_key, secret, self.token_cache,
+                                                       default_timeout=timeout,
+                                                       transport=transport)
 
-        if cache:
-            self.cache = SimpleCache()
-        else:
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.single_flight = SingleFlight() if coalesce else None
+
+        # Cache keys per photo, photoset and user ID, to evict them after writes.
+        self.invalidation_index = InvalidationIndex()
+
+        # Stale cache entries that are being refreshed in the background.
+        self._revalidating = set()
+        self._revalidate_lock = threading.Lock()
+        self._revalidate_executor = None
+
+        if cache is True:
+            self.cache = LRUCache()
+        elif cache is False or cache is None:
             self.cache = None
+        else:
+            self.cache = cache
+
+        if parsed_cache is True:
+            self.parsed_cache = ParsedCache()
+        elif parsed_cache is False or parsed_cache is None:
+            self.parsed_cache = None
+        else:
+            self.parsed_cache = parsed_cache
+
+        if negative_cache is True:
+            self.negative_cache = NegativeCache()
+        elif negative_cache is False or negative_cache is None:
+            self.negative_cache = None
+        else:
+            self.negative_cache = negative_cache
+
+        if upload_journal is True:
+            self.upload_journal = journal.UploadJournal()
+        elif upload_journal is False or upload_journal is None:
+            self.upload_journal = None
+        else:
+            self.upload_journal = upload_journal
 
     def __repr__(self):
         """Returns a string representation of this object."""
@@ -238,9 +339,15 @@ class FlickrAPI(object):
 
     @rest_parser('xmlnode')
     def parse_xmlnode(self, rest_xml):
-        """Parses a REST XML response from Flickr into an XMLNode object."""
+        """Parses a REST XML response from Flickr into an XMLNode object.
+
+        The XML itself is only stored in the ``xml`` attribute of the
+        result when ``xmlnode_store_xml`` is True. When ``xmlnode_lazy`` is
+        True, child nodes are created when they are first accessed.
+        """
 
-        rsp = XMLNode.parse(rest_xml, store_xml=True)
+        rsp = XMLNode.parse(rest_xml, store_xml=self.xmlnode_store_xml,
+                            lazy=self.xmlnode_lazy)
         if rsp['stat'] == 'ok':
             return rsp
 
@@ -255,13 +362,13 @@ class FlickrAPI(object):
 
     @rest_parser('parsed-json', 'json')
     def parse_json(self, json_string):
-        """Parses a JSON response from Flickr."""
+        """Parses a JSON response from Flickr.
 
-        if isinstance(json_string, bytes):
-            json_string = json_string.decode('utf-8')
+        Uses the JSON backend named by ``json_backend``; see
+        `flickrapi.backends`.
+        """
 
-        import json
-        parsed = json.loads(json_string)
+        parsed = backends.json_loads(self.json_backend)(json_string)
         if parsed.get('stat', '') == 'fail':
             raise FlickrError('Error: %(code)s: %(message)s' % parsed,
                               code=parsed['code'])
@@ -269,31 +376,13 @@ class FlickrAPI(object):
 
     @rest_parser('etree')
     def parse_etree(self, rest_xml):
-        """Parses a REST XML response from Flickr into an ElementTree object."""
+        """Parses a REST XML response from Flickr into an ElementTree object.
 
-        try:
-            from lxml import etree as ElementTree
-            LOG.info('REST Parser: using lxml.etree')
-        except ImportError:
-            try:
-                import xml.etree.cElementTree as ElementTree
-                LOG.info('REST Parser: using xml.etree.cElementTree')
-            except ImportError:
-                try:
-                    import xml.etree.ElementTree as ElementTree
-                    LOG.info('REST Parser: using xml.etree.ElementTree')
-                except ImportError:
-                    try:
-                        import elementtree.cElementTree as ElementTree
-                        LOG.info('REST Parser: elementtree.cElementTree')
-                    except ImportError:
-                        try:
-                            import elementtree.ElementTree as ElementTree
-                        except ImportError:
-                            raise ImportError("You need to install "
-                                              "ElementTree to use the etree format")
-
-        rsp = ElementTree.fromstring(rest_xml)
+        Uses the ElementTree backend named by ``etree_backend``; see
+        `flickrapi.backends`.
+        """
+
+        rsp = backends.etree_fromstring(self.etree_backend)(rest_xml)
         if rsp.attrib['stat'] == 'ok':
             return rsp
 
@@ -306,6 +395,15 @@ class FlickrAPI(object):
 
         raise FlickrError('Error: %(code)s: %(msg)s' % err.attrib, code=code)
 
+    @rest_parser('records')
+    def parse_records(self, rest_xml):
+        """Parses a REST XML list response from Flickr into a RecordPage.
+
+        See `flickrapi.records`.
+        """
+
+        return records.parse_page(self.parse_etree(rest_xml))
+
     def __getattr__(self, method_name):
         """Returns a CallBuilder for the given method name."""
 
@@ -330,10 +428,201 @@ class FlickrAPI(object):
             json = flickr.photos.getInfo(photo_id='1234', format='json')
         """
 
+        params = self._call_params(_method_name, kwargs)
+        parse_format = params['format']
+        read = is_read_method(_method_name)
+
+        # Return the parsed response from cache if available
+        parsed_key = self._parsed_cache_key(parse_format, params)
+        if parsed_key is not None:
+            result = self._parsed_cache_lookup(parsed_key, params, self._revalidate, timeout)
+            if result is not None:
+                return result
+
+        if self.negative_cache is not None and read:
+            self.negative_cache.check(params)
+
+        try:
+            result = self._wrap_in_parser(self._flickr_call,
+                                          parse_format=parse_format,
+                                          timeout=timeout,
+                                          **params)
+        except FlickrError as ex:
+            if read:
+                self._cache_error(params, ex)
+            raise
+
+        if parsed_key is not None:
+            self._cache_set(self.parsed_cache, parsed_key, result, params)
+        if not read:
+            self._invalidate(params)
+
+        return result
+
+    def _parsed_cache_key(self, parse_format, params):
+        """Returns the key of the call in the parsed-response cache.
+
+        Returns None if there is no such cache, if the response isn't
+        parsed, or if the method modifies data. The key includes the parse
+        format, as ``params`` still contains it.
+        """
+
+        if self.parsed_cache is None or parse_format not in rest_parsers:
+            return None
+        if not is_read_method(params.get('method')):
+            return None
+
+        return cache_key(params)
+
+    def _parsed_cache_lookup(self, parsed_key, params, revalidate, timeout=None):
+        """Returns the parsed response from the parsed-response cache, or None.
+
+        A parsed response is only as fresh as the response it was parsed
+        from. It isn't returned once that has expired from the response
+        cache, and when that is stale, ``revalidate(key, params, timeout)``
+        is called to refresh it.
+        """
+
+        result = self.parsed_cache.get(parsed_key)
+        if result is None or self.cache is None:
+            return result
+
+        request_params = params.copy()
+        self._set_request_format(params['format'], request_params)
+        key = cache_key(request_params)
+
+        reply, stale = self._cache_lookup(key)
+        if reply is None:
+            self.parsed_cache.delete(parsed_key)
+            return None
+        if stale:
+            revalidate(key, request_params, timeout)
+
+        return result
+
+    def _evict_parsed(self, params):
+        """Removes the parsed responses of a call from the parsed-response
+        cache, given the parameters of its request.
+        """
+
+        if self.parsed_cache is None:
+            return
+
+        for parse_format, (_, request_format) in rest_parsers.items():
+            if request_format == params.get('format'):
+                self.parsed_cache.delete(cache_key(dict(params, format=parse_format)))
+
+    def stream_call(self, _method_name, searchstring='*/photo', timeout=None, **kwargs):
+        """Performs a Flickr API call, parsing the response while it is received.
+
+        Returns an `flickrapi.streaming.ElementStream` that yields the
+        elements found at ``searchstring`` as soon as they have been
+        received, and removes them from memory afterwards::
+
+            for photo in flickr.stream_call('flickr.photos.search',
+                                            tags='kitten', per_page=500):
+                print(photo.get('id'))
+
+        The response is not cached, and the call is not retried.
+        """
+
+        params = self._call_params(self._full_method_name(_method_name), kwargs)
+        params['format'] = 'rest'
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        chunks = self.flickr_oauth.do_request_stream(self.REST_URL, params, timeout=timeout)
+        return ElementStream(chunks, searchstring)
+
+    def batch(self, calls, max_workers=4, ordered=True, timeout=None):
+        """Performs many Flickr API calls concurrently on a thread pool.
+
+        Example::
+
+            calls = [('photos.getInfo', {'photo_id': photo_id})
+                     for photo_id in photo_ids]
+            for rsp in flickr.batch(calls, max_workers=8):
+                ...
+
+        calls
+            Iterable of ``(method_name, kwargs)`` tuples. The method name
+            may be given with or without the ``flickr.`` prefix.
+        max_workers
+            The maximum number of calls in flight at the same time.
+        ordered
+            If True, a list of results is returned in the same order as
+            ``calls``. If False, a generator is returned that yields
+            ``(index, result)`` tuples as the calls complete.
+        timeout
+            Optional timeout for each HTTP request, as float in seconds.
+
+        A failing call does not abort the batch; the exception it raised
+        (for example a `FlickrError`) is put in place of its result.
+
+        The calls are performed with `do_flickr_call`, so the cache is used
+        as usual.
+        """
+
+        calls = [(self._full_method_name(method_name), kwargs)
+                 for method_name, kwargs in calls]
+
+        if ordered:
+            results = [None] * len(calls)
+            for index, result in self._batch_completed(calls, max_workers, timeout):
+                results[index] = result
+            return results
+
+        return self._batch_completed(calls, max_workers, timeout)
+
+    def _batch_completed(self, calls, max_workers, timeout):
+        """Generator, yields ``(index, result)`` as the batched calls complete."""
+
+        def call(index):
+            method_name, kwargs = calls[index]
+            try:
+                return self.do_flickr_call(method_name, timeout=timeout, **kwargs)
+            except Exception as ex:
+                LOG.debug('Batched call %s(%s) failed: %s', method_name, kwargs, ex)
+                return ex
+
+        return self._completed(call, len(calls), max_workers)
+
+    @staticmethod
+    def _completed(func, count, max_workers):
+        """Generator, runs ``func(index)`` for every index below ``count`` on
+        a thread pool, and yields ``(index, result)`` as the calls complete.
+        """
+
+        executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+        pending = {}
+        try:
+            pending = {executor.submit(func, index): index for index in range(count)}
+            for future in futures.as_completed(pending):
+                yield pending[future], future.result()
+        finally:
+            # Don't start calls nobody is waiting for any more.
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    @staticmethod
+    def _full_method_name(method_name):
+        """Returns the method name, prefixed with 'flickr.' if necessary."""
+
+        if method_name.startswith('flickr.'):
+            return method_name
+        return 'flickr.' + method_name
+
+    def _call_params(self, method_name, kwargs):
+        """Returns the parameters for a call to the given Flickr API method,
+        augmented with the default method name and format.
+        """
+
         params = kwargs.copy()
 
         # Set some defaults
-        defaults = {'method': _method_name,
+        defaults = {'method': method_name,
                     'format': self.default_format}
         if 'jsoncallback' not in kwargs:
             defaults['nojsoncallback'] = 1
@@ -341,10 +630,7 @@ class FlickrAPI(object):
 
         LOG.info('Calling %s', defaults)
 
-        return self._wrap_in_parser(self._flickr_call,
-                                    parse_format=params['format'],
-                                    timeout=timeout,
-                                    **params)
+        return params
 
     def _supply_defaults(self, args, defaults):
         """Returns a new dictionary containing ``args``, augmented with defaults
@@ -380,18 +666,168 @@ class FlickrAPI(object):
 
         LOG.debug("Calling %s" % kwargs)
 
-        # Return value from cache if available
-        if self.cache and self.cache.get(kwargs):
-            return self.cache.get(kwargs)
+        key = cache_key(kwargs)
+        # Calls that modify data are always sent to Flickr, and never cached.
+        read = is_read_method(kwargs.get('method'))
 
-        reply = self.flickr_oauth.do_request(self.REST_URL, kwargs, timeout=timeout)
+        # Return value from cache if available
+        if self.cache is not None and read:
+            reply, stale = self._cache_lookup(key)
+            if reply is not None:
+                if stale:
+                    self._revalidate(key, kwargs, timeout)
+                return reply
+
+        if self.single_flight is not None and read:
+            reply = self.single_flight.do(key, lambda: self._do_rest_request(kwargs, timeout))
+        else:
+            reply = self._do_rest_request(kwargs, timeout)
 
         # Store in cache, if we have one
-        if self.cache is not None:
-            self.cache.set(kwargs, reply)
+        if self.cache is not None and read:
+            self._cache_reply(key, reply, kwargs)
 
         return reply
 
+    def _cache_reply(self, key, reply, params):
+        """Stores the reply in the response cache, unless it is an error response.
+
+        Returns True iff the reply was stored.
+        """
+
+        if is_error_response(reply):
+            return False
+
+        self._cache_set(self.cache, key, reply, params)
+        return True
+
+    def _cache_set(self, cache, key, value, params):
+        """Stores a value in the cache, and indexes its key for invalidation."""
+
+        cache.set(key, value)
+
+        if self.invalidation_index is not None:
+            for forgotten in self.invalidation_index.add(key, params):
+                self._evict(forgotten)
+
+    def _cache_error(self, params, error):
+        """Stores the error in the negative cache, if there is one, and
+        indexes it for invalidation.
+        """
+
+        if self.negative_cache is None:
+            return
+
+        key = self.negative_cache.add(params, error)
+        if key is not None and self.invalidation_index is not None:
+            for forgotten in self.invalidation_index.add(key, params):
+                self._evict(forgotten)
+
+    def _invalidate(self, params):
+        """Evicts the cached calls that refer to the photos, photosets and
+        users in ``params``, after these were modified.
+        """
+
+        if self.invalidation_index is None:
+            return
+
+        for key in self.invalidation_index.pop(params):
+            self._evict(key)
+
+    def _evict(self, key):
+        """Removes the key from the response and parsed-response caches, or
+        from the negative cache if it is the key of a cached error.
+        """
+
+        LOG.debug('Evicting %s from cache', key)
+        if key.startswith(NegativeCache.KEY_PREFIX):
+            caches = (self.negative_cache, )
+        else:
+            caches = (self.cache, self.parsed_cache)
+
+        for cache in caches:
+            if cache is not None:
+                cache.delete(key)
+
+    def _cache_lookup(self, key):
+        """Returns ``(reply, stale)`` for the key from the response cache.
+
+        Caches without a ``lookup`` method, such as `SimpleCache` and the
+        Django cache, never report their entries as stale.
+        """
+
+        lookup = getattr(self.cache, 'lookup', None)
+        if lookup is None:
+            return self.cache.get(key), False
+        return lookup(key)
+
+    def _revalidate(self, key, kwargs, timeout=None):
+        """Refreshes a stale cache entry on a background thread.
+
+        Only one refresh per key is performed at a time. When the refresh
+        fails, the stale entry is kept until it times out.
+        """
+
+        if not self._begin_revalidation(key):
+            return
+
+        with self._revalidate_lock:
+            if self._revalidate_executor is None:
+                self._revalidate_executor = futures.ThreadPoolExecutor(max_workers=2)
+
+        def refresh():
+            try:
+                if self.single_flight is not None:
+                    reply = self.single_flight.do(
+                        key, lambda: self._do_rest_request(kwargs, timeout))
+                else:
+                    reply = self._do_rest_request(kwargs, timeout)
+                # An error response isn't stored, so the stale entry is kept.
+                if self._cache_reply(key, reply, kwargs):
+                    self._evict_parsed(kwargs)
+            except Exception as ex:
+                LOG.warning('Unable to refresh stale cache entry for %s: %s',
+                            kwargs.get('method'), ex)
+            finally:
+                self._end_revalidation(key)
+
+        LOG.debug('Refreshing stale cache entry %s', key)
+        self._revalidate_executor.submit(refresh)
+
+    def _begin_revalidation(self, key):
+        """Returns True if the stale entry for the key should be refreshed,
+        which is when no refresh of it is in progress yet.
+        """
+
+        with self._revalidate_lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            return True
+
+    def _end_revalidation(self, key):
+        """Marks the refresh of the stale entry for the key as finished."""
+
+        with self._revalidate_lock:
+            self._revalidating.discard(key)
+
+    def _do_rest_request(self, kwargs, timeout=None):
+        """Performs the HTTP request for an API call, returning the unparsed data.
+
+        Applies the rate limiter and the retry policy.
+        """
+
+        def attempt():
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            return self.flickr_oauth.do_request(self.REST_URL, kwargs, timeout=timeout)
+
+        if self.retry_policy is None:
+            return attempt()
+
+        return self.retry_policy.call(
+            attempt, retry=self.retry_policy.should_retry_method(kwargs.get('method')))
+
     def _wrap_in_parser(self, wrapped_method, parse_format, *args, **kwargs):
         """Wraps a method call in a parser.
 
@@ -400,14 +836,27 @@ class FlickrAPI(object):
         the response of the method is parsed before it's returned.
         """
 
-        # Find the parser, and set the format to rest if we're supposed to
-        # parse it.
-        if parse_format in rest_parsers and 'format' in kwargs:
-            kwargs['format'] = rest_parsers[parse_format][1]
+        self._set_request_format(parse_format, kwargs)
 
         LOG.debug('Wrapping call %s(self, %s, %s)' % (wrapped_method, args, kwargs))
         data = wrapped_method(*args, **kwargs)
 
+        return self._parse_response(parse_format, data)
+
+    def _set_request_format(self, parse_format, kwargs):
+        """Sets ``kwargs['format']`` to the request format of the parser, if
+        there is a parser for ``parse_format`` and the format was given.
+        """
+
+        if parse_format in rest_parsers and 'format' in kwargs:
+            kwargs['format'] = rest_parsers[parse_format][1]
+
+    def _parse_response(self, parse_format, data):
+        """Parses the response data with the parser for ``parse_format``.
+
+        Returns the data as-is if there is no such parser.
+        """
+
         # Just return if we have no parser
         if parse_format not in rest_parsers:
             return data
@@ -503,6 +952,95 @@ class FlickrAPI(object):
 
         return self._upload_to_form(self.UPLOAD_URL, filename, fileobj, timeout=timeout, **kwargs)
 
+    def upload_many(self, files, max_workers=4, max_bytes_in_flight=64 * 1024 * 1024,
+                    progress_callback=None, ordered=True, timeout=None, **kwargs):
+        """Uploads many files concurrently on a thread pool.
+
+        Example::
+
+            def show_progress(progress):
+                print('%i/%i files, ETA %s seconds' % (
+                    progress.files_done, progress.files_total, progress.eta))
+
+            results = flickr.upload_many(filenames, max_workers=4,
+                                         progress_callback=show_progress,
+                                         is_public=0, tags='event2018')
+
+        files
+            Iterable of filenames, file objects with a ``name`` attribute,
+            or dicts of `upload` arguments, such as ``{'filename': ...,
+            'fileobj': ..., 'title': ...}``.
+        max_workers
+            The maximum number of uploads in flight at the same time.
+        max_bytes_in_flight
+            The maximum total size of the files being uploaded at the same
+            time, or None for no limit. A larger file is uploaded on its own.
+        progress_callback
+            Optional function that is called with a
+            `flickrapi.bulk.UploadProgress` with the bytes sent, files done,
+            speed and estimated time left of all uploads together.
+        ordered
+            If True, a list of results is returned in the same order as
+            ``files``. If False, a generator is returned that yields
+            ``(index, result)`` tuples as the uploads complete.
+        timeout
+            Optional timeout for each HTTP request, as float in seconds.
+
+        Other arguments are passed to `upload` for every file; arguments
+        given in a dict in ``files`` take precedence.
+
+        A failing upload does not abort the others; the exception it raised
+        (for example a `FlickrDuplicate` or `FlickrError`) is put in place
+        of its result.
+        """
+
+        uploads = [bulk.upload_item(item) for item in files]
+        sizes = [bulk.upload_size(filename, fileobj) for filename, fileobj, _ in uploads]
+
+        tracker = bulk.ProgressTracker(progress_callback, len(uploads), sum(sizes))
+        budget = bulk.ByteBudget(max_bytes_in_flight)
+
+        def upload(index):
+            filename, fileobj, item_kwargs = uploads[index]
+            params = dict(kwargs, **item_kwargs)
+            size = sizes[index]
+            sent = 0
+
+            budget.acquire(size)
+            try:
+                opened = fileobj is None
+                if opened:
+                    fileobj = open(filename, 'rb')
+                try:
+                    wrapped = bulk.ProgressFile(fileobj, tracker.sent, size or None,
+                                                 self._upload_digest(filename, fileobj))
+                    try:
+                        result = self.upload(filename, wrapped, timeout=timeout, **params)
+                    finally:
+                        sent = wrapped.pos
+                finally:
+                    if opened:
+                        fileobj.close()
+            except Exception as ex:
+                LOG.debug('Upload of %s failed: %s', filename, ex)
+                tracker.done(failed=True, unsent=size - sent)
+                return ex
+            finally:
+                budget.release(size)
+
+            # Files skipped by the upload journal were never sent.
+            tracker.done(unsent=size - sent)
+            return result
+
+        completed = self._completed(upload, len(uploads), max_workers)
+        if not ordered:
+            return completed
+
+        results = [None] * len(uploads)
+        for index, result in completed:
+            results[index] = result
+        return results
+
     def replace(self, filename, photo_id, fileobj=None, timeout=None, **kwargs):
         """Replace an existing photo.
 
@@ -527,7 +1065,10 @@ class FlickrAPI(object):
             raise IllegalArgumentException("photo_id must be specified")
 
         kwargs['photo_id'] = photo_id
-        return self._upload_to_form(self.REPLACE_URL, filename, fileobj, timeout=timeout, **kwargs)
+        rsp = self._upload_to_form(self.REPLACE_URL, filename, fileobj, timeout=timeout, **kwargs)
+        self._invalidate({'photo_id': photo_id})
+
+        return rsp
 
     def _upload_to_form(self, form_url, filename, fileobj=None, timeout=None, **kwargs):
         """Uploads a photo - can be used to either upload a new photo
@@ -537,6 +1078,120 @@ class FlickrAPI(object):
         ``FlickrAPI.flickr_upload_form``.
         """
 
+        response_format, kwargs = self._upload_params(filename, kwargs)
+
+        if self.upload_journal is None:
+            data = self._post_upload(form_url, filename, fileobj, timeout, kwargs)
+        else:
+            data = self._journaled_upload(form_url, filename, fileobj, timeout, kwargs)
+
+        return self._parse_response(response_format, data)
+
+    def _post_upload(self, form_url, filename, fileobj, timeout, kwargs):
+        """Sends the file to Flickr, and returns the unparsed response."""
+
+        start_pos = fileobj.tell() if fileobj is not None and hasattr(fileobj, 'seek') else None
+
+        def attempt():
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            # Rewind the file, in case this is a retry.
+            if start_pos is not None:
+                fileobj.seek(start_pos)
+            # do_upload() adds the photo to the parameters, so give it a copy.
+            return self.flickr_oauth.do_upload(filename, form_url, dict(kwargs), fileobj,
+                                               timeout=timeout)
+
+        if self.retry_policy is None:
+            return attempt()
+        return self.retry_policy.call(attempt, retry=self.retry_policy.retry_uploads)
+
+    def _journaled_upload(self, form_url, filename, fileobj, timeout, kwargs):
+        """Sends the file to Flickr, unless the upload journal says it was
+        sent already, and returns the unparsed response.
+
+        A duplicate photo error counts as a successful upload of the
+        duplicate photo.
+        """
+
+        entry, data = self._journal_start(filename, fileobj, kwargs)
+        if data is not None:
+            return data
+
+        try:
+            data = self._post_upload(form_url, filename, fileobj, timeout, kwargs)
+        except Exception as ex:
+            self.upload_journal.failed(*entry, error=ex)
+            raise
+
+        return self._journal_finish(entry, data)
+
+    def _journal_start(self, filename, fileobj, kwargs):
+        """Looks up the upload in the journal, and records that it started
+        if it wasn't done before.
+
+        Returns the journal entry as (digest, user, target, filename) tuple,
+        and the response to return instead of uploading, or None if the file
+        should be sent.
+        """
+
+        if isinstance(fileobj, bulk.ProgressFile):
+            digest = fileobj.digest or journal.content_hash(filename, fileobj.file)
+        else:
+            digest = journal.content_hash(filename, fileobj)
+        user = self.token_cache.token.user_nsid
+        target = kwargs.get('photo_id', b'').decode('utf-8')
+        entry = (digest, user, target, filename)
+
+        photo_id = self.upload_journal.lookup(digest, user, target)
+        if photo_id is not None:
+            LOG.info('Skipping upload of %s, already uploaded as photo %s', filename, photo_id)
+            return entry, (journal.SKIPPED_RESPONSE % photo_id).encode('utf-8')
+
+        self.upload_journal.started(*entry)
+        return entry, None
+
+    def _journal_finish(self, entry, data):
+        """Records the outcome of a sent upload in the journal, and returns
+        the response to parse.
+        """
+
+        filename = entry[3]
+        try:
+            rsp = self.parse_etree(data)
+        except FlickrDuplicate as ex:
+            photo_id = ex.duplicate_photo_id
+            LOG.info('%s is a duplicate of photo %s', filename, photo_id)
+            self.upload_journal.done(*entry, photo_id=photo_id)
+            return (journal.SKIPPED_RESPONSE % photo_id).encode('utf-8')
+        except Exception as ex:
+            # Leave it to the caller's parser to handle the error response.
+            self.upload_journal.failed(*entry, error=ex)
+            return data
+
+        # Asynchronous uploads return a ticket instead of a photo ID; they
+        # remain 'started'.
+        photo_id = rsp.findtext('photoid')
+        if photo_id:
+            self.upload_journal.done(*entry, photo_id=photo_id)
+
+        return data
+
+    def _upload_digest(self, filename, fileobj):
+        """Returns the content hash of the file for the upload journal, or
+        None if there is no journal.
+        """
+
+        if self.upload_journal is None:
+            return None
+        return journal.content_hash(filename, fileobj)
+
+    def _upload_params(self, filename, kwargs):
+        """Checks the upload arguments and prepares the parameters to send.
+
+        Returns a (response format, parameters) tuple.
+        """
+
         if not filename:
             raise IllegalArgumentException("filename must be specified")
         if not self.token_cache.token:
@@ -548,10 +1203,7 @@ class FlickrAPI(object):
         response_format = self._extract_upload_response_format(kwargs)
 
         # Convert to UTF-8 if an argument is an Unicode string
-        kwargs = make_bytes(kwargs)
-
-        return self._wrap_in_parser(self.flickr_oauth.do_upload, response_format,
-                                    filename, form_url, kwargs, fileobj, timeout=timeout)
+        return response_format, make_bytes(kwargs)
 
     def token_valid(self, perms=u'read'):
         """Verifies the cached token with Flickr.
@@ -571,7 +1223,7 @@ class FlickrAPI(object):
         self.flickr_oauth.token = token
 
         try:
-            resp = self.auth.oauth.checkToken(format='etree')
+            resp = self._check_token()
             token_perms = resp.findtext('oauth/perms')
             if token_perms == token.access_level and token.has_level(perms):
                 # Token is valid, and for the expected permissions.
@@ -589,6 +1241,11 @@ class FlickrAPI(object):
 
         return False
 
+    def _check_token(self):
+        """Calls flickr.auth.oauth.checkToken, returning the ElementTree response."""
+
+        return self.auth.oauth.checkToken(format='etree')
+
     @authenticator
     def authenticate_console(self, perms=u'read'):
         """Performs the authentication/authorization, assuming a console program.
@@ -677,8 +1334,8 @@ class FlickrAPI(object):
 
         self.token_cache.token = self.flickr_oauth.get_access_token()
 
-    @require_format('etree')
-    def data_walker(self, method, searchstring='*/photo', **params):
+    @require_format('etree', 'records')
+    def data_walker(self, method, searchstring='*/photo', prefetch=0, stream=False, **params):
         """Calls 'method' with page=0, page=1 etc. until the total
         number of pages has been visited. Yields the photos
         returned.
@@ -687,8 +1344,38 @@ class FlickrAPI(object):
         results in a list of interesting elements (defaulting to photos),
         and that the toplevel element of the result contains a 'pages'
         attribute with the total number of pages.
+
+        If ``prefetch`` is larger than zero, the first page is used to
+        learn the total number of pages, after which up to ``prefetch``
+        of the following pages are fetched concurrently. The elements
+        are still yielded in page order.
+
+        If ``stream`` is True, each page is parsed while it is received
+        with `stream_call`, and every element is yielded as soon as it has
+        been parsed. The elements are cleared after they have been
+        yielded, so copy any data you need before advancing. Streaming
+        requires ``method`` to be a Flickr API method of this object, such
+        as ``flickr.photos.search``, and cannot be combined with
+        ``prefetch``.
+
+        With the 'records' format, either as default format or passed as
+        ``format='records'``, the items of each page are yielded as
+        `flickrapi.records.Record` objects, and ``searchstring`` is only
+        used when streaming.
         """
 
+        if stream:
+            if prefetch > 0:
+                raise IllegalArgumentException('Cannot combine stream=True with prefetch')
+            for elt in self._streaming_data_walker(method, searchstring, params):
+                yield elt
+            return
+
+        if prefetch > 0:
+            for elt in self._prefetching_data_walker(method, searchstring, prefetch, params):
+                yield elt
+            return
+
         page = 1
         total = 1  # We don't know that yet, update when needed
         while page <= total:
@@ -696,11 +1383,7 @@ class FlickrAPI(object):
             LOG.debug('Calling %s(page=%i of %i, %s)' %
                       (method.__name__, page, total, params))
             rsp = method(page=page, **params)
-
-            photoset = rsp[0]
-            total = int(photoset.get('pages'))
-
-            photos = rsp.findall(searchstring)
+            total, photos = self._walker_page(rsp, searchstring)
 
             # Yield each photo
             for photo in photos:
@@ -709,7 +1392,76 @@ class FlickrAPI(object):
             # Ready to get the next page
             page += 1
 
-    @require_format('etree')
+    @staticmethod
+    def _walker_page(rsp, searchstring):
+        """Returns the total number of pages and the items of a page
+        fetched by `data_walker`.
+        """
+
+        if isinstance(rsp, records.RecordPage):
+            return rsp.pages, rsp
+        return int(rsp[0].get('pages')), rsp.findall(searchstring)
+
+    def _streaming_data_walker(self, method, searchstring, params):
+        """Generator used by `data_walker` when streaming pages."""
+
+        method_name = getattr(method, 'method_name', None)
+        if method_name is None:
+            raise IllegalArgumentException('Streaming requires a Flickr API method, not %r'
+                                           % method)
+
+        as_records = params.get('format', self.default_format) == 'records'
+
+        page = 1
+        total = 1  # We don't know that yet, update when needed
+        while page <= total:
+            LOG.debug('Streaming %s(page=%i of %i, %s)' %
+                      (method_name, page, total, params))
+            elements = self.stream_call(method_name, searchstring, page=page, **params)
+
+            for elt in elements:
+                yield records.from_element(elt) if as_records else elt
+
+            total = int(elements.list_attrib.get('pages', 0))
+            page += 1
+
+    def _prefetching_data_walker(self, method, searchstring, prefetch, params):
+        """Generator used by `data_walker` when prefetching pages.
+
+        Keeps at most ``prefetch`` pages in flight on a thread pool.
+        """
+
+        LOG.debug('Calling %s(page=1, %s)' % (method.__name__, params))
+        rsp = method(page=1, **params)
+        total, elements = self._walker_page(rsp, searchstring)
+
+        next_page = 2
+        in_flight = collections.deque()
+        executor = futures.ThreadPoolExecutor(max_workers=prefetch)
+        try:
+            while True:
+                # Keep the read-ahead window filled, also while the caller
+                # consumes the first page.
+                while next_page <= total and len(in_flight) < prefetch:
+                    LOG.debug('Prefetching %s(page=%i of %i, %s)' %
+                              (method.__name__, next_page, total, params))
+                    in_flight.append(executor.submit(method, page=next_page, **params))
+                    next_page += 1
+
+                for elt in elements:
+                    yield elt
+
+                if not in_flight:
+                    break
+                rsp = in_flight.popleft().result()
+                elements = self._walker_page(rsp, searchstring)[1]
+        finally:
+            # Don't fetch pages nobody is waiting for any more.
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    @require_format('etree', 'records')
     def walk_contacts(self, per_page=50, **kwargs):
         """walk_contacts(self, per_page=50, ...) -> \
                 generator, yields each contact of the calling user.
@@ -727,13 +1479,13 @@ class FlickrAPI(object):
         .. _flickr.contacts.getList:
             https://www.flickr.com/services/api/flickr.contacts.getList.html
 
-        Uses the ElementTree format, incompatible with other formats.
+        Uses the ElementTree or records format, incompatible with other formats.
         """
 
         return self.data_walker(self.contacts_getList, searchstring='*/contact',
                                 per_page=per_page, **kwargs)
 
-    @require_format('etree')
+    @require_format('etree', 'records')
     def walk_photosets(self, per_page=50, **kwargs):
         """walk_photosets(self, per_page=50, ...) -> \
                 generator, yields each photoset belonging to a user.
@@ -751,13 +1503,13 @@ class FlickrAPI(object):
         .. _flickr.photosets.getList:
             https://www.flickr.com/services/api/flickr.photosets.getList.html
 
-        Uses the ElementTree format, incompatible with other formats.
+        Uses the ElementTree or records format, incompatible with other formats.
         """
 
         return self.data_walker(self.photosets_getList, searchstring='*/photoset',
                                 per_page=per_page, **kwargs)
 
-    @require_format('etree')
+    @require_format('etree', 'records')
     def walk_set(self, photoset_id, per_page=50, **kwargs):
         """walk_set(self, photoset_id, per_page=50, ...) -> \
                 generator, yields each photo in a single set.
@@ -777,13 +1529,13 @@ class FlickrAPI(object):
         .. _flickr.photosets.getPhotos:
             https://www.flickr.com/services/api/flickr.photosets.getPhotos.html
 
-        Uses the ElementTree format, incompatible with other formats.
+        Uses the ElementTree or records format, incompatible with other formats.
         """
 
         return self.data_walker(self.photosets_getPhotos,
                                 photoset_id=photoset_id, per_page=per_page, **kwargs)
 
-    @require_format('etree')
+    @require_format('etree', 'records')
     def walk_user(self, user_id='me', per_page=50, **kwargs):
         """walk_user(self, user_id, per_page=50, ...) -> \
                 generator, yields each photo in a user's photostream.
@@ -803,13 +1555,13 @@ class FlickrAPI(object):
         .. _flickr.people.getPhotos:
             https://www.flickr.com/services/api/flickr.people.getPhotos.html
 
-        Uses the ElementTree format, incompatible with other formats.
+        Uses the ElementTree or records format, incompatible with other formats.
         """
 
         return self.data_walker(self.people_getPhotos,
                                 user_id=user_id, per_page=per_page, **kwargs)
 
-    @require_format('etree')
+    @require_format('etree', 'records')
     def walk_user_updates(self, min_date, per_page=50, **kwargs):
         """walk_user_updates(self, user_id, per_page=50, ...) -> \
                 generator, yields each photo in a user's photostream updated \
@@ -830,13 +1582,13 @@ class FlickrAPI(object):
         .. _flickr.photos.recentlyUpdated:
             https://www.flickr.com/services/api/flickr.photos.recentlyUpdated.html
 
-        Uses the ElementTree format, incompatible with other formats.
+        Uses the ElementTree or records format, incompatible with other formats.
         """
 
         return self.data_walker(self.photos_recentlyUpdated,
                                 min_date=min_date, per_page=per_page, **kwargs)
 
-    @require_format('etree')
+    @require_format('etree', 'records')
     def walk(self, per_page=50, **kwargs):
         """walk(self, user_id=..., tags=..., ...) -> generator, \
                 yields each photo in a search query result
@@ -848,8 +1600,39 @@ class FlickrAPI(object):
         .. _flickr.photos.search:
             https://www.flickr.com/services/api/flickr.photos.search.html
 
+        Like all ``walk*`` methods, this accepts a ``prefetch`` parameter
+        to fetch following pages concurrently, and a ``stream`` parameter
+        to parse the pages while they are received; see `data_walker`.
+
         Also see `walk_set`.
         """
 
         return self.data_walker(self.photos.search,
                                 per_page=per_page, **kwargs)
+
+    @require_format('etree', 'records')
+    def walk_columns(self, fields, walker=None, per_page=500, **kwargs):
+        """walk_columns(self, fields, walker=None, ...) -> ColumnTable \
+                of the fields of every photo in a search query result
+
+        :Parameters:
+            fields
+                the attributes to collect, as a sequence of names or a
+                mapping of names to `array` typecodes; see
+                `flickrapi.columnar.ColumnTable.from_items`.
+            walker
+                the walking method to use, defaults to `walk`. Any of the
+                ``walk*`` methods can be used, such as
+                ``flickr.walk_user``.
+            per_page
+                the number of items that are fetched in one call to
+                Flickr.
+
+        Other arguments are passed to the walker. Only the collected
+        fields are kept in memory, in one column per field.
+        """
+
+        if walker is None:
+            walker = self.walk
+
+        return columnar.ColumnTable.from_items(walker(per_page=per_page, **kwargs), fields)
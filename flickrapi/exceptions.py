@@ -25,6 +25,18 @@ class FlickrError(Exception):
             self.code = int(code)
 
 
+class FlickrHTTPError(FlickrError):
+    """Raised when Flickr responds with an HTTP status code other than 200 OK.
+
+    The status code is available as ``status_code``.
+    """
+
+    def __init__(self, message, status_code):
+        FlickrError.__init__(self, message)
+
+        self.status_code = int(status_code)
+
+
 class FlickrDuplicate(Exception):
     """Raised when Flickr detects duplicate photo being uploaded.
 
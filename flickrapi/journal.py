@@ -0,0 +1,181 @@
+"""Journal of uploaded files, to resume interrupted batch uploads.
+
+When a `FlickrAPI` instance has an upload journal, every upload and
+replacement is recorded in it, keyed by the SHA-256 hash of the file
+contents. Uploading the same contents again for the same user returns the
+ID of the earlier upload, without sending the file to Flickr::
+
+    flickr = flickrapi.FlickrAPI(api_key, api_secret, upload_journal=True)
+    results = flickr.upload_many(filenames)  # Rerun after a crash; done files are skipped.
+
+Use `UploadJournal.incomplete` to find uploads that were started or that
+failed, but did not finish.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from flickrapi.cache import default_cache_dir
+from flickrapi.exceptions import CacheDatabaseError
+
+LOG = logging.getLogger(__name__)
+
+__all__ = ('UploadJournal', 'content_hash')
+
+STARTED = 'started'
+DONE = 'done'
+FAILED = 'failed'
+
+# Response given for uploads that are skipped, as Flickr would send it.
+SKIPPED_RESPONSE = (u'<?xml version="1.0" encoding="utf-8" ?>\n'
+                    u'<rsp stat="ok">\n<photoid>%s</photoid>\n</rsp>\n')
+
+
+def content_hash(filename, fileobj=None, chunk_size=1024 * 1024):
+    """Returns the SHA-256 hex digest of the file contents.
+
+    If ``fileobj`` is given, it is read from its current position to the
+    end, and then rewound to that position. Otherwise the file is opened.
+    """
+
+    digest = hashlib.sha256()
+
+    if fileobj is None:
+        with open(filename, 'rb') as infile:
+            for chunk in iter(lambda: infile.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    start = fileobj.tell()
+    for chunk in iter(lambda: fileobj.read(chunk_size), b''):
+        digest.update(chunk)
+    fileobj.seek(start)
+
+    return digest.hexdigest()
+
+
+class UploadJournal(object):
+    """Records the state and resulting photo ID of uploads, in SQLite.
+
+    Entries are keyed by content hash, user NSID and target; the target is
+    the ID of the replaced photo for replacements, and empty for uploads.
+    Can be shared by multiple threads and processes.
+    """
+
+    DB_VERSION = 1
+
+    def __init__(self, filename=None):
+        """Creates or opens a journal.
+
+        filename
+            The SQLite database file. Defaults to ``uploads.sqlite`` in
+            the cache directory, ``~/.flickrapi/cache``.
+        """
+
+        if filename is None:
+            path = default_cache_dir()
+            if not os.path.exists(path):
+                os.makedirs(path)
+            filename = os.path.join(path, 'uploads.sqlite')
+
+        self.filename = filename
+        self._local = threading.local()
+
+        self.create_table()
+
+    @property
+    def db(self):
+        """Returns the database connection for the current thread and process."""
+
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            import sqlite3
+
+            db = sqlite3.connect(self.filename, timeout=30, isolation_level=None)
+            self._local.db = db
+            self._local.pid = os.getpid()
+
+        return db
+
+    def create_table(self):
+        """Creates the DB table, if it doesn't exist already."""
+
+        db = self.db
+        db.execute('PRAGMA journal_mode=WAL')
+
+        version = db.execute('PRAGMA user_version').fetchone()[0]
+        if version == 0:
+            db.execute('PRAGMA user_version=%i' % self.DB_VERSION)
+        elif version != self.DB_VERSION:
+            raise CacheDatabaseError('Unsupported database version %s' % version)
+
+        db.execute('''CREATE TABLE IF NOT EXISTS uploads (
+                      digest text not null,
+                      user text not null,
+                      target text not null,
+                      filename text,
+                      state text not null,
+                      photo_id text,
+                      error text,
+                      updated real not null,
+                      PRIMARY KEY (digest, user, target)
+                      )''')
+
+    def lookup(self, digest, user, target=''):
+        """Returns the photo ID of a finished upload, or None."""
+
+        row = self.db.execute('SELECT photo_id FROM uploads '
+                              'WHERE digest=? AND user=? AND target=? AND state=?',
+                              (digest, user, target, DONE)).fetchone()
+        return row[0] if row else None
+
+    def started(self, digest, user, target, filename):
+        """Records that an upload started."""
+        self._record(digest, user, target, filename, STARTED)
+
+    def done(self, digest, user, target, filename, photo_id):
+        """Records that an upload finished, resulting in the given photo.
+
+        For replacements, the entries of earlier replacements of the same
+        photo are removed, as the photo no longer has their contents.
+        """
+
+        if target:
+            self.db.execute('DELETE FROM uploads WHERE user=? AND target=? AND digest!=?',
+                            (user, target, digest))
+        self._record(digest, user, target, filename, DONE, photo_id=photo_id)
+
+    def failed(self, digest, user, target, filename, error):
+        """Records that an upload failed."""
+        self._record(digest, user, target, filename, FAILED, error=str(error))
+
+    def _record(self, digest, user, target, filename, state, photo_id=None, error=None):
+        self.db.execute('INSERT OR REPLACE INTO uploads '
+                        '(digest, user, target, filename, state, photo_id, error, updated) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                        (digest, user, target, filename, state, photo_id, error, time.time()))
+
+    def incomplete(self):
+        """Returns (filename, state, error) tuples of the uploads that were
+        started or that failed, oldest first.
+        """
+
+        return self.db.execute('SELECT filename, state, error FROM uploads '
+                               'WHERE state != ? ORDER BY updated',
+                               (DONE, )).fetchall()
+
+    def forget(self, digest, user, target=''):
+        """Removes an entry, so that the file will be uploaded again."""
+
+        self.db.execute('DELETE FROM uploads WHERE digest=? AND user=? AND target=?',
+                        (digest, user, target))
+
+    def clear(self):
+        """Removes all entries."""
+        self.db.execute('DELETE FROM uploads')
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM uploads').fetchone()[0]
@@ -0,0 +1,183 @@
+"""Client-side rate limiting of Flickr API calls.
+
+Flickr allows roughly 3600 calls per hour per API key. Pass a rate limiter
+to the `FlickrAPI` constructor to pace the calls, instead of running into
+the limit::
+
+    limiter = TokenBucket(rate=3600 / 3600.0, capacity=10)
+    flickr = flickrapi.FlickrAPI(api_key, api_secret, rate_limiter=limiter)
+
+A `TokenBucket` can be shared between threads and FlickrAPI instances. To
+share the limit between processes on the same host, use `SQLiteTokenBucket`.
+"""
+
+import logging
+import os.path
+import threading
+import time
+
+LOG = logging.getLogger(__name__)
+
+__all__ = ('TokenBucket', 'SQLiteTokenBucket')
+
+# The number of calls per hour Flickr allows for a single API key.
+FLICKR_CALLS_PER_HOUR = 3600
+
+
+class TokenBucket(object):
+    """Thread-safe token bucket.
+
+    The bucket holds at most ``capacity`` tokens, and is refilled with
+    ``rate`` tokens per second. Every call takes one token; when the bucket
+    is empty, the call waits until a token becomes available.
+    """
+
+    def __init__(self, rate=FLICKR_CALLS_PER_HOUR / 3600.0, capacity=1):
+        """Creates a new token bucket.
+
+        rate
+            Tokens added per second.
+        capacity
+            Maximum number of tokens, i.e. the number of calls that can be
+            made in a burst after a period of inactivity.
+        """
+
+        if rate <= 0:
+            raise ValueError('rate must be positive, not %r' % rate)
+
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._updated = self._clock()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _clock():
+        return time.monotonic()
+
+    def reserve(self, tokens=1):
+        """Takes tokens from the bucket, without waiting.
+
+        Returns the number of seconds the caller has to wait before it may
+        perform its call; 0.0 if it can go ahead immediately.
+        """
+
+        with self._lock:
+            now = self._clock()
+            self._tokens, delay = _take(self._tokens, self._updated, now,
+                                        self.rate, self.capacity, tokens)
+            self._updated = now
+
+        return delay
+
+    def acquire(self, tokens=1):
+        """Takes tokens from the bucket, waiting until they are available.
+
+        Returns the number of seconds waited.
+        """
+
+        delay = self.reserve(tokens)
+        if delay > 0:
+            LOG.debug('Rate limit reached, waiting %.3f seconds', delay)
+            time.sleep(delay)
+
+        return delay
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """Token bucket stored in a SQLite database.
+
+    All processes using the same database file and bucket name share the
+    same tokens. Transactions on the database serialise access to the bucket.
+    """
+
+    def __init__(self, filename=None, rate=FLICKR_CALLS_PER_HOUR / 3600.0, capacity=1,
+                 name='flickr'):
+        """Creates a new token bucket.
+
+        filename
+            The SQLite database file. Defaults to ``ratelimit.sqlite`` in
+            ``~/.flickr``, the directory of the token cache.
+        name
+            Name of the bucket; buckets with different names are independent.
+
+        See `TokenBucket` for the other parameters.
+        """
+
+        if rate <= 0:
+            raise ValueError('rate must be positive, not %r' % rate)
+
+        if filename is None:
+            path = os.path.expanduser(os.path.join('~', '.flickr'))
+            if not os.path.exists(path):
+                os.makedirs(path)
+            filename = os.path.join(path, 'ratelimit.sqlite')
+
+        self.filename = filename
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+
+        self.create_table()
+
+    @staticmethod
+    def _clock():
+        # Monotonic clocks cannot be compared between processes.
+        return time.time()
+
+    def _connect(self):
+        import sqlite3
+
+        # isolation_level=None lets us control the transactions ourselves.
+        return sqlite3.connect(self.filename, timeout=30, isolation_level=None)
+
+    def create_table(self):
+        """Creates the DB table, if it doesn't exist already."""
+
+        db = self._connect()
+        try:
+            db.execute('''CREATE TABLE IF NOT EXISTS token_buckets (
+                          name varchar(64) not null PRIMARY KEY,
+                          tokens real not null,
+                          updated real not null)''')
+            db.execute('INSERT OR IGNORE INTO token_buckets (name, tokens, updated) '
+                       'VALUES (?, ?, ?)', (self.name, self.capacity, self._clock()))
+        finally:
+            db.close()
+
+    def reserve(self, tokens=1):
+        db = self._connect()
+        try:
+            # Take the write lock before reading, so that no other process
+            # can take the same tokens.
+            db.execute('BEGIN IMMEDIATE')
+            row = db.execute('SELECT tokens, updated FROM token_buckets WHERE name=?',
+                             (self.name,)).fetchone()
+            if row is None:
+                row = (self.capacity, self._clock())
+
+            now = max(self._clock(), row[1])
+            available, delay = _take(row[0], row[1], now, self.rate, self.capacity, tokens)
+            db.execute('INSERT OR REPLACE INTO token_buckets (name, tokens, updated) '
+                       'VALUES (?, ?, ?)', (self.name, available, now))
+            db.execute('COMMIT')
+        finally:
+            db.close()
+
+        return delay
+
+
+def _take(available, updated, now, rate, capacity, tokens):
+    """Refills the bucket and takes tokens from it.
+
+    The number of tokens may become negative; this reserves the tokens for
+    the caller, who has to wait until the bucket would be non-negative again.
+
+    :return: tuple (tokens left in bucket, seconds to wait)
+    """
+
+    available = min(capacity, available + (now - updated) * rate) - tokens
+    if available >= 0:
+        return available, 0.0
+
+    return available, -available / rate
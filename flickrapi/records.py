@@ -0,0 +1,246 @@
+"""Compact records for list responses.
+
+The 'records' format turns list responses, such as those of
+flickr.photos.search, flickr.photosets.getList and flickr.contacts.getList,
+into a `RecordPage`: a list with one immutable record per listed item::
+
+    flickr = flickrapi.FlickrAPI(api_key, api_secret, format='records')
+    photos = flickr.photos.search(tags='kitten', extras='owner_name')
+    for photo in photos:
+        print(photo.id, photo.title, photo.get('ownername'))
+
+A record is a named tuple of the XML attributes of the item, followed by
+the text of its child elements, such as the title and description of a
+photoset. An item that lacks an attribute which other items on the same
+page have gets None for it. Records have no attribute dictionary of their own,
+and values that repeat between items, such as owner NSIDs and server IDs,
+are interned so that the records share them.
+"""
+
+import collections
+import keyword
+import sys
+import threading
+
+__all__ = ('Record', 'RecordPage', 'record_type', 'parse_page', 'from_element')
+
+# Values of these attributes are interned, as they are shared by many items.
+INTERNED_FIELDS = frozenset((
+    'owner', 'ownername', 'server', 'farm', 'iconserver', 'iconfarm',
+    'ispublic', 'isfriend', 'isfamily', 'license', 'media', 'media_status',
+    'pathalias', 'path_alias', 'nsid', 'ignored', 'rev_ignored', 'isprimary',
+    'can_comment', 'can_public_comment', 'visibility_can_see_set',
+))
+
+# Attributes of which a list element has at least one, as it is paginated.
+PAGING_ATTRIBUTES = ('page', 'pages', 'perpage', 'per_page', 'total')
+
+# Mapping from (tag, field names) to record classes.
+_record_types = {}
+_lock = threading.Lock()
+
+
+class Record(object):
+    """Mixin for the record classes created by `record_type`.
+
+    Records are named tuples, so fields are available as attributes.
+    Like ElementTree elements, they also support ``record.get(name)``.
+    """
+
+    __slots__ = ()
+
+    # Set by record_type()
+    tag = None
+    _names = ()
+    _index = {}
+
+    def get(self, name, default=None):
+        """Returns the value of the named field, or default if it is missing."""
+
+        try:
+            value = self[self._index[name]]
+        except KeyError:
+            return default
+
+        if value is None:
+            return default
+        return value
+
+    def __reduce__(self):
+        return _make_record, (self.tag, self._names, tuple(self))
+
+
+def record_type(tag, fields):
+    """Returns the record class for items with the given tag and fields.
+
+    The classes are created once, and reused for every page with the same
+    tag and fields. Fields that aren't valid Python identifiers can only be
+    accessed with `Record.get`.
+
+    >>> Photo = record_type('photo', ('id', 'title'))
+    >>> photo = Photo('1234', 'Kitten')
+    >>> photo.title, photo.get('id'), photo.get('secret', '')
+    ('Kitten', '1234', '')
+    >>> record_type('photo', ('id', 'title')) is Photo
+    True
+    """
+
+    key = (tag, tuple(fields))
+    try:
+        return _record_types[key]
+    except KeyError:
+        pass
+
+    with _lock:
+        try:
+            return _record_types[key]
+        except KeyError:
+            pass
+
+        name = tag.capitalize() + 'Record'
+        if not name.isidentifier() or keyword.iskeyword(name):
+            name = 'Record'
+
+        base = collections.namedtuple(name, key[1], rename=True)
+        cls = type(name, (Record, base), {
+            '__slots__': (),
+            'tag': tag,
+            '_names': key[1],
+            '_index': dict((field, index) for index, field in enumerate(key[1])),
+        })
+
+        _record_types[key] = cls
+        return cls
+
+
+def _make_record(tag, fields, values):
+    """Unpickles a record."""
+    return record_type(tag, fields)(*values)
+
+
+class RecordPage(list):
+    """List of the records of one page of a list response.
+
+    The ``page``, ``pages``, ``perpage`` and ``total`` attributes are taken
+    from the list element, as integers, and ``attrib`` holds all its
+    attributes.
+    """
+
+    __slots__ = ('tag', 'attrib', 'page', 'pages', 'perpage', 'total')
+
+    def __init__(self, records=(), tag=None, attrib=None):
+        super(RecordPage, self).__init__(records)
+
+        self.tag = tag
+        self.attrib = attrib = attrib or {}
+        self.page = int(attrib.get('page', 1))
+        self.pages = int(attrib.get('pages', 1))
+        self.perpage = int(attrib.get('perpage') or attrib.get('per_page') or len(self))
+        self.total = int(attrib.get('total', len(self)))
+
+    def __reduce__(self):
+        return RecordPage, (list(self), self.tag, self.attrib)
+
+    def __copy__(self):
+        # The records are immutable, so they can be shared with the copy.
+        return RecordPage(self, self.tag, dict(self.attrib))
+
+    def __repr__(self):
+        return '<RecordPage %s page %i of %i, %i records>' % (
+            self.tag, self.page, self.pages, len(self))
+
+
+def _fields(elements):
+    """Returns the field names of the elements, in document order.
+
+    Attributes come first, followed by the child elements that aren't
+    also attributes.
+    """
+
+    attributes = collections.OrderedDict()
+    children = collections.OrderedDict()
+    for element in elements:
+        for name in element.attrib:
+            attributes[name] = None
+        for child in element:
+            children[child.tag] = None
+
+    return tuple(attributes) + tuple(name for name in children if name not in attributes)
+
+
+def _values(element, fields):
+    attrib = element.attrib
+    intern = sys.intern
+
+    values = []
+    for name in fields:
+        value = attrib.get(name)
+        if value is None:
+            child = element.find(name)
+            if child is not None:
+                value = child.text or ''
+        elif name in INTERNED_FIELDS:
+            value = intern(value)
+        values.append(value)
+
+    return values
+
+
+def from_element(element):
+    """Converts a single ElementTree element into a record.
+
+    >>> from xml.etree import ElementTree
+    >>> contact = from_element(ElementTree.fromstring(
+    ...     '<contact nsid="12037949629@N01" username="Eric" />'))
+    >>> contact.nsid, contact.username
+    ('12037949629@N01', 'Eric')
+    """
+
+    fields = _fields((element, ))
+    return record_type(element.tag, fields)(*_values(element, fields))
+
+
+def parse_page(rsp):
+    """Converts the ElementTree of a list response into a `RecordPage`.
+
+    The list element is the first child of ``<rsp>``, and every element in
+    it becomes a record. All records with the same tag get the same fields.
+    Raises ValueError if that element isn't a paginated list, such as the
+    ``<photo>`` of a flickr.photos.getInfo response.
+
+    >>> from xml.etree import ElementTree
+    >>> page = parse_page(ElementTree.fromstring(
+    ...     '<rsp stat="ok"><photos page="1" pages="3" perpage="2" total="6">'
+    ...     '<photo id="1" owner="73509078@N00" title="one" />'
+    ...     '<photo id="2" owner="73509078@N00" title="two" ispublic="1" />'
+    ...     '</photos></rsp>'))
+    >>> page.pages, [photo.title for photo in page]
+    (3, ['one', 'two'])
+    >>> page[0].ispublic is None
+    True
+    """
+
+    if len(rsp) == 0:
+        return RecordPage()
+
+    list_element = rsp[0]
+    if not any(name in list_element.attrib for name in PAGING_ATTRIBUTES):
+        raise ValueError('<%s> is not a paginated list, so the response cannot be '
+                         'parsed into records' % list_element.tag)
+
+    # Group the items by tag, keeping the order of the tags.
+    by_tag = collections.OrderedDict()
+    for element in list_element:
+        by_tag.setdefault(element.tag, []).append(element)
+
+    types = {}
+    for tag, elements in by_tag.items():
+        fields = _fields(elements)
+        types[tag] = (record_type(tag, fields), fields)
+
+    records = []
+    for element in list_element:
+        cls, fields = types[element.tag]
+        records.append(cls(*_values(element, fields)))
+
+    return RecordPage(records, list_element.tag, dict(list_element.attrib))
@@ -0,0 +1,165 @@
+"""Retrying Flickr API calls that failed due to transient errors.
+
+Pass a `RetryPolicy` to the `FlickrAPI` constructor to retry calls that
+failed because of a network problem or a 5xx response from Flickr::
+
+    flickr = flickrapi.FlickrAPI(api_key, api_secret,
+                                 retry_policy=RetryPolicy(max_attempts=5))
+
+By default only read methods (see `is_read_method`) are retried, as
+retrying a write may apply it twice. Every attempt is signed again, so
+it uses a fresh OAuth nonce and timestamp.
+"""
+
+import asyncio
+import logging
+import random
+import time
+
+import requests
+
+from flickrapi.exceptions import FlickrHTTPError
+
+LOG = logging.getLogger(__name__)
+
+__all__ = ('RetryPolicy', 'is_read_method')
+
+# Flickr method names (the part after the last dot) starting with one of
+# these prefixes only read data, and can safely be performed more than once.
+READ_METHOD_PREFIXES = ('get', 'search', 'find', 'lookup', 'check', 'resolve',
+                        'echo', 'login', 'null')
+
+# Methods that only read data, but whose names don't start with one of the
+# prefixes above.
+READ_METHODS = frozenset((
+    'flickr.photos.geo.photosForLocation',
+    'flickr.photos.recentlyUpdated',
+    'flickr.places.placesForBoundingBox',
+    'flickr.places.placesForContacts',
+    'flickr.places.placesForTags',
+    'flickr.places.placesForUser',
+    'flickr.places.tagsForPlace',
+))
+
+
+def is_read_method(method_name):
+    """Returns True iff the Flickr API method only reads data.
+
+    >>> is_read_method('flickr.photos.getInfo')
+    True
+    >>> is_read_method('flickr.photos.search')
+    True
+    >>> is_read_method('flickr.places.placesForUser')
+    True
+    >>> is_read_method('flickr.photos.addTags')
+    False
+    """
+
+    if not method_name:
+        return False
+
+    if not method_name.startswith('flickr.'):
+        method_name = 'flickr.' + method_name
+    if method_name in READ_METHODS:
+        return True
+
+    return method_name.rsplit('.', 1)[-1].startswith(READ_METHOD_PREFIXES)
+
+
+class RetryPolicy(object):
+    """Determines which failed calls are retried, and when.
+
+    The delay before retry ``n`` (starting at 1) is chosen randomly between
+    0 and ``min(max_backoff, backoff * 2 ** (n - 1))`` seconds ("full
+    jitter"), so that many clients that failed at the same moment don't all
+    retry at the same moment too.
+    """
+
+    # Exceptions that indicate a transient network problem.
+    transient_errors = (requests.exceptions.ConnectionError,
+                        requests.exceptions.Timeout,
+                        requests.exceptions.ChunkedEncodingError,
+                        asyncio.TimeoutError)
+
+    def __init__(self, max_attempts=5, backoff=0.5, max_backoff=30.0, deadline=120.0,
+                 retry_statuses=(429, 500, 502, 503, 504),
+                 retry_writes=False, retry_uploads=False):
+        """Creates a new retry policy.
+
+        max_attempts
+            The maximum number of attempts, including the first one.
+        backoff
+            The maximum delay before the first retry, in seconds. This
+            doubles with every retry.
+        max_backoff
+            The maximum delay between two attempts, in seconds.
+        deadline
+            No new attempt is started when it would start more than this
+            many seconds after the first attempt.
+        retry_statuses
+            HTTP status codes that are considered transient.
+        retry_writes
+            Set to True to also retry methods that modify data.
+        retry_uploads
+            Set to True to also retry uploads and replacements.
+        """
+
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_writes = retry_writes
+        self.retry_uploads = retry_uploads
+
+    def should_retry_method(self, method_name):
+        """Returns True iff calls to the given API method may be retried."""
+
+        return self.retry_writes or is_read_method(method_name)
+
+    def is_transient(self, error):
+        """Returns True iff the exception indicates a transient failure."""
+
+        if isinstance(error, FlickrHTTPError):
+            return error.status_code in self.retry_statuses
+
+        return isinstance(error, self.transient_errors)
+
+    def delays(self, start=None):
+        """Generator, yields the delay before each retry.
+
+        Stops when the maximum number of attempts or the deadline is reached.
+        ``start`` is the `time.monotonic` time of the first attempt; pass it
+        to count that attempt against the deadline, as the generator doesn't
+        start running until the first delay is requested.
+        """
+
+        if start is None:
+            start = time.monotonic()
+        for retry in range(1, self.max_attempts):
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (retry - 1)))
+            if time.monotonic() + delay - start > self.deadline:
+                return
+            yield delay
+
+    def call(self, func, retry=True):
+        """Calls ``func()``, retrying it on transient errors.
+
+        If ``retry`` is False, ``func()`` is called only once.
+        """
+
+        if not retry:
+            return func()
+
+        delays = self.delays(time.monotonic())
+        while True:
+            try:
+                return func()
+            except Exception as ex:
+                if not self.is_transient(ex):
+                    raise
+                delay = next(delays, None)
+                if delay is None:
+                    raise
+                LOG.info('Transient error (%s), retrying in %.3f seconds', ex, delay)
+                time.sleep(delay)
@@ -0,0 +1,73 @@
+"""Coalescing of identical concurrent calls.
+
+When several threads perform the same call at the same time, only the
+first one actually performs it; the others wait for its result. This
+prevents cache stampedes, where many threads miss the cache at the same
+moment and all call Flickr for the same data.
+"""
+
+import threading
+
+__all__ = ('SingleFlight', )
+
+
+class _Call(object):
+    """A call in flight, and its outcome once it is done."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """Performs at most one call per key at a time.
+
+    >>> flight = SingleFlight()
+    >>> flight.do('key', lambda: 42)
+    42
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        """Calls ``func()`` and returns its result.
+
+        If a call for the same key is already in flight in another thread,
+        waits for it and returns its result (or raises its exception)
+        instead.
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as ex:
+            # Also KeyboardInterrupt and the like, so that the waiting
+            # threads don't take None for the result.
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def __len__(self):
+        """Returns the number of calls in flight."""
+
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,129 @@
+"""Streaming parsing of Flickr REST responses.
+
+`ElementStream` parses a response while it is being received, and yields
+the interesting elements (such as the ``<photo>`` elements of a
+``flickr.photos.search`` response) as soon as they are complete. Every
+element is removed from the tree after it has been yielded, so only one
+element is kept in memory at a time::
+
+    for photo in flickr.stream_call('flickr.photos.search', tags='kitten',
+                                    per_page=500):
+        print(photo.get('title'))
+"""
+
+import logging
+import re
+from xml.etree.ElementTree import XMLPullParser
+
+from flickrapi.exceptions import FlickrError
+
+LOG = logging.getLogger(__name__)
+
+__all__ = ('ElementStream', )
+
+_PATH_COMPONENT = re.compile(r'^(\*|[\w.-]+)$')
+
+
+def parse_searchstring(searchstring):
+    """Converts a simple ElementPath expression into a list of tag names.
+
+    Only paths of tag names and ``*`` are supported, relative to the
+    ``<rsp>`` element:
+
+    >>> parse_searchstring('*/photo')
+    ['*', 'photo']
+    >>> parse_searchstring('./photos/photo')
+    ['photos', 'photo']
+    """
+
+    components = searchstring.split('/')
+    if components[0] == '.':
+        components = components[1:]
+
+    if not components or not all(_PATH_COMPONENT.match(comp) for comp in components):
+        raise ValueError('Unsupported search string for streaming: %r' % searchstring)
+
+    return components
+
+
+class ElementStream(object):
+    """Iterates over the elements of a REST response as they are received.
+
+    chunks
+        Iterable of ``bytes`` chunks of the response body.
+    searchstring
+        Path of the elements to yield, relative to the ``<rsp>`` element,
+        such as ``'*/photo'``. See `parse_searchstring`.
+
+    Elements are yielded as soon as their end tag has been parsed, and are
+    cleared afterwards; copy what you need before moving on to the next
+    element. A `FlickrError` is raised when Flickr returns an error.
+
+    The attributes of the first element inside ``<rsp>``, such as the
+    ``page`` and ``pages`` attributes of ``<photos>``, are available in
+    ``list_attrib`` as soon as that element has been parsed.
+    """
+
+    def __init__(self, chunks, searchstring='*/photo'):
+        self.chunks = chunks
+        self.path = parse_searchstring(searchstring)
+        self.list_attrib = {}
+        self.stat = None
+
+    def __iter__(self):
+        parser = XMLPullParser(events=('start', 'end'))
+        # Elements that have been started, but not ended, starting at <rsp>.
+        stack = []
+
+        for chunk in self.chunks:
+            parser.feed(chunk)
+            for elt in self._events(parser, stack):
+                yield elt
+
+        parser.close()
+        for elt in self._events(parser, stack):
+            yield elt
+
+    def _events(self, parser, stack):
+        """Handles the parser events, yielding matching elements."""
+
+        path = self.path
+        depth = len(path)
+
+        for event, elt in parser.read_events():
+            if event == 'start':
+                stack.append(elt)
+                if len(stack) == 1:
+                    self.stat = elt.get('stat')
+                elif len(stack) == 2 and not self.list_attrib:
+                    self.list_attrib = dict(elt.attrib)
+                continue
+
+            stack.pop()
+
+            if len(stack) == 1 and elt.tag == 'err' and self.stat != 'ok':
+                raise FlickrError('Error: %(code)s: %(msg)s' % elt.attrib,
+                                  code=elt.get('code'))
+
+            if len(stack) != depth or not self._matches(stack, elt):
+                continue
+
+            yield elt
+
+            # Free the memory of the element we just yielded.
+            elt.clear()
+            stack[-1].remove(elt)
+
+    def _matches(self, stack, elt):
+        """Returns True iff the element is at the searched path.
+
+        ``stack`` holds its ancestors, starting at ``<rsp>``.
+        """
+
+        tags = [ancestor.tag for ancestor in stack[1:]]
+        tags.append(elt.tag)
+
+        for tag, wanted in zip(tags, self.path):
+            if wanted != '*' and tag != wanted:
+                return False
+        return True
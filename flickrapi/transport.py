@@ -0,0 +1,215 @@
+"""HTTP transports used to talk to Flickr.
+
+A transport performs the actual HTTP POST requests for
+`flickrapi.auth.OAuthFlickrInterface`. Pass one to the `FlickrAPI`
+constructor to control connection pooling and timeouts per instance::
+
+    transport = RequestsTransport(max_connections_per_host=32,
+                                  connect_timeout=3.05, read_timeout=30)
+    flickr = flickrapi.FlickrAPI(api_key, api_secret, transport=transport)
+
+`StubTransport` never touches the network, and can be used in unit tests
+and benchmarks.
+"""
+
+import threading
+import time
+
+import requests
+import requests.adapters
+
+__all__ = ('Transport', 'RequestsTransport', 'StubTransport', 'StubResponse')
+
+
+class Transport(object):
+    """Base class for HTTP transports."""
+
+    def post(self, url, data=None, headers=None, auth=None, timeout=None, stream=False):
+        """Performs a HTTP POST request.
+
+        :param data: dict of form parameters, or a file-like object.
+        :param headers: dict of HTTP headers.
+        :param auth: requests authentication handler that signs the request.
+        :param timeout: optional request timeout, in seconds.
+        :param stream: if True, the response body is not read before
+            returning, and can be read in chunks with ``iter_content``.
+
+        :return: a response object with ``status_code``, ``content``
+            and ``text`` attributes, and ``iter_content(chunk_size)`` and
+            ``close()`` methods.
+        """
+
+        raise NotImplementedError()
+
+    def close(self):
+        """Releases any resources held by this transport."""
+
+
+class RequestsTransport(Transport):
+    """Transport using a `requests.Session` with its own connection pool."""
+
+    def __init__(self, pool_size=10, max_connections_per_host=10, pool_block=False,
+                 keep_alive=True, connect_timeout=None, read_timeout=None,
+                 session=None):
+        """Creates a new transport.
+
+        pool_size
+            The number of per-host connection pools to keep.
+        max_connections_per_host
+            The number of connections kept alive per host.
+        pool_block
+            If True, never open more than ``max_connections_per_host``
+            connections to a host; requests wait for a free connection
+            instead.
+        keep_alive
+            Set to False to close the connection after every request.
+        connect_timeout, read_timeout
+            Timeouts in seconds, used when no timeout is given for a request.
+        session
+            The `requests.Session` to use. A new one is created if not given.
+        """
+
+        self.session = session or requests.Session()
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size,
+                                                pool_maxsize=max_connections_per_host,
+                                                pool_block=pool_block)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+
+    @classmethod
+    def from_session(cls, session):
+        """Returns a transport that uses the given `requests.Session` as it
+        is, without mounting its own connection pool on it.
+        """
+
+        self = cls.__new__(cls)
+        self.session = session
+        self.connect_timeout = None
+        self.read_timeout = None
+        return self
+
+    def _timeout(self, timeout):
+        """Returns the timeout to pass to requests."""
+
+        if timeout is not None:
+            return timeout
+        if self.connect_timeout is None and self.read_timeout is None:
+            return None
+        return self.connect_timeout, self.read_timeout
+
+    def post(self, url, data=None, headers=None, auth=None, timeout=None, stream=False):
+        return self.session.post(url, data=data, headers=headers, auth=auth,
+                                 timeout=self._timeout(timeout), stream=stream)
+
+    def close(self):
+        self.session.close()
+
+
+class StubResponse(object):
+    """Response returned by `StubTransport`."""
+
+    def __init__(self, content, status_code=200):
+        if not isinstance(content, bytes):
+            content = content.encode('utf-8')
+
+        self.content = content
+        self.status_code = status_code
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', 'replace')
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class StubTransport(Transport):
+    """In-memory transport, for unit tests and benchmarks.
+
+    Responses are registered with `add`, and matched against the URL
+    and the form parameters of each request::
+
+        stub = StubTransport()
+        stub.add(FlickrAPI.REST_URL, '<rsp stat="ok" />',
+                 params={'method': 'flickr.test.echo'})
+        flickr = FlickrAPI(api_key, api_secret, transport=stub)
+
+    The requests are signed as usual, and stored (as
+    `requests.PreparedRequest` objects) in ``stub.requests``.
+    """
+
+    def __init__(self, latency=0.0):
+        """Creates a new stub transport.
+
+        latency
+            Time in seconds each request takes, to simulate a network.
+        """
+
+        self.latency = latency
+        self.requests = []
+        self._responses = []
+        self._lock = threading.Lock()
+
+    def add(self, url, body=b'', status=200, params=None):
+        """Registers a response.
+
+        body
+            The response body, or a callable that takes the prepared
+            request and returns the body or a (status, body) tuple.
+        params
+            Optional dict of form parameters the request has to contain.
+            Values are compared as text.
+        """
+
+        params = {key: str(value) for key, value in (params or {}).items()}
+        with self._lock:
+            self._responses.append((url, params, body, status))
+
+    def _matches(self, url, data, resp_url, resp_params):
+        if url != resp_url:
+            return False
+        if not resp_params:
+            return True
+        if not isinstance(data, dict):
+            return False
+
+        for key, value in resp_params.items():
+            actual = data.get(key)
+            if isinstance(actual, bytes):
+                actual = actual.decode('utf-8')
+            if actual is None or str(actual) != value:
+                return False
+        return True
+
+    def post(self, url, data=None, headers=None, auth=None, timeout=None, stream=False):
+        prepared = requests.Request('POST', url, data=data, headers=headers,
+                                    auth=auth).prepare()
+
+        with self._lock:
+            self.requests.append(prepared)
+            for resp_url, resp_params, body, status in self._responses:
+                if self._matches(url, data, resp_url, resp_params):
+                    break
+            else:
+                raise requests.exceptions.ConnectionError(
+                    'StubTransport: no response registered for %s %s' % (url, data))
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if callable(body):
+            body = body(prepared)
+            if isinstance(body, tuple):
+                status, body = body
+
+        return StubResponse(body, status)
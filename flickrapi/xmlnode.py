@@ -5,13 +5,25 @@ There is no need to use this module directly, you'll get XMLNode instances
 from the FlickrAPI method calls.
 """
 
-import xml.dom.minidom
+from xml.etree import ElementTree
 
 __all__ = ('XMLNode', )
 
 
-class XMLNode:
-    """XMLNode -- generic class for holding an XML node"""
+class XMLNode(object):
+    """XMLNode -- generic class for holding an XML node
+
+    Attributes of the XML element are available with ``node['name']``,
+    child elements with ``node.tagname``, which is a list of XMLNodes:
+
+    >>> rsp = XMLNode.parse('<rsp stat="ok"><photo id="1"/><photo id="2"/></rsp>')
+    >>> rsp['stat']
+    'ok'
+    >>> [photo['id'] for photo in rsp.photo]
+    ['1', '2']
+    """
+
+    __slots__ = ('name', 'text', 'attrib', 'xml', '_children')
 
     def __init__(self):
         """Construct an empty XML node."""
@@ -19,6 +31,8 @@ class XMLNode:
         self.text = ""
         self.attrib = {}
         self.xml = None
+        # Mapping from tag name to list of child XMLNodes.
+        self._children = {}
 
     def __setitem__(self, key, item):
         """Store a node's attribute in the attrib hash."""
@@ -28,52 +42,119 @@ class XMLNode:
         """Retrieve a node's attribute from the attrib hash."""
         return self.attrib[key]
 
-    @classmethod
-    def __parse_element(cls, element, this_node):
-        """Recursive call to process this XMLNode."""
+    def __getattr__(self, name):
+        """Returns the list of child nodes with the given tag name."""
 
-        this_node.name = element.nodeName
+        # Only called when normal lookup fails; never look up private names
+        # in the children, as they may not have been set yet.
+        if name.startswith('_'):
+            raise AttributeError(name)
 
-        # add element attributes as attributes to this node
-        for i in range(element.attributes.length):
-            an = element.attributes.item(i)
-            this_node[an.name] = an.nodeValue
+        try:
+            return self._children[name]
+        except KeyError:
+            raise AttributeError(name)
 
-        for a in element.childNodes:
-            if a.nodeType == xml.dom.Node.ELEMENT_NODE:
+    @classmethod
+    def _from_element(cls, element):
+        """Recursively converts an ElementTree element into an XMLNode."""
+
+        node = cls()
+        node.name = element.tag
+        node.attrib = element.attrib
 
-                child = XMLNode()
-                # Ugly fix for an ugly bug. If an XML element <name />
-                # exists, it now overwrites the 'name' attribute
-                # storing the XML element name.
-                if not hasattr(this_node, a.nodeName) or a.nodeName == 'name':
-                    setattr(this_node, a.nodeName, [])
+        text = [element.text] if element.text else []
+        children = node._children
+        for child in element:
+            siblings = children.get(child.tag)
+            if siblings is None:
+                siblings = children[child.tag] = []
+            siblings.append(cls._from_element(child))
 
-                # add the child node as an attrib to this node
-                children = getattr(this_node, a.nodeName)
-                children.append(child)
+            if child.tail:
+                text.append(child.tail)
 
-                cls.__parse_element(a, child)
+        node.text = ''.join(text)
 
-            elif a.nodeType == xml.dom.Node.TEXT_NODE:
-                this_node.text += a.nodeValue
+        # Ugly fix for an ugly bug. If an XML element <name />
+        # exists, it overwrites the 'name' attribute
+        # storing the XML element name.
+        if 'name' in children:
+            node.name = children['name']
 
-        return this_node
+        return node
 
     @classmethod
-    def parse(cls, xml_str, store_xml=False):
+    def parse(cls, xml_str, store_xml=False, lazy=False):
         """Convert an XML string into a nice instance tree of XMLNodes.
 
         xml_str -- the XML to parse
         store_xml -- if True, stores the XML string in the root XMLNode.xml
+        lazy -- if True, child nodes are only created when they are first
+            accessed. This is faster when only a small part of a large
+            document is used.
 
         """
 
-        dom = xml.dom.minidom.parseString(xml_str)
-
-        # get the root
-        root_node = XMLNode()
+        element = ElementTree.fromstring(xml_str)
+        if lazy:
+            root_node = _LazyXMLNode(element)
+        else:
+            root_node = cls._from_element(element)
         if store_xml:
             root_node.xml = xml_str
 
-        return cls.__parse_element(dom.firstChild, root_node)
+        return root_node
+
+
+class _LazyXMLNode(XMLNode):
+    """XMLNode that creates its child nodes when they are first accessed.
+
+    Until then, the node keeps the ElementTree element it represents. The
+    ``text`` and ``_children`` slots are left empty, so that accessing them
+    ends up in `__getattr__`, which fills both and lets go of the element.
+    Child elements without children of their own become regular XMLNodes
+    straight away, so that a fully accessed lazy tree is no larger than an
+    eagerly parsed one.
+    """
+
+    __slots__ = ('_element', )
+
+    def __init__(self, element):
+        self._element = element
+        self.name = element.tag
+        self.attrib = element.attrib
+        self.xml = None
+
+        # See XMLNode._from_element
+        if element.find('name') is not None:
+            self.name = self._children['name']
+
+    def __getattr__(self, name):
+        if name in ('_children', 'text'):
+            self._materialise()
+            return object.__getattribute__(self, name)
+
+        return XMLNode.__getattr__(self, name)
+
+    def _materialise(self):
+        """Creates the child nodes and the text, and drops the element."""
+
+        element = self._element
+        children = {}
+        text = [element.text] if element.text else []
+        for child in element:
+            siblings = children.get(child.tag)
+            if siblings is None:
+                siblings = children[child.tag] = []
+            if len(child):
+                siblings.append(_LazyXMLNode(child))
+            else:
+                siblings.append(XMLNode._from_element(child))
+
+            if child.tail:
+                text.append(child.tail)
+
+        self._children = children
+        self.text = ''.join(text)
+        del self._element
@@ -0,0 +1,263 @@
+# -*- encoding: utf-8 -*-
+
+'''Unittest for the flickrapi.asyncapi module'''
+
+import asyncio
+import io
+import shutil
+import tempfile
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock  # noqa: F401
+
+import flickrapi
+from flickrapi.auth import FlickrAccessToken
+from flickrapi.exceptions import FlickrError
+
+key = u'ecd01ab8f00faf13e1f8801586e126fd'
+secret = u'2ee3f558fd79f292'
+
+OK_XML = b'<rsp stat="ok"><photo id="1234" /></rsp>'
+ERROR_XML = b'<rsp stat="fail"><err code="1" msg="Photo not found" /></rsp>'
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class AsyncFlickrAPITest(unittest.TestCase):
+    def setUp(self):
+        self.f = flickrapi.AsyncFlickrAPI(key, secret, store_token=False)
+
+    def fake_request(self, body):
+        calls = []
+
+        async def do_request(url, params=None, timeout=None):
+            calls.append(dict(params))
+            return body
+
+        self.f.flickr_oauth.async_do_request = do_request
+        return calls
+
+    def test_call_returns_awaitable(self):
+        calls = self.fake_request(OK_XML)
+
+        rsp = run(self.f.photos.getInfo(photo_id='1234'))
+
+        self.assertEqual('1234', rsp.find('photo').get('id'))
+        self.assertEqual([{'method': 'flickr.photos.getInfo', 'photo_id': '1234',
+                           'format': 'rest', 'nojsoncallback': 1}], calls)
+
+    def test_xmlnode_format(self):
+        self.fake_request(OK_XML)
+
+        rsp = run(self.f.photos.getInfo(photo_id='1234', format='xmlnode'))
+        self.assertEqual('1234', rsp.photo[0]['id'])
+
+    def test_error(self):
+        self.fake_request(ERROR_XML)
+
+        with self.assertRaises(FlickrError) as ctx:
+            run(self.f.photos.getInfo(photo_id='1234'))
+        self.assertEqual(1, ctx.exception.code)
+
+    def test_cache(self):
+        self.f.cache = flickrapi.SimpleCache()
+        calls = self.fake_request(OK_XML)
+
+        run(self.f.photos.getInfo(photo_id='1234'))
+        run(self.f.photos.getInfo(photo_id='1234'))
+        self.assertEqual(1, len(calls))
+
+    def test_concurrent_calls(self):
+        self.fake_request(OK_XML)
+
+        async def many():
+            calls = [self.f.photos.getInfo(photo_id=str(i)) for i in range(10)]
+            return await asyncio.gather(*calls)
+
+        self.assertEqual(10, len(run(many())))
+
+    def test_username_positional(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        f = flickrapi.AsyncFlickrAPI(key, secret, u'someuser', token_cache_location=tmpdir)
+
+        self.assertEqual(u'someuser', f.token_cache.lookup_key)
+        self.assertIsNone(f.flickr_oauth.aio_session)
+
+        session = object()
+        f = flickrapi.AsyncFlickrAPI(key, secret, session=session, store_token=False)
+        self.assertIs(session, f.flickr_oauth.aio_session)
+
+    def test_walk_not_available(self):
+        calls = self.fake_request(OK_XML)
+
+        self.assertRaises(NotImplementedError, self.f.walk, tags='kitten')
+        self.assertRaises(NotImplementedError, self.f.walk_set, '1234')
+        self.assertRaises(NotImplementedError, self.f.walk_columns, ['id'])
+        self.assertRaises(NotImplementedError, self.f.data_walker,
+                          self.f.photos.search)
+        self.assertEqual([], calls)
+
+    def test_stale_cache(self):
+        self.check_stale_cache()
+
+    def test_stale_parsed_cache(self):
+        self.f.parsed_cache = flickrapi.ParsedCache()
+        self.check_stale_cache()
+
+    def check_stale_cache(self):
+        self.f.cache = flickrapi.LRUCache(timeout=60, stale_after=0.05)
+        replies = [b'<rsp stat="ok"><photo id="old" /></rsp>',
+                   b'<rsp stat="ok"><photo id="new" /></rsp>']
+        calls = []
+
+        async def do_request(url, params=None, timeout=None):
+            calls.append(params)
+            return replies[len(calls) - 1]
+
+        self.f.flickr_oauth.async_do_request = do_request
+
+        async def scenario():
+            first = await self.f.photos.getInfo(photo_id='1234')
+            await asyncio.sleep(0.1)
+            # Served from the stale entry, which is refreshed in the background.
+            stale = await self.f.photos.getInfo(photo_id='1234')
+            await asyncio.sleep(0.01)
+            fresh = await self.f.photos.getInfo(photo_id='1234')
+            return [rsp.find('photo').get('id') for rsp in (first, stale, fresh)]
+
+        self.assertEqual(['old', 'old', 'new'], run(scenario()))
+        self.assertEqual(2, len(calls))
+
+    def test_coalesce(self):
+        calls = []
+
+        async def do_request(url, params=None, timeout=None):
+            calls.append(params)
+            await asyncio.sleep(0.01)
+            return OK_XML
+
+        self.f.flickr_oauth.async_do_request = do_request
+
+        async def many():
+            return await asyncio.gather(*[self.f.photos.getInfo(photo_id='1234')
+                                          for _ in range(5)])
+
+        self.assertEqual(5, len(run(many())))
+        self.assertEqual(1, len(calls))
+        self.assertEqual({}, self.f._in_flight)
+
+        self.f.single_flight = None
+        del calls[:]
+        run(many())
+        self.assertEqual(5, len(calls))
+
+    def test_batch(self):
+        in_flight = []
+        max_in_flight = []
+
+        async def do_request(url, params=None, timeout=None):
+            in_flight.append(1)
+            max_in_flight.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.pop()
+            if params['photo_id'] == 'missing':
+                return ERROR_XML
+            return ('<rsp stat="ok"><photo id="%s" /></rsp>' % params['photo_id']).encode()
+
+        self.f.flickr_oauth.async_do_request = do_request
+        calls = [('photos.getInfo', {'photo_id': photo_id})
+                 for photo_id in ('1', 'missing', '3', '4', '5')]
+
+        results = run(self.f.batch(calls, max_workers=2))
+
+        self.assertEqual('1', results[0].find('photo').get('id'))
+        self.assertIsInstance(results[1], FlickrError)
+        self.assertEqual('5', results[4].find('photo').get('id'))
+        self.assertLessEqual(max(max_in_flight), 2)
+
+        unordered = run(self.f.batch(calls, ordered=False))
+        self.assertEqual([0, 1, 2, 3, 4], sorted(index for index, _ in unordered))
+
+    def test_upload_requires_auth(self):
+        with self.assertRaises(flickrapi.IllegalArgumentException):
+            run(self.f.upload('photo.jpg'))
+
+    def test_upload_many(self):
+        self.f.token_cache.token = FlickrAccessToken(u'123-abc-def', u'token_secret', u'write',
+                                                     u'fullname', u'username', u'user_nsid')
+        in_flight = []
+        max_in_flight = []
+
+        async def do_upload(filename, url, params=None, fileobj=None, timeout=None):
+            in_flight.append(1)
+            max_in_flight.append(len(in_flight))
+            data = fileobj.read()
+            await asyncio.sleep(0.01)
+            in_flight.pop()
+            if data == b'bad':
+                return ERROR_XML
+            return b'<rsp stat="ok"><photoid>%s</photoid></rsp>' % params['title']
+
+        self.f.flickr_oauth.async_do_upload = do_upload
+        files = [{'filename': name, 'fileobj': io.BytesIO(data), 'title': name}
+                 for name, data in (('a.jpg', b'jpeg'), ('b.jpg', b'bad'), ('c.jpg', b'jpeg'))]
+        reports = []
+
+        results = run(self.f.upload_many(files, max_workers=2, progress_callback=reports.append))
+
+        self.assertEqual('a.jpg', results[0].find('photoid').text)
+        self.assertIsInstance(results[1], FlickrError)
+        self.assertEqual('c.jpg', results[2].find('photoid').text)
+        self.assertLessEqual(max(max_in_flight), 2)
+        self.assertEqual((3, 1), (reports[-1].files_done, reports[-1].files_failed))
+        self.assertEqual((11, 11), (reports[-1].bytes_sent, reports[-1].bytes_total))
+
+    def test_signed_request(self):
+        try:
+            from aiohttp import web
+        except ImportError:
+            self.skipTest('aiohttp not installed')
+
+        received = {}
+
+        async def handler(request):
+            received['authorization'] = request.headers.get('Authorization')
+            received['form'] = dict(await request.post())
+            return web.Response(body=OK_XML, content_type='text/xml')
+
+        async def scenario():
+            app = web.Application()
+            app.router.add_post('/services/rest/', handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+
+            try:
+                self.f.REST_URL = 'http://127.0.0.1:%i/services/rest/' % port
+                async with self.f:
+                    return await self.f.photos.getInfo(photo_id='1234')
+            finally:
+                await runner.cleanup()
+
+        rsp = run(scenario())
+
+        self.assertEqual('1234', rsp.find('photo').get('id'))
+        self.assertTrue(received['authorization'].startswith('OAuth '))
+        self.assertIn('oauth_signature=', received['authorization'])
+        self.assertEqual('flickr.photos.getInfo', received['form']['method'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# -*- encoding: utf-8 -*-
+
+'''Unittest for the flickrapi.backends module'''
+
+import unittest
+
+import flickrapi
+from flickrapi import backends
+
+key = u'ecd01ab8f00faf13e1f8801586e126fd'
+secret = u'2ee3f558fd79f292'
+
+OK_JSON = b'{"photo": {"id": "1234", "title": {"_content": "Kitten \\u2764"}}, "stat": "ok"}'
+FAIL_JSON = b'{"stat": "fail", "code": 1, "message": "Photo not found"}'
+
+
+class JSONBackendTest(unittest.TestCase):
+    def tearDown(self):
+        backends._json.factories.pop('test', None)
+        backends._json.resolved.clear()
+
+    def test_available_backends(self):
+        names = backends.available_json_backends()
+        self.assertIn('json', names)
+
+        for name in names:
+            parsed = backends.json_loads(name)(OK_JSON)
+            self.assertEqual(u'Kitten ❤', parsed['photo']['title']['_content'])
+
+    def test_resolved_once(self):
+        self.assertIs(backends.json_loads(), backends.json_loads())
+
+    def test_unknown_backend(self):
+        self.assertRaises(ValueError, backends.json_loads, 'nonexistant')
+
+    def test_register(self):
+        calls = []
+
+        def factory():
+            def loads(data):
+                calls.append(data)
+                return {'stat': 'ok'}
+            return loads
+
+        backends.register_json_backend('test', factory, preferred=True)
+        self.assertEqual({'stat': 'ok'}, backends.json_loads()(b'{}'))
+        self.assertEqual([b'{}'], calls)
+
+    def test_flickrapi_backend(self):
+        stub = flickrapi.StubTransport()
+        stub.add(flickrapi.FlickrAPI.REST_URL, OK_JSON)
+
+        for name in backends.available_json_backends():
+            f = flickrapi.FlickrAPI(key, secret, format='parsed-json', store_token=False,
+                                    transport=stub)
+            f.json_backend = name
+
+            self.assertEqual('1234', f.photos.getInfo(photo_id='1234')['photo']['id'])
+
+    def test_flickrapi_error(self):
+        stub = flickrapi.StubTransport()
+        stub.add(flickrapi.FlickrAPI.REST_URL, FAIL_JSON)
+
+        for name in backends.available_json_backends():
+            f = flickrapi.FlickrAPI(key, secret, format='parsed-json', store_token=False,
+                                    transport=stub)
+            f.json_backend = name
+
+            with self.assertRaises(flickrapi.FlickrError) as ctx:
+                f.photos.getInfo(photo_id='1234')
+            self.assertEqual(1, ctx.exception.code)
+
+
+class ETreeBackendTest(unittest.TestCase):
+    def test_available_backends(self):
+        names = backends.available_etree_backends()
+        self.assertIn('etree', names)
+
+        for name in names:
+            rsp = backends.etree_fromstring(name)(b'<rsp stat="ok"><photo id="1234" /></rsp>')
+            self.assertEqual('1234', rsp.find('photo').get('id'))
+
+    def test_resolved_once(self):
+        self.assertIs(backends.etree_fromstring(), backends.etree_fromstring())
+
+    def test_no_entity_expansion(self):
+        xml = (b'<!DOCTYPE rsp [<!ENTITY e SYSTEM "file:///etc/passwd">]>'
+               b'<rsp stat="ok">&e;</rsp>')
+
+        for name in backends.available_etree_backends():
+            try:
+                rsp = backends.etree_fromstring(name)(xml)
+            except Exception:
+                continue
+            self.assertNotIn('root:', rsp.text or '')
+
+    def test_flickrapi_backend(self):
+        stub = flickrapi.StubTransport()
+        stub.add(flickrapi.FlickrAPI.REST_URL, '<rsp stat="ok"><photo id="1234" /></rsp>')
+
+        for name in backends.available_etree_backends():
+            f = flickrapi.FlickrAPI(key, secret, store_token=False, transport=stub)
+            f.etree_backend = name
+
+            rsp = f.photos.getInfo(photo_id='1234')
+            self.assertEqual('1234', rsp.find('photo').get('id'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+# -*- encoding: utf-8 -*-
+
+'''Unittest for FlickrAPI.upload_many() and the flickrapi.bulk module'''
+
+import io
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import flickrapi
+from flickrapi import bulk
+from flickrapi.auth import FlickrAccessToken
+
+key = u'ecd01ab8f00faf13e1f8801586e126fd'
+secret = u'2ee3f558fd79f292'
+
+UPLOAD_XML = '<rsp stat="ok"><photoid>%s</photoid></rsp>'
+DUPLICATE_XML = ('<rsp stat="fail"><err code="9" msg="Duplicate photo" />'
+                 '<duplicate_photo_id>1234</duplicate_photo_id></rsp>')
+
+
+class UploadManyTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.stub = flickrapi.StubTransport()
+        token = FlickrAccessToken(u'123-abc-def', u'token_secret', u'write',
+                                  u'fullname', u'username', u'user_nsid')
+        self.f = flickrapi.FlickrAPI(key, secret, token=token, store_token=False,
+                                     transport=self.stub)
+
+        self.lock = threading.Lock()
+        self.uploaded = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def make_file(self, name, size):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'wb') as outfile:
+            outfile.write(name.encode('ascii') * (size // len(name)))
+        return path
+
+    def respond(self, body=UPLOAD_XML):
+        def callback(request):
+            with self.lock:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+            # Consume the multipart body, like sending it would.
+            data = request.body.read()
+            title = request.body.fields['title'].decode('utf8')
+
+            with self.lock:
+                self.in_flight -= 1
+                self.uploaded.append((title, len(data)))
+            return body % title if '%s' in body else body
+
+        self.stub.add(self.f.UPLOAD_URL, callback)
+
+    def test_upload_many(self):
+        self.respond()
+        paths = [self.make_file('photo%i.jpg' % i, 1000) for i in range(5)]
+
+        results = self.f.upload_many(paths, max_workers=3, format='etree')
+
+        self.assertEqual(['photo%i.jpg' % i for i in range(5)],
+                         [rsp.find('photoid').text for rsp in results])
+        self.assertEqual(5, len(self.uploaded))
+
+    def test_inputs(self):
+        self.respond()
+        path = self.make_file('a.jpg', 100)
+        fileobj = io.BytesIO(b'jpeg data')
+        fileobj.name = 'b.jpg'
+
+        results = self.f.upload_many([
+            path,
+            fileobj,
+            {'filename': 'c.jpg', 'fileobj': io.BytesIO(b'jpeg data'), 'title': 'C'},
+        ], format='etree', title='common')
+
+        self.assertEqual(['common', 'common', 'C'],
+                         [rsp.find('photoid').text for rsp in results])
+        self.assertFalse(fileobj.closed)
+
+    def test_failures_per_file(self):
+        def callback(request):
+            request.body.read()
+            if request.body.fields['title'] == b'dup.jpg':
+                return DUPLICATE_XML
+            if request.body.fields['title'] == b'bad.jpg':
+                return '<rsp stat="fail"><err code="5" msg="Filetype was not recognised" /></rsp>'
+            return UPLOAD_XML % 'ok'
+
+        self.stub.add(self.f.UPLOAD_URL, callback)
+        paths = [self.make_file(name, 100) for name in ('ok.jpg', 'dup.jpg', 'bad.jpg')]
+        paths.append(os.path.join(self.tmpdir, 'missing.jpg'))
+
+        results = self.f.upload_many(paths, format='etree')
+
+        self.assertEqual('ok', results[0].find('photoid').text)
+        self.assertIsInstance(results[1], flickrapi.exceptions.FlickrDuplicate)
+        self.assertEqual('1234', results[1].duplicate_photo_id)
+        self.assertIsInstance(results[2], flickrapi.FlickrError)
+        self.assertIsInstance(results[3], IOError)
+
+    def test_progress(self):
+        self.respond()
+        paths = [self.make_file('photo%i.jpg' % i, 20000) for i in range(4)]
+        reports = []
+
+        self.f.upload_many(paths, max_workers=2, progress_callback=reports.append)
+
+        last = reports[-1]
+        self.assertEqual((4, 4, 0), (last.files_done, last.files_total, last.files_failed))
+        self.assertEqual(sum(os.path.getsize(path) for path in paths), last.bytes_total)
+        self.assertEqual(last.bytes_total, last.bytes_sent)
+        self.assertEqual(0.0, last.eta)
+        self.assertGreater(last.bytes_per_second, 0)
+
+        done = [report.files_done for report in reports]
+        self.assertEqual(sorted(done), done)
+
+    def test_bytes_in_flight(self):
+        self.respond()
+        paths = [self.make_file('photo%i.jpg' % i, 1000) for i in range(6)]
+
+        self.f.upload_many(paths, max_workers=6, max_bytes_in_flight=2000)
+
+        self.assertEqual(6, len(self.uploaded))
+        self.assertLessEqual(self.max_in_flight, 2)
+
+    def test_unordered(self):
+        self.respond()
+        paths = [self.make_file('photo%i.jpg' % i, 100) for i in range(3)]
+
+        results = dict(self.f.upload_many(paths, ordered=False, format='etree'))
+        self.assertEqual([0, 1, 2], sorted(results))
+        self.assertEqual('photo2.jpg', results[2].find('photoid').text)
+
+
+class ProgressFileTest(unittest.TestCase):
+    def test_rewind(self):
+        counted = []
+        wrapped = bulk.ProgressFile(io.BytesIO(b'0123456789'), counted.append)
+
+        self.assertEqual(10, wrapped.len)
+        self.assertEqual(b'0123', wrapped.read(4))
+        self.assertEqual(6, wrapped.len)
+
+        wrapped.seek(0)
+        self.assertEqual(10, wrapped.len)
+        self.assertEqual([4, -4], counted)
+
+    def test_budget(self):
+        budget = bulk.ByteBudget(100)
+
+        budget.acquire(500)  # Larger than the budget, but nothing else in flight.
+        self.assertEqual(500, budget.in_flight)
+        budget.release(500)
+        self.assertEqual(0, budget.in_flight)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,11 +2,18 @@
 
 '''Unittest for the flickrapi.cache module'''
 
+import os.path
 import unittest
 import sys
+import threading
 import time
 import six
 
+try:
+    import lz4
+except ImportError:
+    lz4 = None
+
 # Make sure the flickrapi module from the source distribution is used
 sys.path.insert(0, '..')
 
@@ -45,3 +52,657 @@ class TestCache(unittest.TestCase):
         removed = float(max_entries) / cache.cull_frequency
 
         self.assertEqual(100 - removed, len(cache))
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_store_retrieve(self):
+        cache = flickrapi.LRUCache()
+        cache.set('abc', 'def')
+        self.assertEqual('def', cache.get('abc'))
+        self.assertIn('abc', cache)
+
+    def test_dict_keys(self):
+        cache = flickrapi.LRUCache()
+        cache.set({'method': 'flickr.photos.getInfo'}, 'def')
+        self.assertEqual('def', cache.get({'method': 'flickr.photos.getInfo'}))
+
+    def test_expire(self):
+        cache = flickrapi.LRUCache(timeout=0.1)
+        cache.set('abc', 'def')
+        cache.set('long', 'lived', timeout=60)
+        time.sleep(0.15)
+
+        self.assertNotIn('abc', cache)
+        self.assertEqual(1, len(cache))
+
+    def test_proactive_expiry(self):
+        cache = flickrapi.LRUCache(timeout=0.1)
+        cache.set('abc', 'def')
+        time.sleep(0.15)
+
+        # Setting another key removes the expired one without touching it.
+        cache.set('other', 'value')
+        self.assertNotIn('abc', cache.storage)
+
+    def test_delete(self):
+        cache = flickrapi.LRUCache()
+        cache.set('abc', 'def')
+        cache.delete('abc')
+        self.assertNotIn('abc', cache)
+        cache.delete('abc')
+
+    def test_lru_eviction(self):
+        cache = flickrapi.LRUCache(max_entries=3)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.set('c', 3)
+
+        # Use 'a', so that 'b' is the least recently used.
+        cache.get('a')
+        cache.set('d', 4)
+
+        self.assertEqual(3, len(cache))
+        self.assertNotIn('b', cache)
+        for key in ('a', 'c', 'd'):
+            self.assertIn(key, cache)
+
+    def test_overwrite_keeps_heap_small(self):
+        cache = flickrapi.LRUCache()
+        for num in six.moves.range(1000):
+            cache.set('key', num)
+
+        self.assertEqual(999, cache.get('key'))
+        self.assertLess(len(cache.expiry_heap), 100)
+
+    def test_default_cache(self):
+        f = flickrapi.FlickrAPI(u'123', u'123', store_token=False, cache=True)
+        self.assertIsInstance(f.cache, flickrapi.LRUCache)
+
+
+class TestLRUCacheSize(unittest.TestCase):
+    def test_max_bytes(self):
+        cache = flickrapi.LRUCache(max_entries=None, max_bytes=1000)
+        cache.set('a', b'a' * 400)
+        cache.set('b', b'b' * 400)
+        cache.get('a')
+        cache.set('c', b'c' * 400)
+
+        # 'b' was least recently used.
+        self.assertEqual(['a', 'c'], sorted(cache.storage))
+        self.assertEqual(800, cache.size)
+
+        cache.delete('a')
+        self.assertEqual(400, cache.size)
+
+    def test_too_large(self):
+        cache = flickrapi.LRUCache(max_bytes=100)
+        cache.set('a', b'a' * 10)
+        cache.set('b', b'b' * 101)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(b'a' * 10, cache.get('a'))
+
+    def check_compression(self, compression):
+        data = b'<rsp stat="ok">' + b'<photo id="1234" />' * 1000 + b'</rsp>'
+
+        cache = flickrapi.LRUCache(compress=compression)
+        cache.set('key', data)
+        cache.set('small', b'<rsp stat="ok" />')
+
+        self.assertEqual(data, cache.get('key'))
+        self.assertEqual(b'<rsp stat="ok" />', cache.get('small'))
+        self.assertLess(cache.size, len(data) // 10)
+
+    def test_parsed_values(self):
+        from xml.etree import ElementTree
+
+        rsp = ElementTree.fromstring('<rsp stat="ok"><photos>%s</photos></rsp>'
+                                     % ('<photo id="1234" title="Kitten" />' * 100))
+        cache = flickrapi.ParsedCache(flickrapi.LRUCache(max_entries=None, max_bytes=10000),
+                                      copy=False)
+
+        cache.set('small', rsp.find('photos/photo'))
+        self.assertIsNotNone(cache.get('small'))
+
+        # The whole tree is measured, not just the root element.
+        cache.set('large', rsp)
+        self.assertIsNone(cache.get('large'))
+        self.assertLessEqual(cache.cache.size, 10000)
+
+    def test_compress_zlib(self):
+        self.check_compression('zlib')
+
+    @unittest.skipUnless(lz4, 'lz4 is not installed')
+    def test_compress_lz4(self):
+        self.check_compression('lz4')
+
+    def test_unknown_compression(self):
+        self.assertRaises(ValueError, flickrapi.LRUCache, compress='gzip')
+
+
+class TestCacheStats(unittest.TestCase):
+    def test_lru_stats(self):
+        cache = flickrapi.LRUCache(timeout=10, max_entries=2)
+        cache.set('flickr.photos.getInfo:1', b'12345')
+        cache.get('flickr.photos.getInfo:1')
+        cache.get('flickr.photos.getInfo:2')
+        cache.get('flickr.photos.search:1')
+        cache.set('flickr.photos.getInfo:2', b'12345')
+        cache.set('flickr.photos.getInfo:3', b'12345')
+        cache.set('flickr.photos.getInfo:4', b'12345', timeout=-1)
+        cache.get('flickr.photos.getInfo:4')
+
+        snapshot = cache.snapshot()
+        self.assertEqual(1, snapshot['hits'])
+        self.assertEqual(3, snapshot['misses'])
+        self.assertEqual(0.25, snapshot['hit_ratio'])
+        self.assertEqual(2, snapshot['evictions'])
+        self.assertEqual(1, snapshot['expirations'])
+        self.assertEqual(1, snapshot['entries'])
+        self.assertEqual(5, snapshot['bytes'])
+        self.assertGreaterEqual(snapshot['lock_wait'], 0.0)
+        self.assertEqual({'hits': 1, 'misses': 2, 'hit_ratio': 1 / 3.0},
+                         snapshot['methods']['flickr.photos.getInfo'])
+        self.assertEqual({'hits': 0, 'misses': 1, 'hit_ratio': 0.0},
+                         snapshot['methods']['flickr.photos.search'])
+
+        cache.reset_stats()
+        snapshot = cache.snapshot()
+        self.assertEqual(0, snapshot['hits'])
+        self.assertIsNone(snapshot['hit_ratio'])
+        self.assertEqual({}, snapshot['methods'])
+        self.assertEqual(1, snapshot['entries'])
+
+    def test_simple_cache_len(self):
+        cache = flickrapi.SimpleCache()
+        cache.set('a', 'a')
+        cache.set('b', 'b', timeout=-1)
+
+        self.assertEqual(1, len(cache))
+
+        cache.get('a')
+        cache.get('b')
+        snapshot = cache.snapshot()
+        self.assertEqual(1, snapshot['hits'])
+        self.assertEqual(1, snapshot['misses'])
+        self.assertEqual(1, snapshot['expirations'])
+        self.assertEqual(1, snapshot['entries'])
+
+    def test_parsed_cache_stats(self):
+        cache = flickrapi.ParsedCache()
+        cache.set('flickr.photos.getInfo:1', {'photo': {}})
+        cache.get('flickr.photos.getInfo:1')
+        cache.get('flickr.photos.getInfo:2')
+
+        snapshot = cache.snapshot()
+        self.assertEqual((1, 1, 1), (snapshot['hits'], snapshot['misses'], snapshot['entries']))
+
+        cache.reset_stats()
+        self.assertEqual(0, cache.snapshot()['misses'])
+
+    def test_negative_cache_stats(self):
+        cache = flickrapi.NegativeCache()
+        params = {'method': 'flickr.photos.getInfo', 'photo_id': '1234'}
+        cache.check(params)
+        cache.add(params, flickrapi.FlickrError('Error: 1: Photo not found', code=1))
+        self.assertRaises(flickrapi.FlickrError, cache.check, params)
+
+        snapshot = cache.snapshot()
+        self.assertEqual((1, 1, 1), (snapshot['hits'], snapshot['misses'], snapshot['entries']))
+        # Counted under the method, not the 'error:' prefix of the key.
+        self.assertEqual(['flickr.photos.getInfo'], list(snapshot['methods']))
+
+        cache.reset_stats()
+        self.assertEqual(0, cache.snapshot()['hits'])
+
+
+class TestCacheKey(unittest.TestCase):
+    def test_order_and_types(self):
+        from flickrapi.cache import cache_key
+
+        key1 = cache_key({'method': 'flickr.photos.search', 'per_page': 10, 'tags': u'kitten'})
+        key2 = cache_key({'tags': b'kitten', 'per_page': '10', 'method': 'flickr.photos.search'})
+        self.assertEqual(key1, key2)
+        self.assertTrue(key1.startswith('flickr.photos.search:'))
+
+    def test_oauth_ignored(self):
+        from flickrapi.cache import cache_key
+
+        key1 = cache_key({'method': 'flickr.test.echo', 'oauth_nonce': '123'})
+        key2 = cache_key({'method': 'flickr.test.echo', 'oauth_nonce': '456'})
+        self.assertEqual(key1, key2)
+
+    def test_different_calls(self):
+        from flickrapi.cache import cache_key
+
+        self.assertNotEqual(cache_key({'method': 'flickr.photos.getInfo', 'photo_id': '1'}),
+                            cache_key({'method': 'flickr.photos.getInfo', 'photo_id': '2'}))
+        self.assertNotEqual(cache_key({'method': 'flickr.test.echo', 'format': 'rest'}),
+                            cache_key({'method': 'flickr.test.echo', 'format': 'json'}))
+
+    def test_backends_share_entries(self):
+        for cache in (flickrapi.SimpleCache(), flickrapi.LRUCache()):
+            cache.set({'method': 'flickr.photos.getInfo', 'photo_id': 1234}, 'value')
+            self.assertEqual('value', cache.get({'photo_id': '1234',
+                                                 'method': 'flickr.photos.getInfo'}))
+
+    def test_flickrapi_cache_hit(self):
+        stub = flickrapi.StubTransport()
+        stub.add(flickrapi.FlickrAPI.REST_URL, '<rsp stat="ok" />')
+        f = flickrapi.FlickrAPI(u'123', u'123', store_token=False, cache=True, transport=stub)
+
+        f.photos.search(tags='kitten', per_page=10)
+        f.photos.search(per_page='10', tags='kitten')
+        self.assertEqual(1, len(stub.requests))
+
+
+class TestSQLiteCache(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'responses.sqlite')
+
+    def tearDown(self):
+        import shutil
+
+        shutil.rmtree(self.tmpdir)
+
+    def test_store_retrieve(self):
+        cache = flickrapi.SQLiteCache(self.filename)
+        cache.set('abc', b'<rsp stat="ok" />')
+        cache.set('tuple', (1, 'two'))
+
+        self.assertEqual(b'<rsp stat="ok" />', cache.get('abc'))
+        self.assertEqual((1, 'two'), cache.get('tuple'))
+        self.assertIsNone(cache.get('nonexistant'))
+
+    def test_persistent(self):
+        flickrapi.SQLiteCache(self.filename).set('abc', b'def')
+
+        # Another instance, possibly in another process, sees the entry.
+        self.assertEqual(b'def', flickrapi.SQLiteCache(self.filename).get('abc'))
+
+    def test_expire(self):
+        cache = flickrapi.SQLiteCache(self.filename, timeout=0.1)
+        cache.set('abc', b'def')
+        cache.set('long', b'lived', timeout=60)
+        time.sleep(0.15)
+
+        self.assertNotIn('abc', cache)
+        self.assertEqual(1, len(cache))
+
+    def test_delete(self):
+        cache = flickrapi.SQLiteCache(self.filename)
+        cache.set('abc', b'def')
+        cache.delete('abc')
+        self.assertNotIn('abc', cache)
+
+    def test_max_entries(self):
+        cache = flickrapi.SQLiteCache(self.filename, max_entries=10, cull_interval=5)
+
+        for num in six.moves.range(20):
+            cache.set('key-%03d' % num, b'value', timeout=100 + num)
+
+        self.assertEqual(10, len(cache))
+        # The entries that would expire first were removed.
+        self.assertNotIn('key-000', cache)
+        self.assertIn('key-019', cache)
+
+    def test_threads(self):
+        import threading
+
+        cache = flickrapi.SQLiteCache(self.filename)
+
+        def worker(num):
+            for i in six.moves.range(20):
+                cache.set('key-%i-%i' % (num, i), b'value')
+                cache.get('key-%i-%i' % (num, i))
+
+        threads = [threading.Thread(target=worker, args=(num,)) for num in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(80, len(cache))
+
+    def test_stats(self):
+        cache = flickrapi.SQLiteCache(self.filename, max_entries=1, cull_interval=1)
+
+        cache.set('flickr.photos.getInfo:1', b'12345', timeout=-1)
+        cache.get('flickr.photos.getInfo:1')
+        cache.set('flickr.photos.getInfo:2', b'12345')
+        cache.set('flickr.photos.getInfo:3', b'12345', timeout=600)
+        cache.get('flickr.photos.getInfo:3')
+
+        snapshot = cache.snapshot()
+        self.assertEqual((1, 1), (snapshot['hits'], snapshot['misses']))
+        self.assertEqual((1, 1), (snapshot['expirations'], snapshot['evictions']))
+        self.assertEqual(1, snapshot['entries'])
+        self.assertEqual({'hits': 1, 'misses': 1, 'hit_ratio': 0.5},
+                         snapshot['methods']['flickr.photos.getInfo'])
+
+        cache.reset_stats()
+        self.assertEqual(0, cache.snapshot()['hits'])
+
+    def test_flickrapi(self):
+        stub = flickrapi.StubTransport()
+        stub.add(flickrapi.FlickrAPI.REST_URL, '<rsp stat="ok" />')
+        f = flickrapi.FlickrAPI(u'123', u'123', store_token=False, transport=stub,
+                                cache=flickrapi.SQLiteCache(self.filename))
+
+        f.photos.getSizes(photo_id='1234')
+        f.photos.getSizes(photo_id='1234')
+        self.assertEqual(1, len(stub.requests))
+
+
+class TestParsedCache(unittest.TestCase):
+    def setUp(self):
+        self.stub = flickrapi.StubTransport()
+        self.stub.add(flickrapi.FlickrAPI.REST_URL,
+                      '<rsp stat="ok"><photo id="1234"><title>Kitten</title></photo></rsp>')
+        self.f = flickrapi.FlickrAPI(u'123', u'123', store_token=False, transport=self.stub,
+                                     parsed_cache=True)
+
+    def test_copy_on_read(self):
+        cache = flickrapi.ParsedCache()
+        cache.set('key', {'photos': [{'id': '1234'}]})
+
+        cached = cache.get('key')
+        cached['photos'].append('modified')
+        self.assertEqual({'photos': [{'id': '1234'}]}, cache.get('key'))
+
+    def test_no_copy(self):
+        cache = flickrapi.ParsedCache(copy=False)
+        value = {'photos': []}
+        cache.set('key', value)
+        self.assertIs(value, cache.get('key'))
+
+    def test_etree_hit(self):
+        rsp = self.f.photos.getInfo(photo_id='1234')
+        rsp.find('photo/title').text = 'Modified'
+
+        rsp = self.f.photos.getInfo(photo_id='1234')
+        self.assertEqual('Kitten', rsp.find('photo/title').text)
+        self.assertEqual(1, len(self.stub.requests))
+
+    def test_xmlnode_hit(self):
+        rsp = self.f.photos.getInfo(photo_id='1234', format='xmlnode')
+        rsp.photo[0].title[0].text = 'Modified'
+
+        rsp = self.f.photos.getInfo(photo_id='1234', format='xmlnode')
+        self.assertEqual('Kitten', rsp.photo[0].title[0].text)
+        self.assertEqual(1, len(self.stub.requests))
+
+    def test_records_copy(self):
+        from flickrapi.records import RecordPage, record_type
+
+        photo = record_type('photo', ('id', ))('1234')
+        cache = flickrapi.ParsedCache()
+        cache.set('key', RecordPage([photo], 'photos', {'page': '1'}))
+
+        cached = cache.get('key')
+        cached.append(photo)
+        cached.attrib['page'] = '2'
+
+        cached = cache.get('key')
+        self.assertEqual(1, len(cached))
+        self.assertEqual('1', cached.attrib['page'])
+        # The records themselves are immutable, and shared.
+        self.assertIs(photo, cached[0])
+
+    def test_keyed_by_parse_format(self):
+        self.f.photos.getInfo(photo_id='1234', format='etree')
+        node = self.f.photos.getInfo(photo_id='1234', format='xmlnode')
+
+        self.assertEqual('Kitten', node.photo[0].title[0].text)
+        self.assertEqual(2, len(self.stub.requests))
+
+    def test_errors_not_cached(self):
+        stub = flickrapi.StubTransport()
+        stub.add(flickrapi.FlickrAPI.REST_URL,
+                 '<rsp stat="fail"><err code="1" msg="Photo not found" /></rsp>')
+        f = flickrapi.FlickrAPI(u'123', u'123', store_token=False, transport=stub,
+                                parsed_cache=True)
+
+        self.assertRaises(flickrapi.FlickrError, f.photos.getInfo, photo_id='1234')
+        self.assertRaises(flickrapi.FlickrError, f.photos.getInfo, photo_id='1234')
+        self.assertEqual(2, len(stub.requests))
+
+    def test_errors_not_in_response_cache(self):
+        stub = flickrapi.StubTransport()
+        f = flickrapi.FlickrAPI(u'123', u'123', store_token=False, transport=stub,
+                                cache=True)
+
+        stub.add(flickrapi.FlickrAPI.REST_URL,
+                 '<rsp stat="fail"><err code="1" msg="Photo not found" /></rsp>')
+        self.assertRaises(flickrapi.FlickrError, f.photos.getInfo, photo_id='1234')
+        f.photos.getInfo(photo_id='1234', format='rest')
+
+        stub.add(flickrapi.FlickrAPI.REST_URL,
+                 '{"stat":"fail","code":1,"message":"Photo not found"}')
+        f.photos.getInfo(photo_id='1234', format='json')
+
+        self.assertEqual(3, len(stub.requests))
+        self.assertEqual(0, len(f.cache))
+
+
+class TestStaleWhileRevalidate(unittest.TestCase):
+    def test_lookup(self):
+        cache = flickrapi.LRUCache(timeout=10, stale_after=0.01)
+        cache.set('key', 'value')
+        self.assertEqual(('value', False), cache.lookup('key'))
+
+        time.sleep(0.02)
+        self.assertEqual(('value', True), cache.lookup('key'))
+        self.assertEqual('value', cache.get('key'))
+        self.assertEqual((None, False), cache.lookup('missing'))
+
+    def test_background_refresh(self):
+        replies = []
+        release = threading.Event()
+
+        def body(request):
+            replies.append(request)
+            if len(replies) > 1:
+                release.wait(5)
+            return '<rsp stat="ok"><photo id="%d" /></rsp>' % len(replies)
+
+        stub = flickrapi.StubTransport()
+        stub.add(flickrapi.FlickrAPI.REST_URL, body)
+        cache = flickrapi.LRUCache(timeout=10, stale_after=0.01)
+        f = flickrapi.FlickrAPI(u'123', u'123', store_token=False, transport=stub,
+                                cache=cache)
+
+        self.assertEqual('1', f.photos.getInfo(photo_id='1234').find('photo').get('id'))
+        time.sleep(0.02)
+
+        # The stale response is returned immediately, and refreshed once.
+        self.assertEqual('1', f.photos.getInfo(photo_id='1234').find('photo').get('id'))
+        self.assertEqual('1', f.photos.getInfo(photo_id='1234').find('photo').get('id'))
+        release.set()
+        f._revalidate_executor.shutdown(wait=True)
+
+        self.assertEqual(2, len(stub.requests))
+        self.assertEqual('2', f.photos.getInfo(photo_id='1234').find('photo').get('id'))
+
+    def test_parsed_cache(self):
+        replies = []
+
+        def body(request):
+            replies.append(request)
+            return '<rsp stat="ok"><photo id="%d" /></rsp>' % len(replies)
+
+        stub = flickrapi.StubTransport()
+        stub.add(flickrapi.FlickrAPI.REST_URL, body)
+        f = flickrapi.FlickrAPI(u'123', u'123', store_token=False, transport=stub,
+                                cache=flickrapi.LRUCache(timeout=10, stale_after=0.01),
+                                parsed_cache=True)
+
+        self.assertEqual('1', f.photos.getInfo(photo_id='1234').find('photo').get('id'))
+        time.sleep(0.02)
+
+        # The parsed response is as stale as the response it was parsed from.
+        self.assertEqual('1', f.photos.getInfo(photo_id='1234').find('photo').get('id'))
+        f._revalidate_executor.shutdown(wait=True)
+
+        self.assertEqual(2, len(stub.requests))
+        self.assertEqual('2', f.photos.getInfo(photo_id='1234').find('photo').get('id'))
+        self.assertEqual('2', f.photos.getInfo(photo_id='1234').find('photo').get('id'))
+        self.assertEqual(2, len(stub.requests))
+
+    def test_parsed_cache_expiry(self):
+        stub = flickrapi.StubTransport()
+        stub.add(flickrapi.FlickrAPI.REST_URL, '<rsp stat="ok" />')
+        f = flickrapi.FlickrAPI(u'123', u'123', store_token=False, transport=stub,
+                                cache=flickrapi.LRUCache(timeout=0.01), parsed_cache=True)
+
+        f.photos.getInfo(photo_id='1234')
+        f.photos.getInfo(photo_id='1234')
+        self.assertEqual(1, len(stub.requests))
+
+        # The parsed response expires with the response it was parsed from.
+        time.sleep(0.02)
+        f.photos.getInfo(photo_id='1234')
+        self.assertEqual(2, len(stub.requests))
+
+    def test_no_background_writes(self):
+        stub = flickrapi.StubTransport()
+        stub.add(flickrapi.FlickrAPI.REST_URL, '<rsp stat="ok" />')
+        f = flickrapi.FlickrAPI(u'123', u'123', store_token=False, transport=stub,
+                                cache=flickrapi.LRUCache(timeout=10, stale_after=0))
+
+        f.photos.addTags(photo_id='1234', tags='kitten')
+        f.photos.addTags(photo_id='1234', tags='kitten')
+        self.assertIsNone(f._revalidate_executor)
+        # Writes are never cached, so never served stale.
+        self.assertEqual(2, len(stub.requests))
+
+
+class TestInvalidation(unittest.TestCase):
+    def setUp(self):
+        self.stub = flickrapi.StubTransport()
+        self.stub.add(flickrapi.FlickrAPI.REST_URL, '<rsp stat="ok" />')
+        self.f = flickrapi.FlickrAPI(u'123', u'123', store_token=False, transport=self.stub,
+                                     cache=True, parsed_cache=True)
+
+    def test_index(self):
+        index = flickrapi.cache.InvalidationIndex()
+        index.add('info', {'method': 'flickr.photos.getInfo', 'photo_id': 1234})
+        index.add('set', {'method': 'flickr.photosets.getPhotos', 'photoset_id': '5'})
+
+        self.assertEqual({'info'}, index.pop({'photo_id': b'1234'}))
+        self.assertEqual(set(), index.pop({'photo_id': '1234'}))
+        self.assertEqual({'set'}, index.pop({'photo_ids': '1,2', 'photoset_id': 5}))
+        self.assertEqual(0, len(index))
+
+    def test_index_bounded(self):
+        index = flickrapi.cache.InvalidationIndex(max_keys=2)
+        self.assertEqual([], index.add('a', {'photo_id': 1}))
+        self.assertEqual([], index.add('b', {'photo_id': 2}))
+        self.assertEqual(['a'], index.add('c', {'photo_id': 3}))
+        self.assertEqual(2, len(index))
+
+    def test_write_evicts_reads(self):
+        self.f.photos.getInfo(photo_id='1234')
+        self.f.photos.getInfo(photo_id='5678')
+        self.f.photosets.getPhotos(photoset_id='42')
+        self.assertEqual(3, len(self.stub.requests))
+
+        self.f.photosets.addPhoto(photoset_id='42', photo_id='1234')
+        self.assertEqual(4, len(self.stub.requests))
+
+        self.f.photos.getInfo(photo_id='1234')
+        self.f.photos.getInfo(photo_id='5678')
+        self.f.photosets.getPhotos(photoset_id='42')
+        # Only the reads of the modified photo and photoset are performed again.
+        self.assertEqual(6, len(self.stub.requests))
+
+    def test_writes_not_cached(self):
+        self.f.photosets.create(title='Holiday', primary_photo_id='1234')
+        self.f.photosets.create(title='Holiday', primary_photo_id='1234')
+
+        self.assertEqual(2, len(self.stub.requests))
+        self.assertEqual(0, len(self.f.cache))
+        self.assertEqual(0, len(self.f.parsed_cache))
+
+    def test_failed_write_keeps_cache(self):
+        self.f.photos.getInfo(photo_id='1234')
+
+        stub = flickrapi.StubTransport()
+        stub.add(flickrapi.FlickrAPI.REST_URL,
+                 '<rsp stat="fail"><err code="99" msg="Insufficient permissions" /></rsp>')
+        self.f.flickr_oauth.transport = stub
+        self.assertRaises(flickrapi.FlickrError, self.f.photos.addTags,
+                          photo_id='1234', tags='kitten')
+
+        self.f.photos.getInfo(photo_id='1234')
+        self.assertEqual(1, len(self.stub.requests))
+
+
+class TestNegativeCache(unittest.TestCase):
+    def setUp(self):
+        self.stub = flickrapi.StubTransport()
+        self.stub.add(flickrapi.FlickrAPI.REST_URL,
+                      '<rsp stat="fail"><err code="1" msg="Photo not found" /></rsp>')
+        self.f = flickrapi.FlickrAPI(u'123', u'123', store_token=False, transport=self.stub,
+                                     negative_cache=True)
+
+    def test_error_cached(self):
+        for _ in range(3):
+            with self.assertRaises(flickrapi.FlickrError) as ctx:
+                self.f.photos.getInfo(photo_id='1234')
+            self.assertEqual(1, ctx.exception.code)
+            self.assertIn('Photo not found', str(ctx.exception))
+
+        self.assertEqual(1, len(self.stub.requests))
+
+        # Other calls are not affected.
+        self.assertRaises(flickrapi.FlickrError, self.f.photos.getInfo, photo_id='5678')
+        self.assertEqual(2, len(self.stub.requests))
+
+    def test_expire(self):
+        self.f.negative_cache = flickrapi.NegativeCache(timeout=0.01)
+
+        self.assertRaises(flickrapi.FlickrError, self.f.photos.getInfo, photo_id='1234')
+        time.sleep(0.02)
+        self.assertRaises(flickrapi.FlickrError, self.f.photos.getInfo, photo_id='1234')
+        self.assertEqual(2, len(self.stub.requests))
+
+    def test_other_codes_not_cached(self):
+        self.f.negative_cache = flickrapi.NegativeCache(codes=(2,))
+
+        self.assertRaises(flickrapi.FlickrError, self.f.photos.getInfo, photo_id='1234')
+        self.assertRaises(flickrapi.FlickrError, self.f.photos.getInfo, photo_id='1234')
+        self.assertEqual(2, len(self.stub.requests))
+
+    def test_write_evicts_errors(self):
+        def respond(request):
+            if b'flickr.photos.setPerms' in request.body:
+                return 200, '<rsp stat="ok" />'
+            return 200, '<rsp stat="fail"><err code="1" msg="Photo not found" /></rsp>'
+
+        self.stub = flickrapi.StubTransport()
+        self.stub.add(flickrapi.FlickrAPI.REST_URL, respond)
+        self.f.flickr_oauth.transport = self.stub
+
+        self.assertRaises(flickrapi.FlickrError, self.f.photos.getInfo, photo_id='1234')
+        self.assertRaises(flickrapi.FlickrError, self.f.photos.getInfo, photo_id='5678')
+        self.f.photos.setPerms(photo_id='1234', is_public=1)
+        self.assertEqual(3, len(self.stub.requests))
+
+        # The error of the modified photo is forgotten, the other one isn't.
+        self.assertRaises(flickrapi.FlickrError, self.f.photos.getInfo, photo_id='1234')
+        self.assertRaises(flickrapi.FlickrError, self.f.photos.getInfo, photo_id='5678')
+        self.assertEqual(4, len(self.stub.requests))
+
+    def test_writes_not_cached(self):
+        self.assertRaises(flickrapi.FlickrError, self.f.photos.delete, photo_id='1234')
+        self.assertRaises(flickrapi.FlickrError, self.f.photos.delete, photo_id='1234')
+        self.assertEqual(2, len(self.stub.requests))
+
+    def test_http_errors_not_cached(self):
+        cache = flickrapi.NegativeCache(codes=(1, 503))
+        cache.add({'method': 'flickr.test.echo'}, flickrapi.FlickrHTTPError('Oops', 503))
+        self.assertEqual(0, len(cache))
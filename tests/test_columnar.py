@@ -0,0 +1,106 @@
+# -*- encoding: utf-8 -*-
+
+'''Unittest for the flickrapi.columnar module'''
+
+import array
+import io
+import math
+import unittest
+from xml.etree import ElementTree
+
+from flickrapi.columnar import ColumnTable
+from flickrapi.records import parse_page
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+PHOTOS_XML = ('<rsp stat="ok"><photos page="1" pages="1" perpage="3" total="3">'
+              '<photo id="1" owner="73509078@N00" views="15" latitude="52.37" title="one" />'
+              '<photo id="2" owner="73509078@N00" views="3" latitude="" title="two" />'
+              '<photo id="3" owner="12037949629@N01" views="40" title="three" />'
+              '</photos></rsp>')
+
+FIELDS = ('id', 'owner', 'views', 'latitude', 'title')
+
+
+class ColumnTableTest(unittest.TestCase):
+    def setUp(self):
+        self.photos = ElementTree.fromstring(PHOTOS_XML).findall('*/photo')
+        self.table = ColumnTable.from_items(self.photos, FIELDS)
+
+    def test_columns(self):
+        table = self.table
+
+        self.assertEqual(3, len(table))
+        self.assertEqual(list(FIELDS), table.names)
+        self.assertEqual(array.array('q', [1, 2, 3]), table['id'])
+        self.assertEqual(array.array('q', [15, 3, 40]), table['views'])
+        self.assertEqual(['one', 'two', 'three'], table['title'])
+
+    def test_missing(self):
+        latitude = self.table['latitude']
+
+        self.assertEqual('d', latitude.typecode)
+        self.assertEqual(52.37, latitude[0])
+        self.assertTrue(math.isnan(latitude[1]))
+        self.assertTrue(math.isnan(latitude[2]))
+
+        table = ColumnTable.from_items(self.photos, ('ispublic', 'secret'))
+        self.assertEqual([0, 0, 0], list(table['ispublic']))
+        self.assertEqual([None, None, None], table['secret'])
+
+    def test_typecodes(self):
+        table = ColumnTable.from_items(self.photos, {'id': None, 'views': 'l'})
+
+        self.assertEqual(['1', '2', '3'], table['id'])
+        self.assertEqual('l', table['views'].typecode)
+        self.assertRaises(ValueError, ColumnTable.from_items, self.photos, {'title': 'q'})
+
+    def test_records(self):
+        table = ColumnTable.from_items(parse_page(ElementTree.fromstring(PHOTOS_XML)), FIELDS)
+        for name in ('id', 'owner', 'views', 'title'):
+            self.assertEqual(self.table[name], table[name])
+
+    def test_filter(self):
+        popular = self.table.filter([views > 10 for views in self.table['views']])
+
+        self.assertEqual(array.array('q', [1, 3]), popular['id'])
+        self.assertEqual(['one', 'three'], popular['title'])
+        self.assertEqual(3, len(self.table))
+        self.assertRaises(ValueError, self.table.filter, [True])
+
+    def test_select(self):
+        table = self.table.select('title', 'id')
+
+        self.assertEqual(['title', 'id'], table.names)
+        self.assertIs(self.table['id'], table['id'])
+
+    def test_different_lengths(self):
+        self.assertRaises(ValueError, ColumnTable, {'a': [1, 2], 'b': [1]})
+
+    def test_export(self):
+        self.assertEqual({'id': 1, 'owner': '73509078@N00', 'views': 15,
+                          'latitude': 52.37, 'title': 'one'},
+                         next(self.table.to_dicts()))
+
+        out = io.StringIO()
+        self.table.select('id', 'title').to_csv(out, lineterminator='\n')
+        self.assertEqual('id,title\n1,one\n2,two\n3,three\n', out.getvalue())
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_numpy(self):
+        columns = self.table.to_numpy()
+
+        self.assertEqual(numpy.int64, columns['id'].dtype)
+        self.assertEqual(55, columns['views'][columns['views'] > 10].sum())
+        self.assertEqual('two', columns['title'][1])
+
+        popular = self.table.filter(columns['views'] > 10)
+        self.assertEqual(array.array('q', [1, 3]), popular['id'])
+        self.assertEqual(['one', 'three'], popular['title'])
+
+
+if __name__ == '__main__':
+    unittest.main()
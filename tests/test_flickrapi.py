@@ -10,6 +10,7 @@ import json
 import logging
 import pkg_resources
 import sys
+import threading
 import types
 import unittest
 import urllib
@@ -461,6 +462,152 @@ class MockedWalkerTest(MockedTest):
                           '31964437076',
                           '32001922675'], ids)
 
+    def test_walk_prefetch(self):
+        pages = {b'1': WALK_PAGE_1_XML, b'2': WALK_PAGE_2_XML, b'3': WALK_PAGE_3_XML}
+        requested = []
+
+        def callback(request):
+            page = parse_qs(request.body)[b'page'][0]
+            requested.append(page)
+            return (200, {'Content-Type': 'text/xml'}, pages[page])
+
+        self.mock.add_callback(method='POST', url=self.f.REST_URL, callback=callback)
+
+        ids = [p.get('id') for p in self.f.walk(per_page=4, prefetch=2)]
+        self.assertEqual(['11192308693',
+                          '11853287542',
+                          '11627471650',
+                          '11161255944',
+                          '21627488910',
+                          '21884772401',
+                          '21161270134',
+                          '21964432216',
+                          '32001923265',
+                          '31964437076',
+                          '32001922675'], ids)
+        self.assertEqual([b'1', b'2', b'3'], sorted(requested))
+
+    def test_walk_prefetch_first_page(self):
+        pages = {b'1': WALK_PAGE_1_XML, b'2': WALK_PAGE_2_XML, b'3': WALK_PAGE_3_XML}
+        prefetched = threading.Event()
+        requested = []
+
+        def callback(request):
+            page = parse_qs(request.body)[b'page'][0]
+            requested.append(page)
+            if len(requested) == 3:
+                prefetched.set()
+            return (200, {'Content-Type': 'text/xml'}, pages[page])
+
+        self.mock.add_callback(method='POST', url=self.f.REST_URL, callback=callback)
+
+        # Pages 2 and 3 are fetched while the first page is consumed.
+        gen = self.f.walk(per_page=4, prefetch=2)
+        self.assertEqual('11192308693', next(gen).get('id'))
+        self.assertTrue(prefetched.wait(5))
+        self.assertEqual([b'1', b'2', b'3'], sorted(requested))
+        gen.close()
+
+    def test_walk_stream(self):
+        self.expect({'method': 'flickr.photos.search', 'per_page': '4', 'page': '1'}, WALK_PAGE_1_XML)
+        self.expect({'method': 'flickr.photos.search', 'per_page': '4', 'page': '2'}, WALK_PAGE_2_XML)
+        self.expect({'method': 'flickr.photos.search', 'per_page': '4', 'page': '3'}, WALK_PAGE_3_XML)
+
+        ids = [p.get('id') for p in self.f.walk(per_page=4, stream=True)]
+        self.assertEqual(['11192308693',
+                          '11853287542',
+                          '11627471650',
+                          '11161255944',
+                          '21627488910',
+                          '21884772401',
+                          '21161270134',
+                          '21964432216',
+                          '32001923265',
+                          '31964437076',
+                          '32001922675'], ids)
+
+    def test_walk_stream_prefetch(self):
+        gen = self.f.walk(per_page=4, stream=True, prefetch=2)
+        self.assertRaises(flickrapi.IllegalArgumentException, next, gen)
+
+    def test_walk_records(self):
+        from flickrapi.records import Record
+
+        for stream in (False, True):
+            self.expect({'method': 'flickr.photos.search', 'per_page': '4', 'page': '1'},
+                        WALK_PAGE_1_XML)
+            self.expect({'method': 'flickr.photos.search', 'per_page': '4', 'page': '2'},
+                        WALK_PAGE_2_XML)
+            self.expect({'method': 'flickr.photos.search', 'per_page': '4', 'page': '3'},
+                        WALK_PAGE_3_XML)
+
+            photos = list(self.f.walk(per_page=4, format='records', stream=stream))
+            self.assertEqual(11, len(photos))
+            self.assertTrue(all(isinstance(photo, Record) for photo in photos))
+            self.assertEqual('11192308693', photos[0].id)
+            self.assertEqual('32001922675', photos[-1].get('id'))
+
+    def test_walk_columns(self):
+        self.expect({'method': 'flickr.photos.search', 'per_page': '4', 'page': '1'}, WALK_PAGE_1_XML)
+        self.expect({'method': 'flickr.photos.search', 'per_page': '4', 'page': '2'}, WALK_PAGE_2_XML)
+        self.expect({'method': 'flickr.photos.search', 'per_page': '4', 'page': '3'}, WALK_PAGE_3_XML)
+
+        table = self.f.walk_columns(('id', 'farm', 'owner'), per_page=4)
+        self.assertEqual(11, len(table))
+        self.assertEqual(11192308693, table['id'][0])
+        self.assertEqual('q', table['id'].typecode)
+        self.assertEqual('147501035@N04', table['owner'][0])
+
+    def test_walk_default_format(self):
+        f = flickrapi.FlickrAPI(key, secret, format='xmlnode')
+        self.assertRaises(ValueError, f.walk)
+
+
+class BatchTest(MockedTest):
+    """Tests FlickrAPI.batch() on a mocked API."""
+
+    def setUp(self):
+        super(BatchTest, self).setUp()
+
+        def callback(request):
+            params = parse_qs(request.body)
+            photo_id = params[b'photo_id'][0].decode('utf8')
+            if photo_id == 'missing':
+                body = '<rsp stat="fail"><err code="1" msg="Photo not found" /></rsp>'
+            else:
+                body = '<rsp stat="ok"><photo id="%s" /></rsp>' % photo_id
+            return (200, {'Content-Type': 'text/xml'}, body)
+
+        self.mock.add_callback(method='POST', url=self.f.REST_URL, callback=callback)
+
+    def test_batch_ordered(self):
+        photo_ids = [str(i) for i in range(20)]
+        calls = [('photos.getInfo', {'photo_id': photo_id}) for photo_id in photo_ids]
+
+        results = self.f.batch(calls, max_workers=5)
+
+        self.assertEqual(photo_ids, [rsp.find('photo').get('id') for rsp in results])
+
+    def test_batch_errors(self):
+        calls = [('flickr.photos.getInfo', {'photo_id': '1'}),
+                 ('flickr.photos.getInfo', {'photo_id': 'missing'}),
+                 ('flickr.photos.getInfo', {'photo_id': '3'})]
+
+        results = self.f.batch(calls, max_workers=2)
+
+        self.assertEqual('1', results[0].find('photo').get('id'))
+        self.assertIsInstance(results[1], flickrapi.FlickrError)
+        self.assertEqual(1, results[1].code)
+        self.assertEqual('3', results[2].find('photo').get('id'))
+
+    def test_batch_unordered(self):
+        calls = [('photos.getInfo', {'photo_id': str(i)}) for i in range(10)]
+
+        results = dict(self.f.batch(calls, max_workers=3, ordered=False))
+
+        self.assertEqual(set(range(10)), set(results))
+        self.assertEqual('7', results[7].find('photo').get('id'))
+
 
 class TokenCachePathTest(MockedTest):
     def test_token_cache_path(self):
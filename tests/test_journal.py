@@ -0,0 +1,201 @@
+# -*- encoding: utf-8 -*-
+
+'''Unittest for the flickrapi.journal module'''
+
+import asyncio
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock  # noqa: F401
+
+import flickrapi
+from flickrapi import bulk
+from flickrapi.auth import FlickrAccessToken
+from flickrapi.journal import UploadJournal, content_hash
+
+key = u'ecd01ab8f00faf13e1f8801586e126fd'
+secret = u'2ee3f558fd79f292'
+
+
+class UploadJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.journal = UploadJournal(os.path.join(self.tmpdir, 'uploads.sqlite'))
+
+        self.stub = flickrapi.StubTransport()
+        self.f = self.flickr()
+
+        self.photo = os.path.join(self.tmpdir, 'photo.jpg')
+        with open(self.photo, 'wb') as outfile:
+            outfile.write(b'jpeg data')
+
+        self.requests = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def flickr(self, user_nsid=u'73509078@N00', **kwargs):
+        token = FlickrAccessToken(u'123-abc-def', u'token_secret', u'write',
+                                  u'fullname', u'username', user_nsid)
+        kwargs.setdefault('format', 'etree')
+        kwargs.setdefault('upload_journal', self.journal)
+        return flickrapi.FlickrAPI(key, secret, token=token, store_token=False,
+                                   transport=self.stub, **kwargs)
+
+    def respond(self, url, body):
+        def callback(request):
+            request.body.read()
+            self.requests += 1
+            return body
+
+        self.stub.add(url, callback)
+
+    def test_content_hash(self):
+        fileobj = io.BytesIO(b'xxjpeg data')
+        fileobj.seek(2)
+
+        self.assertEqual(content_hash(self.photo), content_hash('photo.jpg', fileobj))
+        self.assertEqual(2, fileobj.tell())
+
+    def test_skip_uploaded(self):
+        self.respond(self.f.UPLOAD_URL, '<rsp stat="ok"><photoid>1234</photoid></rsp>')
+
+        first = self.f.upload(self.photo)
+        second = self.f.upload(self.photo)
+        fromfile = self.f.upload('other name.jpg', io.BytesIO(b'jpeg data'))
+
+        self.assertEqual(1, self.requests)
+        for rsp in (first, second, fromfile):
+            self.assertEqual('1234', rsp.find('photoid').text)
+
+        # The journal lives on disk, so it survives a restart.
+        f = self.flickr(upload_journal=UploadJournal(self.journal.filename), format='xmlnode')
+        self.assertEqual('1234', f.upload(self.photo).photoid[0].text)
+        self.assertEqual(1, self.requests)
+
+    def test_other_user(self):
+        self.respond(self.f.UPLOAD_URL, '<rsp stat="ok"><photoid>1234</photoid></rsp>')
+
+        self.f.upload(self.photo)
+        self.flickr(user_nsid=u'12037949629@N01').upload(self.photo)
+
+        self.assertEqual(2, self.requests)
+
+    def test_duplicate_is_success(self):
+        self.respond(self.f.UPLOAD_URL,
+                     '<rsp stat="fail"><err code="9" msg="Duplicate photo" />'
+                     '<duplicate_photo_id>5678</duplicate_photo_id></rsp>')
+
+        rsp = self.f.upload(self.photo, dedup_check=1)
+        self.assertEqual('5678', rsp.find('photoid').text)
+
+        self.f.upload(self.photo)
+        self.assertEqual(1, self.requests)
+
+    def test_failure(self):
+        self.respond(self.f.UPLOAD_URL,
+                     '<rsp stat="fail"><err code="5" msg="Filetype was not recognised" /></rsp>')
+
+        self.assertRaises(flickrapi.FlickrError, self.f.upload, self.photo)
+        self.assertEqual([(self.photo, 'failed', 'Error: 5: Filetype was not recognised')],
+                         self.journal.incomplete())
+
+        # Unparsed responses are returned as before.
+        rsp = self.f.upload(self.photo, format='rest')
+        self.assertIn(b'stat="fail"', rsp)
+        self.assertEqual(2, self.requests)
+
+    def test_replace(self):
+        self.respond(self.f.UPLOAD_URL, '<rsp stat="ok"><photoid>1234</photoid></rsp>')
+        self.respond(self.f.REPLACE_URL, '<rsp stat="ok"><photoid>1234</photoid></rsp>')
+
+        self.f.upload(self.photo)
+        self.f.replace(self.photo, photo_id='1234')
+        self.f.replace(self.photo, photo_id='1234')
+
+        self.assertEqual(2, self.requests)
+        self.assertEqual(2, len(self.journal))
+
+    def test_replace_back(self):
+        self.respond(self.f.REPLACE_URL, '<rsp stat="ok"><photoid>1234</photoid></rsp>')
+        other = os.path.join(self.tmpdir, 'other.jpg')
+        with open(other, 'wb') as outfile:
+            outfile.write(b'other jpeg data')
+
+        self.f.replace(self.photo, photo_id='1234')
+        self.f.replace(other, photo_id='1234')
+        self.f.replace(self.photo, photo_id='1234')
+
+        self.assertEqual(3, self.requests)
+
+    def test_upload_many(self):
+        self.respond(self.f.UPLOAD_URL, '<rsp stat="ok"><photoid>1234</photoid></rsp>')
+        reports = []
+
+        self.f.upload(self.photo)
+        results = self.f.upload_many([self.photo], progress_callback=reports.append)
+
+        self.assertEqual('1234', results[0].find('photoid').text)
+        self.assertEqual(1, self.requests)
+        self.assertEqual((0, 0), (reports[-1].bytes_sent, reports[-1].bytes_total))
+
+    def test_upload_many_progress(self):
+        self.respond(self.f.UPLOAD_URL, '<rsp stat="ok"><photoid>1234</photoid></rsp>')
+        sent = []
+        tracker_sent = bulk.ProgressTracker.sent
+
+        def record_sent(tracker, nbytes):
+            sent.append(nbytes)
+            tracker_sent(tracker, nbytes)
+
+        with mock.patch.object(bulk.ProgressTracker, 'sent', record_sent):
+            self.f.upload_many([self.photo])
+
+        # Hashing the file for the journal isn't reported as progress.
+        self.assertEqual([len(b'jpeg data')], sent)
+        self.assertEqual(1, self.requests)
+
+    def test_async_upload(self):
+        token = self.f.token_cache.token
+        f = flickrapi.AsyncFlickrAPI(key, secret, token=token, store_token=False,
+                                     format='etree', upload_journal=self.journal)
+
+        async def do_upload(filename, url, params=None, fileobj=None, timeout=None):
+            self.requests += 1
+            return b'<rsp stat="ok"><photoid>1234</photoid></rsp>'
+
+        f.flickr_oauth.async_do_upload = do_upload
+
+        loop = asyncio.new_event_loop()
+        try:
+            first = loop.run_until_complete(f.upload(self.photo))
+            second = loop.run_until_complete(f.upload(self.photo))
+        finally:
+            loop.close()
+
+        self.assertEqual(1, self.requests)
+        self.assertEqual('1234', second.find('photoid').text)
+        self.assertEqual('1234', first.find('photoid').text)
+
+        # The synchronous API shares the journal.
+        self.f.upload(self.photo)
+        self.assertEqual(1, self.requests)
+
+    def test_forget(self):
+        self.respond(self.f.UPLOAD_URL, '<rsp stat="ok"><photoid>1234</photoid></rsp>')
+
+        self.f.upload(self.photo)
+        self.journal.forget(content_hash(self.photo), u'73509078@N00')
+        self.f.upload(self.photo)
+
+        self.assertEqual(2, self.requests)
+
+
+if __name__ == '__main__':
+    unittest.main()
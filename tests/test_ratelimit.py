@@ -0,0 +1,95 @@
+# -*- encoding: utf-8 -*-
+
+'''Unittest for the flickrapi.ratelimit module'''
+
+import os.path
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import flickrapi
+from flickrapi.ratelimit import TokenBucket, SQLiteTokenBucket
+
+key = u'ecd01ab8f00faf13e1f8801586e126fd'
+secret = u'2ee3f558fd79f292'
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_then_wait(self):
+        bucket = TokenBucket(rate=10, capacity=3)
+
+        self.assertEqual(0.0, bucket.reserve())
+        self.assertEqual(0.0, bucket.reserve())
+        self.assertEqual(0.0, bucket.reserve())
+
+        # The bucket is empty now, so the next call has to wait ~1/rate.
+        self.assertAlmostEqual(0.1, bucket.reserve(), delta=0.02)
+        # And the one after that is queued behind it.
+        self.assertAlmostEqual(0.2, bucket.reserve(), delta=0.02)
+
+    def test_refill(self):
+        bucket = TokenBucket(rate=100, capacity=1)
+        bucket.reserve()
+        time.sleep(0.02)
+        self.assertEqual(0.0, bucket.reserve())
+
+    def test_acquire_paces_threads(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = time.monotonic()
+
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(11)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # The first call is free, the other 10 take 1/50 second each.
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+    def test_invalid_rate(self):
+        self.assertRaises(ValueError, TokenBucket, rate=0)
+
+    def test_flickrapi_uses_limiter(self):
+        bucket = TokenBucket(rate=1000, capacity=1)
+        stub = flickrapi.StubTransport()
+        stub.add(flickrapi.FlickrAPI.REST_URL, '<rsp stat="ok" />')
+        f = flickrapi.FlickrAPI(key, secret, store_token=False, transport=stub,
+                                rate_limiter=bucket)
+
+        f.test.echo()
+        f.test.echo()
+
+        # Two tokens were taken; the second call had to wait for it.
+        self.assertLess(bucket._tokens, 0.5)
+
+
+class SQLiteTokenBucketTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'ratelimit.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_shared_between_instances(self):
+        # Two instances on the same file behave as two processes would.
+        bucket1 = SQLiteTokenBucket(self.filename, rate=10, capacity=2)
+        bucket2 = SQLiteTokenBucket(self.filename, rate=10, capacity=2)
+
+        self.assertEqual(0.0, bucket1.reserve())
+        self.assertEqual(0.0, bucket2.reserve())
+        self.assertAlmostEqual(0.1, bucket1.reserve(), delta=0.05)
+        self.assertAlmostEqual(0.2, bucket2.reserve(), delta=0.05)
+
+    def test_named_buckets(self):
+        bucket1 = SQLiteTokenBucket(self.filename, rate=10, capacity=1, name='one')
+        bucket2 = SQLiteTokenBucket(self.filename, rate=10, capacity=1, name='two')
+
+        self.assertEqual(0.0, bucket1.reserve())
+        self.assertEqual(0.0, bucket2.reserve())
+
+
+if __name__ == '__main__':
+    unittest.main()
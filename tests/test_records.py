@@ -0,0 +1,119 @@
+# -*- encoding: utf-8 -*-
+
+'''Unittest for the flickrapi.records module'''
+
+import copy
+import pickle
+import unittest
+
+import flickrapi
+from flickrapi import records
+
+key = u'ecd01ab8f00faf13e1f8801586e126fd'
+secret = u'2ee3f558fd79f292'
+
+PHOTOS_XML = ('<rsp stat="ok"><photos page="2" pages="3" perpage="2" total="6">'
+              '<photo id="1" owner="73509078@N00" server="2067" title="one" />'
+              '<photo id="2" owner="73509078@N00" server="2067" title="two" ispublic="1" />'
+              '</photos></rsp>')
+
+PHOTOSETS_XML = ('<rsp stat="ok"><photosets page="1" pages="1" perpage="50" total="1">'
+                 '<photoset id="5" primary="2483" photos="4">'
+                 '<title>Test</title><description>foo</description>'
+                 '</photoset></photosets></rsp>')
+
+CONTACTS_XML = ('<rsp stat="ok"><contacts page="1" pages="1" per_page="1000" total="2">'
+                '<contact nsid="12037949629@N01" username="Eric" ignored="1" />'
+                '<contact nsid="12037949631@N01" username="Cal" ignored="0" />'
+                '</contacts></rsp>')
+
+
+class RecordsFormatTest(unittest.TestCase):
+    def setUp(self):
+        self.stub = flickrapi.StubTransport()
+        self.f = flickrapi.FlickrAPI(key, secret, format='records', store_token=False,
+                                     transport=self.stub)
+
+    def call(self, body, method='flickr.photos.search', **kwargs):
+        self.stub.add(self.f.REST_URL, body)
+        return self.f.do_flickr_call(method, **kwargs)
+
+    def test_photos(self):
+        page = self.call(PHOTOS_XML)
+
+        self.assertIsInstance(page, records.RecordPage)
+        self.assertEqual('photos', page.tag)
+        self.assertEqual((2, 3, 2, 6), (page.page, page.pages, page.perpage, page.total))
+        self.assertEqual(['one', 'two'], [photo.title for photo in page])
+
+        # Both records have the same fields, missing ones are None.
+        self.assertIs(type(page[0]), type(page[1]))
+        self.assertIsNone(page[0].ispublic)
+        self.assertEqual('1', page[1].ispublic)
+        self.assertEqual('no', page[0].get('ispublic', 'no'))
+
+    def test_records_are_compact(self):
+        page = self.call(PHOTOS_XML)
+
+        self.assertIsInstance(page[0], tuple)
+        self.assertFalse(hasattr(page[0], '__dict__'))
+        self.assertFalse(hasattr(page, '__dict__'))
+
+    def test_interned(self):
+        first = self.call(PHOTOS_XML)
+        second = self.call(PHOTOS_XML)
+
+        self.assertIs(first[0].owner, second[1].owner)
+        self.assertIs(first[0].server, second[1].server)
+
+    def test_child_elements(self):
+        page = self.call(PHOTOSETS_XML, 'flickr.photosets.getList')
+
+        photoset = page[0]
+        self.assertEqual('5', photoset.id)
+        self.assertEqual('Test', photoset.title)
+        self.assertEqual('foo', photoset.description)
+
+    def test_contacts(self):
+        page = self.call(CONTACTS_XML, 'flickr.contacts.getList')
+
+        self.assertEqual(1000, page.perpage)
+        self.assertEqual(['Eric', 'Cal'], [contact.username for contact in page])
+
+    def test_error(self):
+        self.assertRaises(flickrapi.FlickrError, self.call,
+                          '<rsp stat="fail"><err code="1" msg="Not found" /></rsp>')
+
+    def test_not_a_list(self):
+        info = ('<rsp stat="ok"><photo id="1234"><owner nsid="x" />'
+                '<title>Kitten</title></photo></rsp>')
+        self.assertRaises(ValueError, self.call, info, 'flickr.photos.getInfo')
+
+        self.assertEqual([], records.parse_page(self.f.parse_etree('<rsp stat="ok" />')))
+
+    def test_pickle(self):
+        page = self.call(PHOTOSETS_XML, 'flickr.photosets.getList')
+
+        for clone in (pickle.loads(pickle.dumps(page)), copy.deepcopy(page)):
+            self.assertEqual(page, clone)
+            self.assertEqual(page.total, clone.total)
+            self.assertEqual('Test', clone[0].title)
+
+    def test_parsed_cache(self):
+        self.f.parsed_cache = flickrapi.ParsedCache()
+
+        first = self.call(PHOTOS_XML)
+        second = self.f.do_flickr_call('flickr.photos.search')
+        self.assertEqual(first, second)
+        self.assertEqual(first.pages, second.pages)
+
+    def test_odd_field_names(self):
+        Record = records.record_type('photo', ('id', 'class', 'url-o'))
+        photo = Record('1', 'a', 'b')
+
+        self.assertEqual('a', photo.get('class'))
+        self.assertEqual('b', photo.get('url-o'))
+
+
+if __name__ == '__main__':
+    unittest.main()
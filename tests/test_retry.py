@@ -0,0 +1,135 @@
+# -*- encoding: utf-8 -*-
+
+'''Unittest for the flickrapi.retry module'''
+
+import re
+import time
+import unittest
+
+import requests
+
+import flickrapi
+from flickrapi.retry import RetryPolicy, is_read_method
+
+key = u'ecd01ab8f00faf13e1f8801586e126fd'
+secret = u'2ee3f558fd79f292'
+
+
+class FlakyResponses(object):
+    """Callable body for StubTransport; fails the first ``failures`` requests."""
+
+    def __init__(self, failures, status=503):
+        self.failures = failures
+        self.status = status
+        self.nonces = []
+
+    def __call__(self, request):
+        nonce = re.search(br'oauth_nonce="([^"]+)"', request.headers['Authorization'])
+        self.nonces.append(nonce.group(1))
+
+        if len(self.nonces) <= self.failures:
+            if self.status is None:
+                raise requests.exceptions.ConnectionError('connection reset')
+            return self.status, 'Service Unavailable'
+        return 200, '<rsp stat="ok" />'
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_is_read_method(self):
+        self.assertTrue(is_read_method('flickr.photos.getInfo'))
+        self.assertTrue(is_read_method('flickr.photos.search'))
+        self.assertTrue(is_read_method('flickr.auth.oauth.checkToken'))
+        self.assertTrue(is_read_method('flickr.places.placesForUser'))
+        self.assertTrue(is_read_method('flickr.places.tagsForPlace'))
+        self.assertTrue(is_read_method('photos.geo.photosForLocation'))
+        self.assertFalse(is_read_method('flickr.photos.setMeta'))
+        self.assertFalse(is_read_method('flickr.photosets.addPhoto'))
+        self.assertFalse(is_read_method(None))
+
+    def test_delays(self):
+        policy = RetryPolicy(max_attempts=5, backoff=1.0, max_backoff=3.0)
+
+        delays = list(policy.delays())
+        self.assertEqual(4, len(delays))
+        for retry, delay in enumerate(delays, 1):
+            self.assertLessEqual(delay, min(3.0, 2 ** (retry - 1)))
+
+    def test_deadline(self):
+        policy = RetryPolicy(max_attempts=100, backoff=10.0, deadline=0.0)
+        self.assertEqual([], list(policy.delays()))
+
+    def test_is_transient(self):
+        policy = RetryPolicy()
+
+        self.assertTrue(policy.is_transient(requests.exceptions.ConnectionError()))
+        self.assertTrue(policy.is_transient(flickrapi.FlickrHTTPError('oops', 502)))
+        self.assertFalse(policy.is_transient(flickrapi.FlickrHTTPError('oops', 404)))
+        self.assertFalse(policy.is_transient(flickrapi.FlickrError('Error: 1', code=1)))
+
+
+class FlickrAPIRetryTest(unittest.TestCase):
+    def setUp(self):
+        self.stub = flickrapi.StubTransport()
+        self.policy = RetryPolicy(max_attempts=3, backoff=0.001)
+        self.f = flickrapi.FlickrAPI(key, secret, store_token=False, transport=self.stub,
+                                     retry_policy=self.policy)
+
+    def test_retry_on_5xx(self):
+        responses = FlakyResponses(failures=2)
+        self.stub.add(self.f.REST_URL, responses)
+
+        rsp = self.f.photos.getInfo(photo_id='1234')
+
+        self.assertEqual('ok', rsp.get('stat'))
+        self.assertEqual(3, len(responses.nonces))
+        # Every attempt is signed again.
+        self.assertEqual(3, len(set(responses.nonces)))
+
+    def test_retry_on_connection_error(self):
+        responses = FlakyResponses(failures=1, status=None)
+        self.stub.add(self.f.REST_URL, responses)
+
+        self.f.photos.search(tags='kitten')
+        self.assertEqual(2, len(responses.nonces))
+
+    def test_give_up(self):
+        responses = FlakyResponses(failures=5)
+        self.stub.add(self.f.REST_URL, responses)
+
+        with self.assertRaises(flickrapi.FlickrHTTPError) as ctx:
+            self.f.photos.getInfo(photo_id='1234')
+        self.assertEqual(503, ctx.exception.status_code)
+        self.assertEqual(3, len(responses.nonces))
+
+    def test_deadline_includes_first_attempt(self):
+        self.policy.deadline = 0.05
+        responses = FlakyResponses(failures=5)
+
+        def slow(request):
+            time.sleep(0.1)
+            return responses(request)
+
+        self.stub.add(self.f.REST_URL, slow)
+
+        self.assertRaises(flickrapi.FlickrHTTPError, self.f.photos.getInfo, photo_id='1234')
+        self.assertEqual(1, len(responses.nonces))
+
+    def test_no_retry_of_writes(self):
+        responses = FlakyResponses(failures=1)
+        self.stub.add(self.f.REST_URL, responses)
+
+        self.assertRaises(flickrapi.FlickrHTTPError,
+                          self.f.photos.addTags, photo_id='1234', tags='kitten')
+        self.assertEqual(1, len(responses.nonces))
+
+    def test_retry_writes_opt_in(self):
+        self.policy.retry_writes = True
+        responses = FlakyResponses(failures=1)
+        self.stub.add(self.f.REST_URL, responses)
+
+        self.f.photos.addTags(photo_id='1234', tags='kitten')
+        self.assertEqual(2, len(responses.nonces))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+# -*- encoding: utf-8 -*-
+
+'''Unittest for the flickrapi.singleflight module'''
+
+import threading
+import unittest
+
+import flickrapi
+from flickrapi.singleflight import SingleFlight
+
+key = u'ecd01ab8f00faf13e1f8801586e126fd'
+secret = u'2ee3f558fd79f292'
+
+
+class SingleFlightTest(unittest.TestCase):
+    def run_threads(self, count, target):
+        barrier = threading.Barrier(count)
+        results = []
+
+        def run():
+            barrier.wait()
+            try:
+                results.append(target())
+            except BaseException as ex:
+                results.append(ex)
+
+        threads = [threading.Thread(target=run) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def test_coalescing(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            release.wait()
+            return 'result'
+
+        def call():
+            return flight.do('key', slow)
+
+        timer = threading.Timer(0.2, release.set)
+        timer.start()
+        results = self.run_threads(8, call)
+
+        self.assertEqual(['result'] * 8, results)
+        self.assertEqual(1, len(calls))
+        self.assertEqual(0, len(flight))
+
+    def test_error_shared(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def failing():
+            release.wait()
+            raise flickrapi.FlickrError('Error: 1: Photo not found', code=1)
+
+        timer = threading.Timer(0.2, release.set)
+        timer.start()
+        results = self.run_threads(4, lambda: flight.do('key', failing))
+
+        self.assertEqual(4, len(results))
+        for result in results:
+            self.assertIsInstance(result, flickrapi.FlickrError)
+
+    def test_base_exception_shared(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        class Interrupted(BaseException):
+            pass
+
+        def interrupted():
+            release.wait()
+            raise Interrupted()
+
+        timer = threading.Timer(0.2, release.set)
+        timer.start()
+        results = self.run_threads(4, lambda: flight.do('key', interrupted))
+
+        self.assertEqual(4, len(results))
+        for result in results:
+            self.assertIsInstance(result, Interrupted)
+
+    def test_flickrapi_coalesces_reads(self):
+        stub = flickrapi.StubTransport(latency=0.2)
+        stub.add(flickrapi.FlickrAPI.REST_URL, '<rsp stat="ok"><photo id="1234" /></rsp>')
+        f = flickrapi.FlickrAPI(key, secret, store_token=False, transport=stub)
+
+        results = self.run_threads(6, lambda: f.photos.getInfo(photo_id='1234'))
+
+        self.assertEqual(6, len(results))
+        self.assertEqual(['1234'] * 6, [rsp.find('photo').get('id') for rsp in results])
+        self.assertEqual(1, len(stub.requests))
+
+    def test_flickrapi_does_not_coalesce_writes(self):
+        stub = flickrapi.StubTransport(latency=0.1)
+        stub.add(flickrapi.FlickrAPI.REST_URL, '<rsp stat="ok" />')
+        f = flickrapi.FlickrAPI(key, secret, store_token=False, transport=stub)
+
+        self.run_threads(3, lambda: f.photos.addTags(photo_id='1234', tags='kitten'))
+
+        self.assertEqual(3, len(stub.requests))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# -*- encoding: utf-8 -*-
+
+'''Unittest for the flickrapi.streaming module'''
+
+import unittest
+
+import flickrapi
+from flickrapi.streaming import ElementStream, parse_searchstring
+
+key = u'ecd01ab8f00faf13e1f8801586e126fd'
+secret = u'2ee3f558fd79f292'
+
+PHOTOS_XML = (b'<rsp stat="ok"><photos page="2" pages="3" perpage="3" total="9">'
+              b'<photo id="1" title="one" /><photo id="2" title="two" />'
+              b'<photo id="3" title="three" /></photos></rsp>')
+
+
+def chunked(data, size):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+class ElementStreamTest(unittest.TestCase):
+    def test_elements(self):
+        stream = ElementStream(chunked(PHOTOS_XML, 7), '*/photo')
+        titles = [photo.get('title') for photo in stream]
+
+        self.assertEqual(['one', 'two', 'three'], titles)
+        self.assertEqual('3', stream.list_attrib['pages'])
+
+    def test_incremental(self):
+        received = []
+
+        def chunks():
+            for chunk in chunked(PHOTOS_XML, 16):
+                received.append(chunk)
+                yield chunk
+
+        first = next(iter(ElementStream(chunks(), '*/photo')))
+
+        # The first photo is yielded before the whole response was received.
+        self.assertEqual('1', first.get('id'))
+        self.assertLess(sum(len(chunk) for chunk in received), len(PHOTOS_XML))
+
+    def test_elements_freed(self):
+        stream = ElementStream([PHOTOS_XML], 'photos/photo')
+        photos = []
+        for photo in stream:
+            self.assertEqual('photo', photo.tag)
+            photos.append(photo)
+
+        # The yielded elements are cleared once iteration moves on.
+        self.assertEqual([{}, {}, {}], [photo.attrib for photo in photos])
+
+    def test_error(self):
+        stream = ElementStream([b'<rsp stat="fail"><err code="1" msg="User not found" /></rsp>'])
+
+        with self.assertRaises(flickrapi.FlickrError) as ctx:
+            list(stream)
+        self.assertEqual(1, ctx.exception.code)
+
+    def test_searchstring(self):
+        self.assertEqual(['*', 'contact'], parse_searchstring('*/contact'))
+        self.assertRaises(ValueError, parse_searchstring, './/photo')
+        self.assertRaises(ValueError, parse_searchstring, "*/photo[@id='1']")
+
+
+class StreamCallTest(unittest.TestCase):
+    def test_stream_call(self):
+        stub = flickrapi.StubTransport()
+        stub.add(flickrapi.FlickrAPI.REST_URL, PHOTOS_XML,
+                 params={'method': 'flickr.photos.search', 'format': 'rest'})
+        f = flickrapi.FlickrAPI(key, secret, store_token=False, transport=stub)
+
+        ids = [photo.get('id') for photo in f.stream_call('photos.search', tags='kitten')]
+        self.assertEqual(['1', '2', '3'], ids)
+
+    def test_http_error(self):
+        stub = flickrapi.StubTransport()
+        stub.add(flickrapi.FlickrAPI.REST_URL, 'Service Unavailable', status=503)
+        f = flickrapi.FlickrAPI(key, secret, store_token=False, transport=stub)
+
+        self.assertRaises(flickrapi.FlickrHTTPError, f.stream_call, 'flickr.photos.search')
+
+
+if __name__ == '__main__':
+    unittest.main()
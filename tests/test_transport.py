@@ -0,0 +1,116 @@
+# -*- encoding: utf-8 -*-
+
+'''Unittest for the flickrapi.transport module'''
+
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock  # noqa: F401
+
+import requests
+
+import flickrapi
+from flickrapi.transport import RequestsTransport, StubTransport
+
+key = u'ecd01ab8f00faf13e1f8801586e126fd'
+secret = u'2ee3f558fd79f292'
+
+
+class RequestsTransportTest(unittest.TestCase):
+    def test_pool_configuration(self):
+        transport = RequestsTransport(pool_size=3, max_connections_per_host=25, pool_block=True)
+
+        adapter = transport.session.get_adapter('https://api.flickr.com/')
+        self.assertEqual(3, adapter._pool_connections)
+        self.assertEqual(25, adapter._pool_maxsize)
+        self.assertTrue(adapter._pool_block)
+
+    def test_timeouts(self):
+        transport = RequestsTransport(connect_timeout=3, read_timeout=30)
+
+        self.assertEqual((3, 30), transport._timeout(None))
+        self.assertEqual(5, transport._timeout(5))
+        self.assertIsNone(RequestsTransport()._timeout(None))
+
+    def test_keep_alive(self):
+        transport = RequestsTransport(keep_alive=False)
+        self.assertEqual('close', transport.session.headers['Connection'])
+
+    def test_per_instance(self):
+        transport = RequestsTransport()
+        f1 = flickrapi.FlickrAPI(key, secret, store_token=False, transport=transport)
+        f2 = flickrapi.FlickrAPI(key, secret, store_token=False)
+        f3 = flickrapi.FlickrAPI(key, secret, store_token=False)
+
+        self.assertIs(transport, f1.flickr_oauth.transport)
+        self.assertIs(transport.session, f1.flickr_oauth.session)
+        self.assertIs(f2.flickr_oauth.transport, f3.flickr_oauth.transport)
+
+    def test_assign_session(self):
+        session = requests.Session()
+        f = flickrapi.FlickrAPI(key, secret, store_token=False)
+
+        f.flickr_oauth.session = session
+
+        self.assertIs(session, f.flickr_oauth.session)
+        self.assertIs(session, f.flickr_oauth.transport.session)
+
+    def test_assign_class_session(self):
+        session = requests.Session()
+        adapter = session.get_adapter('https://api.flickr.com/')
+        with mock.patch.object(flickrapi.auth.OAuthFlickrInterface, 'session', session):
+            f = flickrapi.FlickrAPI(key, secret, store_token=False)
+
+        self.assertIs(session, f.flickr_oauth.transport.session)
+        # The session is used as it is.
+        self.assertIs(adapter, session.get_adapter('https://api.flickr.com/'))
+
+    def test_configure_class_session(self):
+        session = flickrapi.auth.OAuthFlickrInterface.session
+        self.assertIs(flickrapi.auth.OAuthFlickrInterface.default_transport.session, session)
+
+        with mock.patch.dict(session.headers, {'X-Test': 'yes'}):
+            f = flickrapi.FlickrAPI(key, secret, store_token=False)
+            self.assertEqual('yes', f.flickr_oauth.session.headers['X-Test'])
+
+        self.assertIs(flickrapi.auth.OAuthFlickrInterface.default_transport,
+                      f.flickr_oauth.transport)
+
+
+class StubTransportTest(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubTransport()
+        self.f = flickrapi.FlickrAPI(key, secret, store_token=False, transport=self.stub)
+
+    def test_call(self):
+        self.stub.add(self.f.REST_URL, '<rsp stat="ok"><photo id="1234" /></rsp>',
+                      params={'method': 'flickr.photos.getInfo', 'photo_id': 1234})
+
+        rsp = self.f.photos.getInfo(photo_id=1234)
+
+        self.assertEqual('1234', rsp.find('photo').get('id'))
+        self.assertEqual(1, len(self.stub.requests))
+        self.assertIn(b'oauth_signature', self.stub.requests[0].headers['Authorization'])
+
+    def test_unmatched(self):
+        self.stub.add(self.f.REST_URL, '<rsp stat="ok" />', params={'method': 'flickr.test.echo'})
+
+        self.assertRaises(requests.exceptions.ConnectionError,
+                          self.f.photos.getInfo, photo_id=1234)
+
+    def test_status_code(self):
+        self.stub.add(self.f.REST_URL, 'oops', status=500)
+
+        self.assertRaises(flickrapi.FlickrError, self.f.photos.getInfo, photo_id=1234)
+
+    def test_callable_body(self):
+        self.stub.add(self.f.REST_URL, lambda request: (200, '<rsp stat="ok" />'))
+
+        rsp = self.f.test.echo()
+        self.assertEqual('ok', rsp.get('stat'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -116,3 +116,92 @@ class TestXMLNode(unittest.TestCase):
         self.assertEqual(f.taggy[1].name, 'taggy')
         self.assertEqual(f.taggy[1]["bar"], '11')
         self.assertEqual(f.taggy[1]["baz"], '12')
+
+
+class TestXMLNodeCompatibility(unittest.TestCase):
+    '''Tests behaviour the minidom-based implementation used to have.'''
+
+    def testNameElement(self):
+        '''A <name> child element replaces the node name.'''
+
+        doc = XMLNode.parse(group_info_xml)
+        group = doc.group[0]
+
+        self.assertEqual('Flickr\nAPI', group.name[0].text)
+        self.assertEqual('name', group.name[0].name)
+        self.assertEqual('3', group.throttle[0]['count'])
+
+    def testMixedText(self):
+        doc = XMLNode.parse('<a>one<b>two</b>three<b/>four</a>')
+
+        self.assertEqual('onethreefour', doc.text)
+        self.assertEqual('two', doc.b[0].text)
+        self.assertEqual('', doc.b[1].text)
+
+    def testBytes(self):
+        doc = XMLNode.parse(xml.encode('utf-8'))
+        self.assertEqual(u"Sybren Stüvel", doc.photo[0].owner[0]['username'])
+
+    def testMissingChild(self):
+        doc = XMLNode.parse(xml)
+
+        self.assertRaises(AttributeError, getattr, doc, 'group')
+        self.assertFalse(hasattr(doc.photo[0], 'nonexistant'))
+        self.assertIsNone(doc.xml)
+
+    def testSlots(self):
+        doc = XMLNode.parse(xml)
+        self.assertFalse(hasattr(doc, '__dict__'))
+
+    def testCopy(self):
+        import copy
+        import pickle
+
+        doc = XMLNode.parse(xml)
+        for clone in (copy.deepcopy(doc), pickle.loads(pickle.dumps(doc))):
+            self.assertEqual('2141453991', clone.photo[0]['id'])
+            self.assertEqual(13, len(clone.photo[0].tags[0].tag))
+
+
+class TestLazyXMLNode(unittest.TestCase):
+
+    def testParsing(self):
+        doc = XMLNode.parse(xml, lazy=True)
+
+        self.assertIsInstance(doc, XMLNode)
+        self.assertEqual(doc.photo[0]['id'], '2141453991')
+        self.assertEqual(doc.photo[0].comments[0].text, '3')
+        self.assertEqual(doc.photo[0].comments[0].name, u'comments')
+        self.assertEqual(doc.photo[0].owner[0]['username'], u"Sybren Stüvel")
+        self.assertEqual(13, len(doc.photo[0].tags[0].tag))
+        self.assertRaises(AttributeError, getattr, doc, 'group')
+
+    def testSameAsEager(self):
+        for xml_str in (xml, group_info_xml, '<a>one<b>two</b>three<b/>four</a>'):
+            eager = XMLNode.parse(xml_str)
+            lazy = XMLNode.parse(xml_str, lazy=True)
+            self.assertEqual(eager.text, lazy.text)
+            self.assertEqual(eager.attrib, lazy.attrib)
+            self.assertEqual(sorted(eager._children), sorted(lazy._children))
+
+        group = XMLNode.parse(group_info_xml, lazy=True).group[0]
+        self.assertEqual('Flickr\nAPI', group.name[0].text)
+
+    def testChildrenCreatedOnAccess(self):
+        doc = XMLNode.parse(xml, lazy=True)
+        children_slot = XMLNode._children
+
+        self.assertRaises(AttributeError, children_slot.__get__, doc)
+        photo = doc.photo[0]
+        self.assertEqual(['photo'], list(children_slot.__get__(doc)))
+        self.assertRaises(AttributeError, children_slot.__get__, photo)
+
+    def testElementReleased(self):
+        doc = XMLNode.parse(xml, lazy=True)
+        photo = doc.photo[0]
+
+        # Once its children exist, a node no longer needs its element.
+        self.assertFalse(hasattr(doc, '_element'))
+        self.assertTrue(hasattr(photo, '_element'))
+        # Elements without children become regular nodes right away.
+        self.assertIs(XMLNode, type(photo.comments[0]))